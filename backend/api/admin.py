@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Payslip, Deduction, Bonus, Transaction, Budget, Goal, InvitationCode, HealthScoreSnapshot
+from .models import User, Payslip, Deduction, Bonus, Transaction, Budget, Goal, InvitationCode, HealthScoreSnapshot, CategoryCount
 
 
 @admin.register(InvitationCode)
@@ -93,3 +93,10 @@ class HealthScoreSnapshotAdmin(admin.ModelAdmin):
         ('Advice', {'fields': ('cached_advice', 'advice_generated_at'), 'classes': ('collapse',)}),
         ('Timestamps', {'fields': ('created_at', 'updated_at'), 'classes': ('collapse',)}),
     )
+
+
+@admin.register(CategoryCount)
+class CategoryCountAdmin(admin.ModelAdmin):
+    list_display = ['user', 'type', 'category', 'token', 'count']
+    list_filter = ['type', 'category']
+    search_fields = ['user__username', 'token']
@@ -0,0 +1,226 @@
+"""
+Async versions of the Gemini-bound views, served when ASYNC_VIEWS is on (ASGI).
+
+While a model call is in flight the event loop keeps serving other requests,
+so one process holds many concurrent calls instead of one per sync worker.
+Database work stays in the sync helpers of the original views and runs
+through sync_to_async; the ORM-heavy views are not duplicated here.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .services.chat import ChatService
+from .services.gemini import GeminiService
+from .sse import sse_event, sse_response
+from .views import (
+    CHAT_ERROR_RESPONSE, ChatAnalyzeReceiptView, ChatInterpretStreamView, ChatInterpretView,
+    HealthScoreAdviceStreamView, HealthScoreAdviceView, PayslipAnalysisMixin,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _single_event(event: str):
+    yield event
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines.
+
+    DRF's dispatch is synchronous, so this one runs authentication,
+    permissions and throttling (which may query the database) through
+    sync_to_async and awaits the handler.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncChatInterpretView(AsyncAPIView, ChatInterpretView):
+    """Interpret user message for chatbot NLU (async)"""
+
+    async def post(self, request):
+        message, context, collected_data, error = self._parse_message(request)
+        if error:
+            return error
+
+        try:
+            chat_service = ChatService()
+            result = await chat_service.ainterpret_message(message, context, collected_data)
+            return Response(result)
+        except Exception:
+            return Response(CHAT_ERROR_RESPONSE, status=status.HTTP_200_OK)
+
+
+class AsyncChatInterpretStreamView(AsyncAPIView, ChatInterpretStreamView):
+    """
+    Interpret user message as server-sent events (async).
+
+    The events come from an async generator, so the ASGI handler relays each
+    one as it is produced instead of buffering a sync iterator in a thread.
+    """
+
+    async def post(self, request):
+        message, context, collected_data, error = self._parse_message(request)
+        if error:
+            return error
+
+        async def events():
+            try:
+                chat_service = ChatService()
+                async for kind, payload in chat_service.astream_interpret_message(message, context, collected_data):
+                    if kind == 'delta':
+                        yield sse_event('delta', {'text': payload})
+                    else:
+                        yield sse_event('result', payload)
+            except Exception as e:
+                logger.error(f"AsyncChatInterpretStreamView error: {e}")
+                yield sse_event('result', CHAT_ERROR_RESPONSE)
+
+        return sse_response(events())
+
+
+class AsyncChatAnalyzeReceiptView(AsyncAPIView, ChatAnalyzeReceiptView):
+    """Analyze receipt image for chatbot (async)"""
+
+    async def post(self, request):
+        file_content, mime_type, error = await sync_to_async(self._read_receipt)(request)
+        if error:
+            return error
+
+        try:
+            chat_service = ChatService()
+            result = await chat_service.aanalyze_receipt(file_content, mime_type)
+            return Response(result)
+        except Exception as e:
+            return self._receipt_error_response(e)
+
+
+class AsyncPayslipAnalyzeView(PayslipAnalysisMixin, AsyncAPIView):
+    """Analyze payslip file with Gemini AI (async PayslipViewSet.analyze)"""
+    parser_classes = [MultiPartParser, FormParser]
+
+    async def post(self, request):
+        file, mime_type, file_content, error = await sync_to_async(self._read_payslip)(request)
+        if error:
+            return error
+
+        try:
+            gemini_service = GeminiService()
+            result = await gemini_service.aanalyze_payslip(file_content, mime_type)
+        except Exception as e:
+            return self._payslip_error_response(e)
+
+        return self._payslip_response(file, result)
+
+
+class AsyncHealthScoreAdviceView(AsyncAPIView, HealthScoreAdviceView):
+    """Generate and retrieve financial advice for health score (async)"""
+
+    async def get(self, request):
+        """Get cached advice or generate new one if not exists"""
+        snapshot = await sync_to_async(self._get_current_snapshot)(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        if self._use_async(request):
+            return await sync_to_async(self._async_advice)(request, snapshot, refresh=False)
+
+        if snapshot.cached_advice:
+            return self._cached_advice_response(snapshot)
+
+        return await self._agenerate_and_cache_advice(request.user, snapshot)
+
+    async def post(self, request):
+        """Regenerate advice regardless of cache"""
+        snapshot = await sync_to_async(self._get_current_snapshot)(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        if self._use_async(request):
+            return await sync_to_async(self._async_advice)(request, snapshot, refresh=True)
+
+        return await self._agenerate_and_cache_advice(request.user, snapshot, use_cache=False)
+
+    async def _agenerate_and_cache_advice(self, user, snapshot, use_cache=True):
+        metrics_data = await sync_to_async(self._build_metrics_data)(user, snapshot)
+
+        try:
+            gemini_service = GeminiService()
+            advice = await gemini_service.agenerate_financial_advice(metrics_data, use_cache=use_cache)
+        except Exception as e:
+            return self._advice_error_response(e)
+
+        await sync_to_async(self._save_advice)(snapshot, advice)
+        return self._advice_response(snapshot, advice)
+
+
+class AsyncHealthScoreAdviceStreamView(AsyncAPIView, HealthScoreAdviceStreamView):
+    """Financial advice streamed as server-sent events (async)"""
+
+    async def get(self, request):
+        """Stream cached advice or generate new one if not exists"""
+        snapshot = await sync_to_async(self._get_current_snapshot)(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        if snapshot.cached_advice:
+            return sse_response(_single_event(self._result_event(snapshot, snapshot.cached_advice, cached=True)))
+
+        return await self._astream_and_cache_advice(request.user, snapshot)
+
+    async def post(self, request):
+        """Regenerate advice regardless of cache, streaming it"""
+        snapshot = await sync_to_async(self._get_current_snapshot)(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        return await self._astream_and_cache_advice(request.user, snapshot, use_cache=False)
+
+    async def _astream_and_cache_advice(self, user, snapshot, use_cache=True):
+        metrics_data = await sync_to_async(self._build_metrics_data)(user, snapshot)
+
+        async def events():
+            chunks = []
+            try:
+                gemini_service = GeminiService()
+                async for text in gemini_service.astream_financial_advice(metrics_data, use_cache=use_cache):
+                    chunks.append(text)
+                    yield sse_event('delta', {'text': text})
+            except Exception as e:
+                yield sse_event('error', {'error': f'Error al generar consejo: {str(e)}'})
+                return
+
+            advice = ''.join(chunks).strip()
+            await sync_to_async(self._save_advice)(snapshot, advice)
+            yield self._result_event(snapshot, advice, cached=False)
+
+        return sse_response(events())
@@ -0,0 +1,135 @@
+import copy
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .services.cache import LRUCache
+
+# str(user id) -> (User, stamp), shared by the requests of this worker. Keys
+# are strings because simplejwt may serialize the id claim as one
+user_cache = LRUCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL, name='auth_user',
+)
+
+# Seconds a user's stamp lives in the shared cache. Entries whose stamp
+# expired no longer match and are reloaded, so this only bounds reloads
+USER_STAMP_TTL = 24 * 3600
+
+# jti of refresh tokens known to be blacklisted. A blacklisted token never
+# becomes valid again, so entries can live until the token itself expires;
+# "not blacklisted" is never cached since another worker may blacklist it
+blacklist_cache = LRUCache(
+    max_size=settings.TOKEN_BLACKLIST_CACHE_SIZE,
+    ttl=api_settings.REFRESH_TOKEN_LIFETIME.total_seconds(),
+    name='token_blacklist',
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that skips the user lookup for recently seen users.
+
+    The user id claim of a validated token is resolved through a short-TTL
+    in-process cache, so a dashboard load fanning out into several API calls
+    costs one query instead of one per call. The active and revoked-token
+    checks still run on every request.
+
+    Each cached user carries the stamp the default cache (shared by the
+    workers) held for it when it was loaded. Saving or deleting a user (e.g.
+    deactivation, password change) replaces the stamp, so every worker
+    reloads that user on its next request; code updating users without
+    signals (QuerySet.update) must call invalidate_user().
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        key = str(user_id)
+        entry = user_cache.get(key)
+        if entry is not None and entry[1] is not None and entry[1] == cache.get(_stamp_key(key)):
+            user = entry[0]
+            self._check_user(user, validated_token)
+        else:
+            # Read the stamp before the row, so a change in between makes the entry stale
+            stamp = _current_stamp(key)
+            user = super().get_user(validated_token)
+            if stamp is not None:
+                user_cache.set(key, (user, stamp))
+
+        # Each request gets its own instance; views may modify request.user
+        return copy.copy(user)
+
+    def _check_user(self, user, validated_token) -> None:
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    RefreshToken whose blacklist check is answered from memory when possible.
+
+    Tokens this worker blacklisted (rotation, logout) or already found in the
+    blacklist are rejected without a query, so replays of rotated tokens
+    don't reach the token_blacklist tables.
+    """
+
+    def check_blacklist(self) -> None:
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if blacklist_cache.get(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+        try:
+            super().check_blacklist()
+        except TokenError:
+            blacklist_cache.set(jti, True)
+            raise
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.set(self.payload[api_settings.JTI_CLAIM], True)
+        return result
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer using CachedRefreshToken (SIMPLE_JWT TOKEN_REFRESH_SERIALIZER)"""
+    token_class = CachedRefreshToken
+
+
+def _stamp_key(user_id: str) -> str:
+    return f'auth-user-stamp:{user_id}'
+
+
+def _current_stamp(user_id: str) -> str | None:
+    cache.add(_stamp_key(user_id), uuid.uuid4().hex, USER_STAMP_TTL)
+    return cache.get(_stamp_key(user_id))
+
+
+def invalidate_user(user_id) -> None:
+    """Make every worker reload the user on its next request"""
+    user_cache.delete(str(user_id))
+    cache.set(_stamp_key(str(user_id)), uuid.uuid4().hex, USER_STAMP_TTL)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+post_save.connect(invalidate_cached_user, sender=get_user_model(), dispatch_uid='invalidate_cached_user_save')
+post_delete.connect(invalidate_cached_user, sender=get_user_model(), dispatch_uid='invalidate_cached_user_delete')
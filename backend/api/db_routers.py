@@ -0,0 +1,94 @@
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+
+# Alias reads are routed to; None lets Django use the primary
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+# Set by the router whenever the current request or job writes
+_wrote = contextvars.ContextVar('wrote', default=False)
+
+
+def _pin_key(user_id) -> str:
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user) -> None:
+    """Send the user's analytics reads to the primary for DATABASE_REPLICA_PIN_SECONDS"""
+    cache.set(_pin_key(user.pk), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user) -> bool:
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+@contextmanager
+def read_replica(user):
+    """
+    Route the reads inside the block to the read replica.
+
+    Falls back to the primary when no replica is configured or the user
+    wrote recently (read-your-writes).
+    """
+    alias = settings.DATABASE_READ_REPLICA
+    if not alias or not getattr(user, 'is_authenticated', False) or is_pinned(user):
+        yield PRIMARY
+        return
+
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_reads(view_method):
+    """Run a read-only view method under read_replica(request.user)"""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        with read_replica(request.user):
+            return view_method(self, request, *args, **kwargs)
+    return wrapper
+
+
+def start_write_tracking():
+    """Forget earlier writes; returns a token for stop_write_tracking()"""
+    return _wrote.set(False)
+
+
+def stop_write_tracking(token) -> bool:
+    """Whether anything was written since start_write_tracking()"""
+    wrote = _wrote.get()
+    _wrote.reset(token)
+    return wrote
+
+
+class ReplicaRouter:
+    """
+    Primary/replica router.
+
+    Writes always go to the primary. Reads go to the replica only inside
+    read_replica(); everything else keeps reading from the primary, so only
+    endpoints explicitly marked as analytics see replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        aliases = {PRIMARY, settings.DATABASE_READ_REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -0,0 +1,218 @@
+"""
+Local stand-in for the Gemini REST API, for load and latency testing.
+
+Speaks enough of the generateContent / streamGenerateContent / cachedContents
+protocol for the google-genai SDK, answering each CashMind prompt with a
+schema-valid canned response. Point the app at it with GEMINI_BASE_URL and
+start it with `python manage.py fake_gemini`.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class FakeGeminiConfig(NamedTuple):
+    """Latency distribution and failure injection for the fake server"""
+    latency_ms: float = 800
+    latency_spread: float = 0.5
+    latency_dist: str = 'lognormal'
+    error_rate: float = 0.0
+    error_codes: tuple[int, ...] = (503, 429)
+    stream_chunks: int = 4
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering"""
+        if self.latency_dist == 'fixed':
+            ms = self.latency_ms
+        elif self.latency_dist == 'uniform':
+            ms = random.uniform(self.latency_ms * (1 - self.latency_spread),
+                                self.latency_ms * (1 + self.latency_spread))
+        else:
+            # latency_ms is the median, latency_spread the sigma of the log
+            ms = random.lognormvariate(0, self.latency_spread) * self.latency_ms
+        return max(0.0, ms) / 1000
+
+
+def _payslip_response() -> dict:
+    return {
+        'employer': 'ACME S.A.',
+        'position': 'Analista',
+        'paymentDate': {'month': 'Noviembre', 'year': date.today().year},
+        'grossSalary': 850000,
+        'netSalary': 705500,
+        'deductions': [
+            {'name': 'Jubilación', 'amount': 93500, 'percentage': 11, 'category': 'retirement'},
+            {'name': 'Ley 19032', 'amount': 25500, 'percentage': 3, 'category': 'social_security'},
+            {'name': 'Obra Social', 'amount': 25500, 'percentage': 3, 'category': 'health'},
+        ],
+        'bonuses': [],
+    }
+
+
+def _receipt_response() -> dict:
+    return {
+        'success': True,
+        'data': {
+            'amount': 15420.5,
+            'description': 'Supermercado',
+            'date': date.today().isoformat(),
+            'type': 'expense',
+            'category': 'food',
+            'confidence': 0.92,
+        },
+    }
+
+
+def _interpret_response(prompt: str) -> dict:
+    match = re.search(r'Mensaje del usuario: (.*)', prompt)
+    message = match.group(1) if match else ''
+    amount = re.search(r'\d+', message)
+
+    if amount:
+        return {
+            'intent': 'create_expense',
+            'extractedData': {
+                'amount': int(amount.group(0)),
+                'description': 'Gasto',
+                'category': 'other',
+                'date': date.today().isoformat(),
+            },
+            'missingFields': [],
+            'response': f"Perfecto! Voy a registrar un gasto de ${int(amount.group(0)):,}. Confirmas?",
+            'isComplete': True,
+        }
+    return {
+        'intent': 'help',
+        'extractedData': None,
+        'missingFields': [],
+        'response': 'Puedo ayudarte a registrar gastos, ingresos, presupuestos y aportes a tus metas.',
+        'isComplete': False,
+    }
+
+
+ADVICE_TEXT = (
+    "1. Separá el 20% de tus ingresos apenas cobrás y transferilo a una cuenta de ahorro.\n"
+    "2. Revisá tus gastos fijos: renegociá servicios y suscripciones para bajar al menos un 5% este mes.\n"
+    "3. Distribuí mejor tus gastos variables fijando un tope semanal por categoría."
+)
+
+
+def canned_text(request_body: dict) -> str:
+    """Pick the canned answer matching the CashMind prompt in the request"""
+    texts = [
+        part.get('text', '')
+        for content in request_body.get('contents', [])
+        for part in content.get('parts', [])
+    ]
+    prompt = '\n'.join(texts)
+
+    if 'recibo de sueldo' in prompt:
+        return json.dumps(_payslip_response(), ensure_ascii=False)
+    if 'ticket o recibo de compra' in prompt:
+        return json.dumps(_receipt_response(), ensure_ascii=False)
+    if 'asesor financiero' in prompt:
+        return ADVICE_TEXT
+    return json.dumps(_interpret_response(prompt), ensure_ascii=False)
+
+
+def _generate_payload(text: str, prompt_tokens: int, finish: bool = True) -> dict:
+    candidate = {'content': {'role': 'model', 'parts': [{'text': text}]}, 'index': 0}
+    if finish:
+        candidate['finishReason'] = 'STOP'
+    output_tokens = max(1, len(text) // 4)
+    return {
+        'candidates': [candidate],
+        'usageMetadata': {
+            'promptTokenCount': prompt_tokens,
+            'candidatesTokenCount': output_tokens,
+            'totalTokenCount': prompt_tokens + output_tokens,
+        },
+        'modelVersion': 'fake-gemini',
+    }
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    config = FakeGeminiConfig()
+    protocol_version = 'HTTP/1.1'
+    _cache_counter = 0
+    _cache_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length)
+        try:
+            body = json.loads(raw_body or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON', 'status': 'INVALID_ARGUMENT'}})
+
+        time.sleep(self.config.sample_latency())
+
+        if random.random() < self.config.error_rate:
+            code = random.choice(self.config.error_codes)
+            return self._send_json(code, {'error': {'code': code, 'message': 'Injected failure', 'status': 'UNAVAILABLE'}})
+
+        path = self.path.split('?')[0]
+        prompt_tokens = max(1, len(raw_body) // 4)
+
+        if path.endswith(':generateContent'):
+            return self._send_json(200, _generate_payload(canned_text(body), prompt_tokens))
+        if path.endswith(':streamGenerateContent'):
+            return self._send_stream(canned_text(body), prompt_tokens)
+        if path.endswith('/cachedContents'):
+            return self._send_json(200, self._cached_content(body))
+
+        self._send_json(404, {'error': {'code': 404, 'message': f'Unknown path {path}', 'status': 'NOT_FOUND'}})
+
+    def _cached_content(self, body: dict) -> dict:
+        with self._cache_lock:
+            FakeGeminiHandler._cache_counter += 1
+            name = f'cachedContents/fake-{FakeGeminiHandler._cache_counter}'
+        return {'name': name, 'model': body.get('model', ''), 'displayName': body.get('displayName', '')}
+
+    def _send_json(self, code: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str, prompt_tokens: int):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        chunks = max(1, self.config.stream_chunks)
+        size = -(-len(text) // chunks)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+        # Spread a second latency sample across the chunks
+        gap = self.config.sample_latency() / len(pieces)
+
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(gap)
+            payload = _generate_payload(piece, prompt_tokens, finish=i == len(pieces) - 1)
+            event = f"data: {json.dumps(payload, ensure_ascii=False)}\r\n\r\n".encode()
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def make_server(host: str, port: int, config: FakeGeminiConfig) -> ThreadingHTTPServer:
+    """Build a threaded fake server; call serve_forever() on the result"""
+    handler = type('ConfiguredFakeGeminiHandler', (FakeGeminiHandler,), {'config': config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,67 @@
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Transaction
+from api.renderers import ORJSONRenderer
+from api.serializers import TransactionSerializer
+
+CATEGORIES = ['Alimentación', 'Transporte', 'Servicios', 'Salud', 'Entretenimiento', 'Salario']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the CPU cost of rendering a page of serialized transactions with '
+        "DRF's JSONRenderer and with ORJSONRenderer. Uses unsaved objects; no database needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Transactions per page')
+        parser.add_argument('--iterations', type=int, default=200, help='Renders timed per renderer')
+
+    def handle(self, *args, **options):
+        rows, iterations = options['rows'], options['iterations']
+        if rows <= 0 or iterations <= 0:
+            raise CommandError('--rows and --iterations must be positive')
+
+        data = {
+            'count': rows,
+            'next': None,
+            'previous': None,
+            'results': TransactionSerializer(self._transactions(rows), many=True).data,
+        }
+
+        results = {}
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            name = type(renderer).__name__
+            size = len(renderer.render(data))
+            seconds = min(timeit.repeat(lambda: renderer.render(data), number=iterations, repeat=3))
+            results[name] = seconds / iterations
+            self.stdout.write(f"{name:<16} {results[name] * 1000:8.3f} ms/page  {size} bytes")
+
+        speedup = results['JSONRenderer'] / results['ORJSONRenderer']
+        self.stdout.write(self.style.SUCCESS(f"ORJSONRenderer is {speedup:.1f}x faster on {rows} row(s)"))
+
+    @staticmethod
+    def _transactions(rows):
+        today = date.today()
+        now = timezone.now()
+        return [
+            Transaction(
+                id=i + 1,
+                date=today - timedelta(days=i % 365),
+                description=f'Movimiento {i}',
+                amount=Decimal(1000 + i * 37 % 90000) / 100,
+                type='income' if i % 10 == 0 else 'expense',
+                category=CATEGORIES[i % len(CATEGORIES)],
+                notes='Pago con tarjeta' if i % 3 == 0 else None,
+                is_recurring=i % 7 == 0,
+                recurring_frequency='monthly' if i % 7 == 0 else None,
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(rows)
+        ]
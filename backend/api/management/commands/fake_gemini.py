@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from api.fake_gemini import FakeGeminiConfig, make_server
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local fake Gemini API with canned responses, configurable latency '
+        'and error rate. Point the backend at it with GEMINI_BASE_URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        parser.add_argument('--latency-ms', type=float, default=800,
+                            help='Median (lognormal) or center (fixed/uniform) latency')
+        parser.add_argument('--latency-spread', type=float, default=0.5,
+                            help='Sigma of the log for lognormal, relative half-width for uniform')
+        parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Fraction of calls answered with an error (0-1)')
+        parser.add_argument('--error-codes', default='503,429',
+                            help='Comma separated HTTP codes used for injected errors')
+        parser.add_argument('--stream-chunks', type=int, default=4)
+
+    def handle(self, *args, **options):
+        config = FakeGeminiConfig(
+            latency_ms=options['latency_ms'],
+            latency_spread=options['latency_spread'],
+            latency_dist=options['latency_dist'],
+            error_rate=options['error_rate'],
+            error_codes=tuple(int(code) for code in options['error_codes'].split(',')),
+            stream_chunks=options['stream_chunks'],
+        )
+        server = make_server(options['host'], options['port'], config)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Gemini listening on http://{options['host']}:{options['port']}/ "
+            f"({config.latency_dist} {config.latency_ms:.0f}ms, error rate {config.error_rate:.0%})"
+        ))
+        self.stdout.write(f"Run the backend with GEMINI_BASE_URL=http://{options['host']}:{options['port']}/")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.advice import AdviceService
+from api.services.gemini import GeminiService
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate and cache health score advice for snapshots of a month that have '
+        'none or whose advice is stale. Meant to run nightly, off peak.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to process as YYYY-MM (default: current month)')
+        parser.add_argument('--max-age-days', type=int, default=settings.ADVICE_MAX_AGE_DAYS,
+                            help='Regenerate advice older than this; 0 only fills missing advice')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Maximum Gemini calls in flight')
+        parser.add_argument('--limit', type=int, help='Process at most this many snapshots')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be generated')
+
+    def handle(self, *args, **options):
+        month = self._parse_month(options['month'])
+        max_age = timedelta(days=options['max_age_days']) if options['max_age_days'] > 0 else None
+        concurrency = max(1, options['concurrency'])
+
+        advice_service = AdviceService()
+        snapshots = advice_service.snapshots_needing_advice(month, max_age)
+        if options['limit']:
+            snapshots = snapshots[:options['limit']]
+        snapshots = list(snapshots)
+
+        self.stdout.write(f"{len(snapshots)} snapshot(s) need advice for {month.strftime('%Y-%m')}")
+        if options['dry_run'] or not snapshots:
+            return
+
+        gemini_service = GeminiService()
+        generated = failed = 0
+
+        # Database work stays on this thread; workers only wait on Gemini
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {}
+            for snapshot in snapshots:
+                metrics_data = advice_service.build_metrics_data(snapshot.user, snapshot.month)
+                future = executor.submit(gemini_service.generate_financial_advice, metrics_data)
+                futures[future] = snapshot
+
+            for future in as_completed(futures):
+                snapshot = futures[future]
+                try:
+                    advice = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Snapshot {snapshot.id} ({snapshot.user.username}): {e}")
+                    continue
+
+                advice_service.save_advice(snapshot, advice)
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {generated} advice(s), {failed} failed"))
+        if failed and not generated:
+            raise CommandError('All advice generation attempts failed')
+
+    def _parse_month(self, value: str | None) -> date:
+        if not value:
+            return date.today().replace(day=1)
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
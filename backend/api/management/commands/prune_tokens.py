@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries in '
+        'small batches, so each transaction holds its locks briefly. Meant to run '
+        'from cron (e.g. nightly).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Tokens deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches')
+        parser.add_argument('--limit', type=int, help='Delete at most this many tokens')
+        parser.add_argument('--dry-run', action='store_true', help='Only count expired tokens')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} expired token(s)")
+            return
+
+        tokens = blacklisted = 0
+        last_id = 0
+        while options['limit'] is None or tokens < options['limit']:
+            size = batch_size if options['limit'] is None else min(batch_size, options['limit'] - tokens)
+
+            # Walk the primary key instead of re-filtering from the start;
+            # expires_at has no index, and expired tokens are the oldest rows
+            ids = list(
+                expired.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                tokens += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {tokens} expired token(s) and {blacklisted} blacklist entr{'y' if blacklisted == 1 else 'ies'}"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import User
+from api.services.categorizer import CategoryClassifier
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the local category classifier from stored transactions. Writes keep '
+        'it up to date afterwards; run once after deploying and after bulk imports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild this username (global tables are left alone)')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        used = CategoryClassifier().rebuild(user)
+        self.stdout.write(self.style.SUCCESS(f"Trained on {used} transaction(s)"))
@@ -0,0 +1,95 @@
+"""
+Prometheus metrics, served in text format at /metrics.
+
+Every gunicorn (or uvicorn) worker is its own process. With
+PROMETHEUS_MULTIPROC_DIR set (entrypoint.sh does it), prometheus_client
+keeps each worker's values in files in that directory and render() merges
+them, so a scrape sees the whole server whichever worker answers it.
+"""
+import hmac
+import ipaddress
+import os
+
+from django.conf import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+from .services.telemetry import LATENCY_BUCKETS
+
+REQUESTS = Counter(
+    'cashmind_http_requests_total', 'HTTP requests by route name',
+    ['route', 'method', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'cashmind_http_request_duration_seconds', 'Request latency by route name',
+    ['route', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+REQUEST_DB_QUERIES = Histogram(
+    'cashmind_http_request_db_queries', 'SQL queries per request by route name',
+    ['route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+REQUEST_DB_SECONDS = Counter(
+    'cashmind_http_request_db_seconds_total', 'Time spent in SQL by route name',
+    ['route'],
+)
+CACHE_REQUESTS = Counter(
+    'cashmind_cache_requests_total', 'In-process cache lookups; hit ratio = hit / (hit + miss)',
+    ['cache', 'result'],
+)
+GEMINI_DURATION = Histogram(
+    'cashmind_gemini_call_duration_seconds', 'Gemini call latency (retries included) by operation',
+    ['operation'],
+    buckets=LATENCY_BUCKETS,
+)
+GEMINI_ERRORS = Counter(
+    'cashmind_gemini_call_errors_total', 'Failed Gemini calls by operation and error',
+    ['operation', 'error'],
+)
+HEALTH_SCORE_DURATION = Histogram(
+    'cashmind_health_score_duration_seconds', 'Time to compute a health score',
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Requests that matched no URL share one label, so scanners can't grow the series
+UNMATCHED_ROUTE = 'unmatched'
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def observe_request(route: str | None, method: str, status: int, duration: float,
+                    db_queries: int, db_time: float) -> None:
+    route = route or UNMATCHED_ROUTE
+    method = method if method in METHODS else 'other'
+    REQUESTS.labels(route, method, str(status)).inc()
+    REQUEST_DURATION.labels(route, method).observe(duration)
+    REQUEST_DB_QUERIES.labels(route).observe(db_queries)
+    REQUEST_DB_SECONDS.labels(route).inc(db_time)
+
+
+def is_internal(request) -> bool:
+    """Whether the caller may read /metrics: a METRICS_ALLOWED_NETWORKS address or the METRICS_TOKEN"""
+    if settings.METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        if hmac.compare_digest(header.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()):
+            return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network.strip(), strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS if network.strip()
+    )
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition text of every worker (or just this process without a multiprocess directory)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,181 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import metrics as prometheus, request_metrics
+from .db_routers import pin_to_primary, start_write_tracking, stop_write_tracking
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin users who wrote during a request to the primary database.
+
+    The router flags every write; afterwards the user's analytics reads skip
+    the replica for DATABASE_REPLICA_PIN_SECONDS, so they see their own
+    changes despite replication lag. Does nothing without a replica.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = start_write_tracking()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = stop_write_tracking(token)
+
+        if wrote:
+            self._pin_writer(request)
+        return response
+
+    async def __acall__(self, request):
+        # The router's flag set in sync_to_async threads is copied back to this context
+        token = start_write_tracking()
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = stop_write_tracking(token)
+
+        if wrote:
+            await sync_to_async(self._pin_writer)(request)
+        return response
+
+    @staticmethod
+    def _pin_writer(request) -> None:
+        # DRF copies the token-authenticated user onto the Django request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time each request and say where the time went.
+
+    Counts and times the SQL of every database connection, the Gemini calls
+    (recorded by the gateway) and response rendering, and reports them in a
+    Server-Timing header and a JSON log line. Requests slower than
+    SLOW_REQUEST_MS are logged as warnings together with their statements,
+    grouped so repeated queries (N+1) stand out. The same figures feed the
+    per-route Prometheus metrics.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS:
+            return self.get_response(request)
+
+        with request_metrics.collect() as metrics:
+            with ExitStack() as stack:
+                self._time_queries(stack)
+                response = self.get_response(request)
+            total = self._finish(metrics)
+
+        return self._report(request, response, metrics, total)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS:
+            return await self.get_response(request)
+
+        with request_metrics.collect() as metrics:
+            # Connections are per thread: wrap those of the thread the
+            # request's ORM calls run in (thread-sensitive sync_to_async)
+            stack = ExitStack()
+            await sync_to_async(self._time_queries)(stack)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+            total = self._finish(metrics)
+
+        return self._report(request, response, metrics, total)
+
+    @staticmethod
+    def _time_queries(stack: ExitStack) -> None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(request_metrics.query_timer))
+
+    @staticmethod
+    def _finish(metrics) -> float:
+        finished = time.perf_counter()
+        if metrics.view_started is not None:
+            # Rendering happens after the view returns; it is reported apart
+            metrics.view_time = max(finished - metrics.view_started - metrics.serialize_time, 0.0)
+        return finished - metrics.started
+
+    def _report(self, request, response, metrics, total: float):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else None
+        response['Server-Timing'] = self._server_timing(metrics, total)
+        prometheus.observe_request(route, request.method, response.status_code, total,
+                                   metrics.db_queries, metrics.db_time)
+        self._log(request, response, route, metrics, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request_metrics.current()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    @staticmethod
+    def _server_timing(metrics, total: float) -> str:
+        entries = [
+            ('db', metrics.db_time, f'{metrics.db_queries} queries'),
+            ('gemini', metrics.gemini_time, f'{metrics.gemini_calls} calls'),
+            ('serialize', metrics.serialize_time, None),
+            ('view', metrics.view_time, None),
+            ('total', total, None),
+        ]
+        return ', '.join(
+            f'{name};dur={seconds * 1000:.1f}' + (f';desc="{desc}"' if desc else '')
+            for name, seconds, desc in entries
+        )
+
+    @staticmethod
+    def _log(request, response, route, metrics, total: float) -> None:
+        user = getattr(request, 'user', None)
+        line = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'duration_ms': round(total * 1000, 1),
+            'db_queries': metrics.db_queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'gemini_calls': metrics.gemini_calls,
+            'gemini_ms': round(metrics.gemini_time * 1000, 1),
+            'serialize_ms': round(metrics.serialize_time * 1000, 1),
+            'view_ms': round(metrics.view_time * 1000, 1),
+        }
+
+        if settings.SLOW_REQUEST_MS and total * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(json.dumps({**line, 'event': 'slow_request', 'sql': metrics.slowest_statements()}))
+        else:
+            logger.info(json.dumps(line))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_rename_budget_adherence_to_expense_diversification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('income', 'Ingreso'), ('expense', 'Gasto')], max_length=10)),
+                ('category', models.CharField(max_length=50)),
+                ('token', models.CharField(blank=True, max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'category_counts',
+                'constraints': [models.UniqueConstraint(fields=('user', 'type', 'category', 'token'), name='unique_user_category_count'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('type', 'category', 'token'), name='unique_global_category_count')],
+            },
+        ),
+    ]
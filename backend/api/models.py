@@ -1,5 +1,9 @@
+from datetime import date, timedelta
+
 from django.db import models
+from django.db.models import Case, OuterRef, Subquery, Sum, Value, When
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 class InvitationCode(models.Model):
@@ -141,6 +145,29 @@ class Transaction(models.Model):
         return f"{self.description} - ${self.amount} ({self.type})"
 
 
+class BudgetQuerySet(models.QuerySet):
+    def with_spent(self):
+        """
+        Annotate `spent`: the owner's expenses in the budget's category since
+        the start of its current period, computed in the same query (None
+        when there are none).
+        """
+        today = timezone.now().date()
+        since = Case(
+            *[When(period=period, then=Value(Budget.period_start(period, today)))
+              for period, _ in Budget.PERIOD_CHOICES],
+            output_field=models.DateField(),
+        )
+        expenses = Transaction.objects.filter(
+            user=OuterRef('user'),
+            type='expense',
+            category=OuterRef('category'),
+            date__gte=OuterRef('spent_since'),
+        ).order_by().values('user').annotate(total=Sum('amount')).values('total')
+
+        return self.annotate(spent_since=since, spent=Subquery(expenses))
+
+
 class Budget(models.Model):
     """Budget model for expense tracking"""
     PERIOD_CHOICES = [
@@ -157,6 +184,8 @@ class Budget(models.Model):
     color = models.CharField(max_length=7, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BudgetQuerySet.as_manager()
+
     class Meta:
         db_table = 'budgets'
         unique_together = ['user', 'category', 'period']
@@ -165,6 +194,15 @@ class Budget(models.Model):
     def __str__(self):
         return f"{self.name} - ${self.limit} ({self.period})"
 
+    @staticmethod
+    def period_start(period: str, today: date) -> date:
+        """First day of the weekly, monthly or yearly period containing today"""
+        if period == 'weekly':
+            return today - timedelta(days=today.weekday())
+        if period == 'monthly':
+            return today.replace(day=1)
+        return today.replace(month=1, day=1)
+
 
 class Goal(models.Model):
     """Goal model for savings targets"""
@@ -231,3 +269,36 @@ class HealthScoreSnapshot(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.month.strftime('%Y-%m')} - {self.overall_status}"
+
+
+class CategoryCount(models.Model):
+    """
+    Token counts behind the local transaction category classifier.
+
+    One row per owner, transaction type, category and description token,
+    counting the owner's transactions that have the token; the row with an
+    empty token counts the transactions themselves. Rows with a null user
+    add up every user's. Writers bump rows with F() increments, so
+    concurrent writers only touch the rows of their own words.
+    """
+    DOCS = ''
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='category_counts')
+    type = models.CharField(max_length=10, choices=Transaction.TYPE_CHOICES)
+    category = models.CharField(max_length=50)
+    token = models.CharField(max_length=255, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'category_counts'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'type', 'category', 'token'], name='unique_user_category_count'),
+            models.UniqueConstraint(
+                fields=['type', 'category', 'token'], condition=models.Q(user__isnull=True),
+                name='unique_global_category_count'
+            ),
+        ]
+
+    def __str__(self):
+        owner = self.user.username if self.user_id else 'global'
+        return f"{owner} - {self.type} - {self.category} - {self.token or '(docs)'}: {self.count}"
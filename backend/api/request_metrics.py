@@ -0,0 +1,95 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Metrics of the request being served; None outside a request
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+# Distinct statements kept per request for the slow-request dump
+MAX_SQL_STATEMENTS = 200
+
+
+@dataclass
+class RequestMetrics:
+    """Where one request spent its time. Durations are in seconds."""
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_time: float = 0.0
+    gemini_calls: int = 0
+    gemini_time: float = 0.0
+    serialize_time: float = 0.0
+    view_time: float = 0.0
+    view_started: float | None = None
+    # sql -> [executions, seconds]
+    statements: dict = field(default_factory=dict)
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.db_queries += 1
+        self.db_time += duration
+        entry = self.statements.get(sql)
+        if entry is None:
+            if len(self.statements) >= MAX_SQL_STATEMENTS:
+                return
+            entry = self.statements[sql] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += duration
+
+    def slowest_statements(self) -> list[dict]:
+        """Statements by total time spent, with how often each one ran (N+1s show up as count > 1)"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql, 'count': count, 'ms': round(seconds * 1000, 1)}
+            for sql, (count, seconds) in ranked
+        ]
+
+
+def current() -> RequestMetrics | None:
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collect the metrics of the code inside the block (one request)"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_gemini_call(duration: float) -> None:
+    """Count a model call against the current request, if any"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.gemini_calls += 1
+        metrics.gemini_time += duration
+
+
+@contextmanager
+def timing(attribute: str):
+    """Add the block's wall time to an attribute of the current request's metrics"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, attribute, getattr(metrics, attribute) + time.perf_counter() - started)
+
+
+def query_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook feeding the current request's metrics"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
@@ -84,27 +84,11 @@ class BudgetSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'spent']
 
     def get_spent(self, obj):
-        from django.db.models import Sum
-        from django.utils import timezone
-        from datetime import timedelta
-
-        now = timezone.now()
-
-        if obj.period == 'weekly':
-            start_date = now - timedelta(days=now.weekday())
-        elif obj.period == 'monthly':
-            start_date = now.replace(day=1)
-        else:  # yearly
-            start_date = now.replace(month=1, day=1)
-
-        total = Transaction.objects.filter(
-            user=obj.user,
-            type='expense',
-            category=obj.category,
-            date__gte=start_date.date()
-        ).aggregate(total=Sum('amount'))['total']
-
-        return float(total or 0)
+        # List and detail views annotate it (Budget.objects.with_spent());
+        # instances just created or updated need one query
+        if not hasattr(obj, 'spent'):
+            obj.spent = Budget.objects.with_spent().filter(pk=obj.pk).values_list('spent', flat=True).first()
+        return float(obj.spent or 0)
 
 
 class GoalSerializer(serializers.ModelSerializer):
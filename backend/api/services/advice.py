@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from api.models import HealthScoreSnapshot
+from api.services.health_score import HealthScoreService
+
+
+class AdviceService:
+    """Shared logic for the health score advice cached on each snapshot"""
+
+    def build_metrics_data(self, user, month: date) -> dict:
+        """
+        Compute the metrics the advice prompt is based on.
+
+        Args:
+            user: Owner of the snapshot
+            month: First day of the evaluated month
+
+        Returns:
+            Dict with value and status per metric plus overall_status
+        """
+        result = HealthScoreService().calculate_health_score(user, month)
+
+        return {
+            'savings_rate': {
+                'value': float(result.savings_rate.value),
+                'status': result.savings_rate.status,
+            },
+            'fixed_expenses': {
+                'value': float(result.fixed_expenses.value),
+                'status': result.fixed_expenses.status,
+            },
+            'expense_diversification': {
+                'value': float(result.expense_diversification.value),
+                'status': result.expense_diversification.status,
+            },
+            'trend': {
+                'value': float(result.trend.value),
+                'status': result.trend.status,
+            },
+            'overall_status': result.overall_status,
+        }
+
+    def save_advice(self, snapshot: HealthScoreSnapshot, advice: str) -> None:
+        """
+        Cache advice on the snapshot.
+
+        Only the advice columns are written: the instance may have been loaded
+        long before (a Gemini call, a batch run) and its scores be outdated.
+        """
+        snapshot.cached_advice = advice
+        snapshot.advice_generated_at = timezone.now()
+        snapshot.save(update_fields=['cached_advice', 'advice_generated_at', 'updated_at'])
+
+    def snapshots_needing_advice(self, month: date, max_age: timedelta | None = None) -> QuerySet:
+        """
+        Snapshots for a month without cached advice, or whose advice is older than max_age.
+
+        Args:
+            month: First day of the month to look at
+            max_age: Advice generated longer ago than this is stale; None keeps any advice
+
+        Returns:
+            QuerySet of HealthScoreSnapshot with the user selected
+        """
+        missing = Q(cached_advice__isnull=True) | Q(cached_advice='')
+        if max_age is not None:
+            missing |= Q(advice_generated_at__lt=timezone.now() - max_age)
+
+        return (
+            HealthScoreSnapshot.objects
+            .filter(missing, month=month, user__is_active=True)
+            .select_related('user')
+            .order_by('id')
+        )
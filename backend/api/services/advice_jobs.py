@@ -0,0 +1,113 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from api.models import HealthScoreSnapshot
+from api.services.advice import AdviceService
+from api.services.gemini import GeminiService
+
+logger = logging.getLogger(__name__)
+
+# How long a failed job is reported to status polls
+FAILURE_TTL = 300
+# How long a job counts as running if its worker never reports back (killed)
+PENDING_TTL = 180
+
+
+def _pending_key(snapshot_id: int) -> str:
+    return f'advice-job:{snapshot_id}'
+
+
+def _failure_key(snapshot_id: int) -> str:
+    return f'advice-job-failed:{snapshot_id}'
+
+
+class AdviceJobQueue:
+    """
+    Background generation of health score advice.
+
+    Jobs run on a small thread pool inside the worker process, so the request
+    that asked for advice returns at once. Which snapshots have a job in
+    flight, and which failed, is kept in the default cache (shared by the
+    workers through CACHE_DIR), so requests for a snapshot with a job in
+    flight share it whichever worker they reach, and any worker can answer
+    status polls. With max_workers=0 jobs run inline (tests, debugging).
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='advice') if max_workers else None
+
+    def submit(self, snapshot_id: int, use_cache: bool = True) -> bool:
+        """
+        Queue advice generation for a snapshot.
+
+        Returns:
+            False if a job for the snapshot was already running (coalesced)
+        """
+        if not cache.add(_pending_key(snapshot_id), True, PENDING_TTL):
+            return False
+        cache.delete(_failure_key(snapshot_id))
+
+        if self._executor is None:
+            self._run(snapshot_id, use_cache)
+        else:
+            self._executor.submit(self._run, snapshot_id, use_cache)
+        return True
+
+    def is_pending(self, snapshot_id: int) -> bool:
+        return cache.get(_pending_key(snapshot_id)) is not None
+
+    def failure(self, snapshot_id: int) -> str | None:
+        """Error of the last job for the snapshot, if it failed recently"""
+        return cache.get(_failure_key(snapshot_id))
+
+    def _run(self, snapshot_id: int, use_cache: bool) -> None:
+        error = None
+        try:
+            self._generate(snapshot_id, use_cache)
+        except Exception as e:
+            logger.error(f"Advice generation for snapshot {snapshot_id} failed: {e}")
+            error = str(e)
+        finally:
+            if self._executor is not None:
+                # Pool threads are not request threads; release their connections
+                connections.close_all()
+
+        if error is not None:
+            cache.set(_failure_key(snapshot_id), error, FAILURE_TTL)
+        cache.delete(_pending_key(snapshot_id))
+
+    def _generate(self, snapshot_id: int, use_cache: bool) -> None:
+        snapshot = HealthScoreSnapshot.objects.select_related('user').get(pk=snapshot_id)
+        advice_service = AdviceService()
+        metrics_data = advice_service.build_metrics_data(snapshot.user, snapshot.month)
+        advice = GeminiService().generate_financial_advice(metrics_data, use_cache=use_cache)
+        advice_service.save_advice(snapshot, advice)
+
+
+_queue: AdviceJobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_advice_jobs() -> AdviceJobQueue:
+    """Get the process-wide advice job queue, created on first use"""
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = AdviceJobQueue(settings.ADVICE_JOB_WORKERS)
+    return _queue
+
+
+def reset_advice_jobs() -> None:
+    """Drop the process-wide queue (used by tests and after settings changes)"""
+    global _queue
+
+    with _queue_lock:
+        _queue = None
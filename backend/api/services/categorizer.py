@@ -0,0 +1,201 @@
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import DatabaseError, transaction
+from django.db.models import F, Q
+
+from api.models import CategoryCount, Transaction
+from .cache import LRUCache
+from .chat_parser import normalize_message
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z]{2,}')
+STOPWORDS = {
+    'de', 'del', 'el', 'la', 'los', 'las', 'en', 'al', 'por', 'para', 'con',
+    'un', 'una', 'mi', 'mis', 'su', 'sus', 'y', 'o', 'a',
+}
+
+# A user's own history counts this many times as much as everyone else's
+USER_WEIGHT = 3
+
+# The global tables change with every user's writes; reading them a little
+# stale is fine for suggestions
+global_counts_cache = LRUCache(max_size=4, ttl=60, name='category_global_counts')
+
+
+def tokenize(description: str) -> set[str]:
+    """Distinct accent-folded words of a description, without stopwords"""
+    return set(TOKEN_PATTERN.findall(normalize_message(description or ''))) - STOPWORDS
+
+
+class CategoryClassifier:
+    """
+    Multinomial naive Bayes over transaction descriptions.
+
+    Trained incrementally from each user's transactions (learn/forget on
+    every write) into per-user and global CategoryCount rows, and blends
+    both when suggesting, so new users still get global suggestions.
+    """
+
+    def learn(self, user, type: str, description: str, category: str, weight: int = 1) -> None:
+        """
+        Add (or with weight=-1 remove) one description -> category example.
+
+        Suggestions are best effort: a database error is logged and
+        swallowed, since the transaction it comes from is already saved
+        (rebuild() repairs any drift).
+
+        Args:
+            user: Owner of the transaction
+            type: 'income' or 'expense'
+            description: Transaction description
+            category: Category the user chose
+            weight: 1 to learn, -1 to forget
+        """
+        tokens = tokenize(description)
+        if not tokens or not category:
+            return
+
+        keys = [CategoryCount.DOCS, *sorted(tokens)]
+        try:
+            with transaction.atomic():
+                if weight > 0:
+                    # Missing rows start at zero so one increment covers new and existing ones
+                    CategoryCount.objects.bulk_create([
+                        CategoryCount(user=owner, type=type, category=category, token=token)
+                        for owner in (user, None) for token in keys
+                    ], ignore_conflicts=True)
+                CategoryCount.objects.filter(
+                    Q(user=user) | Q(user__isnull=True), type=type, category=category, token__in=keys
+                ).update(count=F('count') + weight)
+        except DatabaseError as e:
+            logger.warning(f"Category classifier not updated for user {user.pk}: {e}")
+            return
+
+        global_counts_cache.delete(type)
+
+    def forget(self, user, type: str, description: str, category: str) -> None:
+        """Undo learn() for a transaction that was deleted or edited"""
+        self.learn(user, type, description, category, weight=-1)
+
+    def suggest(self, user, description: str, type: str = 'expense', limit: int = 3) -> list[dict]:
+        """
+        Most likely categories for a description.
+
+        Returns:
+            Up to `limit` dicts {category, probability}, best first; empty if
+            no word of the description has been seen before
+        """
+        tokens = tokenize(description)
+        if not tokens:
+            return []
+
+        user_counts = self._user_counts(user, type)
+        global_counts = self._global_counts(type)
+
+        categories = set(user_counts) | set(global_counts)
+        blended = {}
+        vocabulary = set()
+        for category in categories:
+            mine = user_counts.get(category, {})
+            theirs = global_counts.get(category, {})
+            token_counts = defaultdict(int)
+            for token, count in theirs.get('tokens', {}).items():
+                token_counts[token] += count
+            for token, count in mine.get('tokens', {}).items():
+                token_counts[token] += USER_WEIGHT * count
+            vocabulary.update(token_counts)
+            blended[category] = (
+                USER_WEIGHT * mine.get('docs', 0) + theirs.get('docs', 0),
+                USER_WEIGHT * mine.get('total', 0) + theirs.get('total', 0),
+                token_counts,
+            )
+
+        known = tokens & vocabulary
+        if not known:
+            return []
+
+        total_docs = sum(docs for docs, _, _ in blended.values())
+        scores = {}
+        for category, (docs, total, token_counts) in blended.items():
+            # Laplace smoothing on both the prior and the token likelihoods
+            score = math.log((docs + 1) / (total_docs + len(blended)))
+            for token in known:
+                score += math.log((token_counts.get(token, 0) + 1) / (total + len(vocabulary)))
+            scores[category] = score
+
+        best = max(scores.values())
+        weights = {category: math.exp(score - best) for category, score in scores.items()}
+        norm = sum(weights.values())
+        ranked = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {'category': category, 'probability': round(weight / norm, 3)}
+            for category, weight in ranked
+        ]
+
+    def rebuild(self, user=None) -> int:
+        """
+        Retrain from scratch from stored transactions.
+
+        Args:
+            user: Only rebuild this user's tables (the global ones are left
+                alone); None rebuilds every user and the global tables
+
+        Returns:
+            Number of transactions used
+        """
+        transactions = Transaction.objects.order_by()
+        if user is not None:
+            transactions = transactions.filter(user=user)
+
+        counts = Counter()
+        used = 0
+        for user_id, type, description, category in transactions.values_list(
+            'user_id', 'type', 'description', 'category'
+        ).iterator():
+            tokens = tokenize(description)
+            if not tokens or not category:
+                continue
+            used += 1
+            for owner_id in ((user_id,) if user is not None else (user_id, None)):
+                for token in (CategoryCount.DOCS, *tokens):
+                    counts[(owner_id, type, category, token)] += 1
+
+        with transaction.atomic():
+            existing = CategoryCount.objects.all() if user is None else CategoryCount.objects.filter(user=user)
+            existing.delete()
+            CategoryCount.objects.bulk_create([
+                CategoryCount(user_id=user_id, type=type, category=category, token=token, count=count)
+                for (user_id, type, category, token), count in counts.items()
+            ], batch_size=1000)
+
+        global_counts_cache.clear()
+        return used
+
+    @staticmethod
+    def _user_counts(user, type: str) -> dict:
+        return CategoryClassifier._tables(CategoryCount.objects.filter(user=user, type=type))
+
+    @staticmethod
+    def _global_counts(type: str) -> dict:
+        counts = global_counts_cache.get(type)
+        if counts is None:
+            counts = CategoryClassifier._tables(CategoryCount.objects.filter(user__isnull=True, type=type))
+            global_counts_cache.set(type, counts)
+        return counts
+
+    @staticmethod
+    def _tables(rows) -> dict:
+        """Rows as category -> {"docs": n, "total": n, "tokens": {token: n}}"""
+        counts = {}
+        for category, token, count in rows.filter(count__gt=0).values_list('category', 'token', 'count'):
+            entry = counts.setdefault(category, {'docs': 0, 'total': 0, 'tokens': {}})
+            if token == CategoryCount.DOCS:
+                entry['docs'] = count
+            else:
+                entry['tokens'][token] = count
+                entry['total'] += count
+        return {category: entry for category, entry in counts.items() if entry['docs'] > 0}
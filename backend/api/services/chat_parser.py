@@ -0,0 +1,240 @@
+import re
+import unicodedata
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+
+EXPENSE_VERBS = re.compile(r'\b(gaste|pague|compre|abone)\b')
+INCOME_VERBS = re.compile(r'\b(cobre|recibi|me pagaron|me depositaron|me transfirieron)\b')
+# Questions and negations need real understanding, leave them to the model
+AMBIGUOUS_WORDS = re.compile(r'\b(no|cuanto|cuanta|cuantos|cuando|donde|que|como|si|pero|y)\b')
+
+# The fast path always books today in pesos; any other date or currency goes to the model
+DATE_WORDS = re.compile(
+    r'\b(ayer|anteayer|anoche|manana|semana|finde|mes|ano|pasado|pasada'
+    r'|lunes|martes|miercoles|jueves|viernes|sabado|domingo'
+    r'|enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)\b'
+    r'|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b'
+)
+CURRENCY_WORDS = re.compile(r'\b(dolar|dolares|usd|u\$s|us\$|euro|euros|eur|reales?)(?!\w)')
+
+# A number is an amount only with a money cue ("$500", "5 mil", "500 pesos") or
+# right after the verb and before a preposition ("gaste 500 en ..."); otherwise
+# "compre 2 zapatillas" would book $2
+VERB_BEFORE_AMOUNT = re.compile(rf'(?:{EXPENSE_VERBS.pattern}|{INCOME_VERBS.pattern})\s+$')
+AFTER_VERB_AMOUNT = re.compile(r'\s*(?:$|(?:en|de|por|para|al)\b)')
+PESOS_AFTER_AMOUNT = re.compile(r'\s*pesos?\b')
+
+AMOUNT_PATTERN = re.compile(
+    r'\$?\s*(\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?)\s*(k|mil|lucas?)?\b'
+)
+
+GREETING_PATTERN = re.compile(r'^(hola|buenas|buen dia|buenos dias|buenas tardes|buenas noches)\W*$')
+THANKS_PATTERN = re.compile(r'^(gracias|muchas gracias|mil gracias|genial gracias)\W*$')
+
+# keyword -> (description, category)
+EXPENSE_LEXICON = {
+    'super': ('Supermercado', 'food'),
+    'supermercado': ('Supermercado', 'food'),
+    'almacen': ('Almacen', 'food'),
+    'verduleria': ('Verduleria', 'food'),
+    'carniceria': ('Carniceria', 'food'),
+    'panaderia': ('Panaderia', 'food'),
+    'restaurante': ('Restaurante', 'food'),
+    'delivery': ('Delivery', 'food'),
+    'comida': ('Comida', 'food'),
+    'almuerzo': ('Almuerzo', 'food'),
+    'cena': ('Cena', 'food'),
+    'nafta': ('Nafta', 'transportation'),
+    'combustible': ('Combustible', 'transportation'),
+    'uber': ('Uber', 'transportation'),
+    'taxi': ('Taxi', 'transportation'),
+    'colectivo': ('Colectivo', 'transportation'),
+    'sube': ('SUBE', 'transportation'),
+    'peaje': ('Peaje', 'transportation'),
+    'estacionamiento': ('Estacionamiento', 'transportation'),
+    'alquiler': ('Alquiler', 'housing'),
+    'expensas': ('Expensas', 'housing'),
+    'luz': ('Luz', 'utilities'),
+    'agua': ('Agua', 'utilities'),
+    'internet': ('Internet', 'utilities'),
+    'celular': ('Celular', 'utilities'),
+    'telefono': ('Telefono', 'utilities'),
+    'farmacia': ('Farmacia', 'healthcare'),
+    'medico': ('Medico', 'healthcare'),
+    'remedios': ('Remedios', 'healthcare'),
+    'dentista': ('Dentista', 'healthcare'),
+    'cine': ('Cine', 'entertainment'),
+    'netflix': ('Netflix', 'entertainment'),
+    'spotify': ('Spotify', 'entertainment'),
+    'ropa': ('Ropa', 'shopping'),
+    'zapatillas': ('Zapatillas', 'shopping'),
+    'curso': ('Curso', 'education'),
+    'libros': ('Libros', 'education'),
+    'gimnasio': ('Gimnasio', 'personal'),
+    'gym': ('Gimnasio', 'personal'),
+    'peluqueria': ('Peluqueria', 'personal'),
+}
+
+INCOME_LEXICON = {
+    'sueldo': ('Sueldo', 'salary'),
+    'salario': ('Sueldo', 'salary'),
+    'aguinaldo': ('Aguinaldo', 'bonus'),
+    'bono': ('Bono', 'bonus'),
+    'freelance': ('Freelance', 'freelance'),
+    'alquiler': ('Alquiler', 'rental'),
+    'reintegro': ('Reintegro', 'refund'),
+    'devolucion': ('Devolucion', 'refund'),
+}
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, strip accents and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', message.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def parse_amount(number: str, multiplier: str | None) -> Decimal | None:
+    """Parse an Argentine-formatted amount ("50.000", "1.500,50", "5 mil")"""
+    if re.fullmatch(r'\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?', number):
+        number = number.replace('.', '').replace(',', '.')
+    else:
+        number = number.replace(',', '.')
+
+    try:
+        amount = Decimal(number)
+    except InvalidOperation:
+        return None
+
+    if multiplier:
+        amount *= 1000
+    return amount if amount > 0 else None
+
+
+def fold_message(message: str) -> str:
+    """
+    Canonical form of a message for cache keys.
+
+    Folds case, accents, whitespace, trailing punctuation and amount formats,
+    so "Gasté $1.500 en el super!" and "gaste 1500 en el super" are equal.
+    """
+    def fold_amount(match):
+        amount = parse_amount(*match.groups())
+        if amount is None:
+            return match.group(0)
+        return f" {amount.normalize():f} "
+
+    text = AMOUNT_PATTERN.sub(fold_amount, normalize_message(message))
+    return re.sub(r'\s+', ' ', text).strip(' .!')
+
+
+def format_amount(amount: Decimal) -> str:
+    """Format like the model responses: $50,000 / $1,500.50"""
+    if amount == amount.to_integral_value():
+        return f"${int(amount):,}"
+    return f"${amount:,.2f}"
+
+
+def _json_number(amount: Decimal) -> int | float:
+    return int(amount) if amount == amount.to_integral_value() else float(amount)
+
+
+def _is_money(text: str, match: re.Match) -> bool:
+    """Whether an AMOUNT_PATTERN match is bound to a money cue (see VERB_BEFORE_AMOUNT)"""
+    if match.group(0).lstrip().startswith('$') or match.group(2):
+        return True
+    rest = text[match.end():]
+    if PESOS_AFTER_AMOUNT.match(rest):
+        return True
+    return bool(VERB_BEFORE_AMOUNT.search(text[:match.start(1)]) and AFTER_VERB_AMOUNT.match(rest))
+
+
+def _match_lexicon(text: str, lexicon: dict) -> tuple[str, str] | None:
+    matches = {
+        lexicon[word]
+        for word in re.findall(r'[a-z]+', text)
+        if word in lexicon
+    }
+    if len({category for _, category in matches}) != 1:
+        return None
+    return sorted(matches)[0]
+
+
+def interpret_locally(message: str, context: str = None, collected_data: dict = None) -> dict | None:
+    """
+    Interpret simple chat messages without calling the model.
+
+    Handles greetings, thanks and one-shot expense/income messages such as
+    "Gasté 500 en el super" or "Cobré 50.000 de sueldo". Returns None whenever
+    the message is not clearly one of those, so the caller falls back to
+    ChatService.interpret_message's model path.
+
+    Returns:
+        dict | None: {intent, extractedData, missingFields, response, isComplete}
+    """
+    # Mid-flow messages depend on what was already collected
+    if context or collected_data:
+        return None
+
+    text = normalize_message(message)
+
+    if GREETING_PATTERN.match(text):
+        return {
+            'intent': 'greeting',
+            'extractedData': None,
+            'missingFields': [],
+            'response': 'Hola! Soy tu asistente de CashMind. Contame un gasto o un ingreso y lo registro.',
+            'isComplete': True,
+        }
+
+    if THANKS_PATTERN.match(text):
+        return {
+            'intent': 'thanks',
+            'extractedData': None,
+            'missingFields': [],
+            'response': 'De nada! Cualquier cosa, aca estoy.',
+            'isComplete': True,
+        }
+
+    if '?' in text or AMBIGUOUS_WORDS.search(text):
+        return None
+    if DATE_WORDS.search(text) or CURRENCY_WORDS.search(text):
+        return None
+
+    is_expense = bool(EXPENSE_VERBS.search(text))
+    is_income = bool(INCOME_VERBS.search(text))
+    if is_expense == is_income:
+        return None
+
+    amounts = list(AMOUNT_PATTERN.finditer(text))
+    if len(amounts) != 1 or not _is_money(text, amounts[0]):
+        return None
+    amount = parse_amount(*amounts[0].groups())
+    if amount is None:
+        return None
+
+    match = _match_lexicon(text, EXPENSE_LEXICON if is_expense else INCOME_LEXICON)
+    if match is None:
+        return None
+    description, category = match
+
+    if is_expense:
+        intent = 'create_expense'
+        response = f"Perfecto! Voy a registrar un gasto de {format_amount(amount)} en {description}. Confirmas?"
+    else:
+        intent = 'create_income'
+        response = f"Genial! Registro tu ingreso de {format_amount(amount)} como {description}. Confirmas?"
+
+    return {
+        'intent': intent,
+        'extractedData': {
+            'amount': _json_number(amount),
+            'description': description,
+            'category': category,
+            'date': date.today().strftime('%Y-%m-%d'),
+        },
+        'missingFields': [],
+        'response': response,
+        'isComplete': True,
+    }
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from django.conf import settings
+from google import genai
+from google.genai import types
+
+
+_client: genai.Client | None = None
+_client_pid: int | None = None
+_lock = threading.Lock()
+
+# Async clients per event loop: httpx async connections can't be shared
+# between loops
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _http_options(max_connections: int) -> types.HttpOptions:
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+    )
+    return types.HttpOptions(
+        # Empty in production; set to a local fake server for load tests
+        base_url=settings.GEMINI_BASE_URL or None,
+        client_args={'limits': limits},
+        async_client_args={'limits': limits},
+    )
+
+
+def get_client() -> genai.Client:
+    """
+    Get the process-wide Gemini client.
+
+    The client is created lazily on first use and reused by every service, so
+    its HTTP connection pool (and the TLS sessions in it) survive across
+    requests. It is keyed on the process id: a worker forked from a process
+    that already built a client gets a fresh one instead of sharing sockets.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = genai.Client(
+                api_key=settings.GOOGLE_GEMINI_API_KEY,
+                http_options=_http_options(settings.GEMINI_MAX_CONNECTIONS),
+            )
+            _client_pid = pid
+
+    return _client
+
+
+def get_async_client():
+    """
+    Get the async Gemini client (`client.aio`) for the running event loop.
+
+    Under ASGI the worker runs one loop, so this is a single pooled client
+    sized by GEMINI_ASYNC_MAX_CONCURRENCY. Async views served through WSGI
+    get a new loop per request, and with it a new client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = genai.Client(
+            api_key=settings.GOOGLE_GEMINI_API_KEY,
+            http_options=_http_options(settings.GEMINI_ASYNC_MAX_CONCURRENCY),
+        ).aio
+        _async_clients[loop] = client
+    return client
+
+
+def reset_client() -> None:
+    """Drop the process-wide client (used by tests and after settings changes)"""
+    global _client, _client_pid
+
+    with _lock:
+        _client = None
+        _client_pid = None
+        _async_clients.clear()
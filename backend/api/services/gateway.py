@@ -0,0 +1,407 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+import httpx
+from django.conf import settings
+from google.genai import errors as genai_errors
+
+from api import metrics
+from api.request_metrics import record_gemini_call
+from .telemetry import error_label, model_metrics, payload_bytes, response_text_bytes, usage_counts
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# A call is not started with less time than this left before its deadline
+MIN_CALL_SECONDS = 1.0
+
+
+class GeminiUnavailable(Exception):
+    """Raised when a model call is refused without reaching the provider"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Errors worth retrying: timeouts, connection failures, throttling and 5xx"""
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the provider is degraded.
+
+    Opens after `threshold` consecutive transient failures, rejects calls for
+    `cooldown` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return 'open'
+        return 'half_open'
+
+    def admit(self) -> str | None:
+        """
+        'call' when closed, 'trial' for the single half-open probe, None when rejected.
+
+        The permit must be handed back with release() once the call is over,
+        whichever way it ends, or a trial that never reports would keep the
+        breaker half-open and rejecting forever.
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return 'call'
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return 'trial'
+            return None
+
+    def release(self, permit: str) -> None:
+        """Free the trial slot of a call that ended without recording an outcome"""
+        if permit == 'trial':
+            with self._lock:
+                self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class GeminiGateway:
+    """
+    Single entry point for every Gemini call in the process.
+
+    Adds a per-attempt timeout and an overall deadline, jittered exponential
+    retries on transient errors, a semaphore bounding concurrent calls and a
+    circuit breaker, and records every call in the model call metrics. Each
+    gunicorn worker has its own instance. Async calls (acall) share the
+    breaker and metrics but are bounded per event loop by
+    GEMINI_ASYNC_MAX_CONCURRENCY instead of the thread semaphore.
+    """
+
+    def __init__(self):
+        self.timeout = settings.GEMINI_TIMEOUT
+        self.deadline = settings.GEMINI_DEADLINE
+        self.max_retries = settings.GEMINI_MAX_RETRIES
+        self.backoff = settings.GEMINI_RETRY_BACKOFF
+        self.acquire_timeout = settings.GEMINI_QUEUE_TIMEOUT
+        self.semaphore = threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+        self.async_concurrency = settings.GEMINI_ASYNC_MAX_CONCURRENCY
+        self._async_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.breaker = CircuitBreaker(
+            threshold=settings.GEMINI_BREAKER_THRESHOLD,
+            cooldown=settings.GEMINI_BREAKER_COOLDOWN,
+        )
+
+    def new_deadline(self) -> float:
+        """
+        Deadline (time.monotonic()) for an operation made of several calls.
+
+        Passed as `deadline` to each of them (e.g. the request, then the JSON
+        re-prompt), the calls share GEMINI_DEADLINE instead of each getting
+        its own, so the operation ends before the app server's timeout.
+        """
+        return time.monotonic() + self.deadline
+
+    def call(self, method: Callable, operation: str = 'other', deadline: float | None = None, **kwargs):
+        """
+        Run a blocking SDK call (e.g. client.models.generate_content).
+
+        `operation` labels the call in the model call metrics. `deadline`
+        (see new_deadline) caps the call's own GEMINI_DEADLINE; with less
+        than MIN_CALL_SECONDS left the call is refused (GeminiUnavailable).
+        """
+        started = time.monotonic()
+        try:
+            result = self._call(method, kwargs, self._deadline_at(started, deadline))
+        except Exception as e:
+            self._record(operation, kwargs, started, error=e)
+            raise
+
+        self._record(operation, kwargs, started, response=result,
+                     response_bytes=response_text_bytes(result))
+        return result
+
+    async def acall(self, method: Callable[..., Awaitable], operation: str = 'other',
+                    deadline: float | None = None, **kwargs):
+        """Async variant of call() for the async SDK (e.g. client.aio.models.generate_content)"""
+        started = time.monotonic()
+        try:
+            result = await self._acall(method, kwargs, self._deadline_at(started, deadline))
+        except Exception as e:
+            self._record(operation, kwargs, started, error=e)
+            raise
+
+        self._record(operation, kwargs, started, response=result,
+                     response_bytes=response_text_bytes(result))
+        return result
+
+    def stream(self, method: Callable, operation: str = 'other', deadline: float | None = None,
+               **kwargs) -> Iterator:
+        """
+        Run a streaming SDK call (e.g. client.models.generate_content_stream).
+
+        Retries only happen before the first chunk; once output has been
+        relayed a failure is raised to the caller.
+        """
+        started = time.monotonic()
+        last_chunk = None
+        response_bytes = 0
+        try:
+            for chunk in self._stream(method, kwargs, self._deadline_at(started, deadline)):
+                last_chunk = chunk
+                response_bytes += response_text_bytes(chunk)
+                yield chunk
+        except Exception as e:
+            self._record(operation, kwargs, started, error=e, response_bytes=response_bytes)
+            raise
+
+        # Usage metadata is cumulative; the last chunk carries the totals
+        self._record(operation, kwargs, started, response=last_chunk, response_bytes=response_bytes)
+
+    async def astream(self, method: Callable[..., Awaitable], operation: str = 'other',
+                      deadline: float | None = None, **kwargs) -> AsyncIterator:
+        """Async variant of stream() (e.g. client.aio.models.generate_content_stream)"""
+        started = time.monotonic()
+        last_chunk = None
+        response_bytes = 0
+        try:
+            async for chunk in self._astream(method, kwargs, self._deadline_at(started, deadline)):
+                last_chunk = chunk
+                response_bytes += response_text_bytes(chunk)
+                yield chunk
+        except Exception as e:
+            self._record(operation, kwargs, started, error=e, response_bytes=response_bytes)
+            raise
+
+        self._record(operation, kwargs, started, response=last_chunk, response_bytes=response_bytes)
+
+    def _deadline_at(self, started: float, deadline: float | None) -> float:
+        deadline_at = started + self.deadline
+        return deadline_at if deadline is None else min(deadline_at, deadline)
+
+    def _call(self, method: Callable, kwargs: dict, deadline_at: float):
+        attempt = 0
+        while True:
+            permit = self._admit(deadline_at)
+            try:
+                result = method(**self._with_timeout(kwargs, deadline_at))
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline_at):
+                    raise
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                self.breaker.release(permit)
+                self.semaphore.release()
+
+            attempt += 1
+            self._sleep_before_retry(last_error, attempt)
+
+    async def _acall(self, method: Callable[..., Awaitable], kwargs: dict, deadline_at: float):
+        semaphore = self._async_semaphore()
+        attempt = 0
+        while True:
+            permit = await self._aadmit(semaphore, deadline_at)
+            try:
+                result = await method(**self._with_timeout(kwargs, deadline_at))
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline_at):
+                    raise
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                self.breaker.release(permit)
+                semaphore.release()
+
+            attempt += 1
+            await asyncio.sleep(self._retry_delay(last_error, attempt))
+
+    def _stream(self, method: Callable, kwargs: dict, deadline_at: float) -> Iterator:
+        attempt = 0
+        while True:
+            permit = self._admit(deadline_at)
+            received = False
+            try:
+                for chunk in method(**self._with_timeout(kwargs, deadline_at)):
+                    received = True
+                    yield chunk
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline_at) or received:
+                    raise
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return
+            finally:
+                # Also reached when the caller abandons the stream (GeneratorExit)
+                self.breaker.release(permit)
+                self.semaphore.release()
+
+            attempt += 1
+            self._sleep_before_retry(last_error, attempt)
+
+    async def _astream(self, method: Callable[..., Awaitable], kwargs: dict, deadline_at: float) -> AsyncIterator:
+        semaphore = self._async_semaphore()
+        attempt = 0
+        while True:
+            permit = await self._aadmit(semaphore, deadline_at)
+            received = False
+            try:
+                async for chunk in await method(**self._with_timeout(kwargs, deadline_at)):
+                    received = True
+                    yield chunk
+            except Exception as e:
+                if not self._should_retry(e, attempt, deadline_at) or received:
+                    raise
+                last_error = e
+            else:
+                self.breaker.record_success()
+                return
+            finally:
+                self.breaker.release(permit)
+                semaphore.release()
+
+            attempt += 1
+            await asyncio.sleep(self._retry_delay(last_error, attempt))
+
+    def _record(self, operation: str, kwargs: dict, started: float, response=None,
+                response_bytes: int = 0, error: Exception | None = None) -> None:
+        duration = time.monotonic() - started
+        record_gemini_call(duration)
+        metrics.GEMINI_DURATION.labels(operation).observe(duration)
+        if error is not None:
+            metrics.GEMINI_ERRORS.labels(operation, error_label(error)).inc()
+        model_metrics.record_call(
+            operation,
+            model=kwargs.get('model', ''),
+            duration=duration,
+            request_bytes=payload_bytes(kwargs.get('contents')),
+            response_bytes=response_bytes,
+            usage=usage_counts(response),
+            error=error,
+        )
+
+    def _admit(self, deadline_at: float) -> str:
+        """Take a concurrency slot, then the breaker permit (so a queue timeout can't strand a trial)"""
+        remaining = self._check_deadline(deadline_at)
+        if self.breaker.state == 'open':
+            raise GeminiUnavailable('Gemini circuit breaker is open')
+        if not self.semaphore.acquire(timeout=min(self.acquire_timeout, remaining)):
+            raise GeminiUnavailable('Too many concurrent Gemini calls')
+        permit = self.breaker.admit()
+        if permit is None:
+            self.semaphore.release()
+            raise GeminiUnavailable('Gemini circuit breaker is open')
+        return permit
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.BoundedSemaphore(self.async_concurrency)
+        return semaphore
+
+    async def _aadmit(self, semaphore: asyncio.Semaphore, deadline_at: float) -> str:
+        remaining = self._check_deadline(deadline_at)
+        if self.breaker.state == 'open':
+            raise GeminiUnavailable('Gemini circuit breaker is open')
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=min(self.acquire_timeout, remaining))
+        except asyncio.TimeoutError:
+            raise GeminiUnavailable('Too many concurrent Gemini calls')
+        permit = self.breaker.admit()
+        if permit is None:
+            semaphore.release()
+            raise GeminiUnavailable('Gemini circuit breaker is open')
+        return permit
+
+    @staticmethod
+    def _check_deadline(deadline_at: float) -> float:
+        """Seconds left before the deadline; raises if too few to start a call"""
+        remaining = deadline_at - time.monotonic()
+        if remaining < MIN_CALL_SECONDS:
+            raise GeminiUnavailable('Gemini deadline exceeded')
+        return remaining
+
+    def _with_timeout(self, kwargs: dict, deadline_at: float) -> dict:
+        remaining = deadline_at - time.monotonic()
+        timeout = max(1.0, min(self.timeout, remaining))
+        config = dict(kwargs.get('config') or {})
+        config['http_options'] = {'timeout': int(timeout * 1000)}
+        return {**kwargs, 'config': config}
+
+    def _should_retry(self, error: Exception, attempt: int, deadline_at: float) -> bool:
+        if not is_transient_error(error):
+            # The provider answered (bad request, auth...), so it is healthy
+            self.breaker.record_success()
+            return False
+
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            return False
+
+        # Only retry if a full backoff still fits in the overall deadline
+        return time.monotonic() + self.backoff * (2 ** attempt) < deadline_at
+
+    def _sleep_before_retry(self, error: Exception, attempt: int) -> None:
+        time.sleep(self._retry_delay(error, attempt))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        delay = self.backoff * (2 ** (attempt - 1))
+        delay = random.uniform(delay / 2, delay)
+        logger.warning(f"Gemini call failed ({error}), retry {attempt} in {delay:.2f}s")
+        return delay
+
+
+_gateway: GeminiGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> GeminiGateway:
+    """Get the process-wide gateway, created on first use"""
+    global _gateway
+
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = GeminiGateway()
+    return _gateway
+
+
+def reset_gateway() -> None:
+    """Drop the process-wide gateway (used by tests and after settings changes)"""
+    global _gateway
+
+    with _gateway_lock:
+        _gateway = None
@@ -1,14 +1,42 @@
-import base64
-import json
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from google import genai
+
+from .cache import LRUCache
+from .client import get_async_client, get_client
+from .gateway import get_gateway
+from .model_output import PAYSLIP_OUTPUT, aparse_model_json, areprompt_json, parse_model_json, reprompt_json
+from .pdf_text import extract_pdf_text
+from .telemetry import model_metrics
+
+ADVICE_CONFIG = {
+    'temperature': 0.7,
+    'max_output_tokens': 512,
+}
+
+ADVICE_METRICS = ['savings_rate', 'fixed_expenses', 'expense_diversification', 'trend']
+
+# metric -> status -> (lowest, highest) one-decimal value in that band, as
+# computed by HealthScoreService; None leaves the side open
+ADVICE_BANDS = {
+    'savings_rate': {'green': (20, None), 'yellow': (10, 19.9), 'red': (None, 9.9)},
+    'fixed_expenses': {'green': (None, 40), 'yellow': (40.1, 55), 'red': (55.1, None)},
+    'expense_diversification': {'green': (60, None), 'yellow': (40, 59.9), 'red': (None, 39.9)},
+    'trend': {'green': (-5, None), 'yellow': (-10, -5.1), 'red': (None, -10.1)},
+}
+
+# Advice only depends on the bucketed metric profile, so users with similar
+# metrics share one generation
+advice_cache = LRUCache(max_size=settings.ADVICE_CACHE_SIZE, ttl=settings.ADVICE_CACHE_TTL, name='advice')
 
 
 class GeminiService:
     """Service for analyzing payslips using Google Gemini AI"""
 
     def __init__(self):
-        self.client = genai.Client(api_key=settings.GOOGLE_GEMINI_API_KEY)
+        self.client = get_client()
+        self.gateway = get_gateway()
 
     def analyze_payslip(self, file_content: bytes, mime_type: str) -> dict:
         """
@@ -18,9 +46,55 @@ class GeminiService:
             file_content: The raw bytes of the file
             mime_type: The MIME type of the file (e.g., 'application/pdf', 'image/png')
 
+        Digital PDFs with an embedded text layer are sent as text, which is
+        much cheaper than a binary upload; the extracted text is returned in
+        "rawText". Scanned PDFs and images are uploaded as-is.
+
         Returns:
             dict: Extracted payslip data
         """
+        raw_text = extract_pdf_text(file_content) if mime_type == 'application/pdf' else None
+        deadline = self.gateway.new_deadline()
+        response = self.gateway.call(
+            self.client.models.generate_content,
+            operation='payslip',
+            deadline=deadline,
+            **self._payslip_request(file_content, mime_type, raw_text)
+        )
+
+        result = parse_model_json(
+            response.text, PAYSLIP_OUTPUT,
+            reprompt_json(self.client, self.gateway, 'payslip', 'gemini-2.5-flash-lite', deadline)
+        )
+        if raw_text:
+            result['rawText'] = raw_text
+        return result
+
+    async def aanalyze_payslip(self, file_content: bytes, mime_type: str) -> dict:
+        """Async variant of analyze_payslip; PDF text extraction runs in a thread"""
+        raw_text = None
+        if mime_type == 'application/pdf':
+            raw_text = await sync_to_async(extract_pdf_text, thread_sensitive=False)(file_content)
+
+        async_client = get_async_client()
+        deadline = self.gateway.new_deadline()
+        response = await self.gateway.acall(
+            async_client.models.generate_content,
+            operation='payslip',
+            deadline=deadline,
+            **self._payslip_request(file_content, mime_type, raw_text)
+        )
+
+        result = await aparse_model_json(
+            response.text, PAYSLIP_OUTPUT,
+            areprompt_json(async_client, self.gateway, 'payslip', 'gemini-2.5-flash-lite', deadline)
+        )
+        if raw_text:
+            result['rawText'] = raw_text
+        return result
+
+    def _payslip_request(self, file_content: bytes, mime_type: str, raw_text: str | None) -> dict:
+        """Model, contents and config for analyze_payslip"""
         prompt = """Analiza este recibo de sueldo/nómina y extrae la siguiente información en formato JSON.
 
 El JSON debe tener esta estructura exacta:
@@ -58,19 +132,25 @@ Notas importantes:
 - Los tipos de bonos son: regular, performance (desempeño), holiday (aguinaldo/vacaciones), other
 - Analiza cuidadosamente el documento para extraer todos los conceptos de haberes y deducciones"""
 
-        response = self.client.models.generate_content(
+        if raw_text:
+            document_part = {'text': f"TEXTO EXTRAIDO DEL RECIBO:\n{raw_text}"}
+        else:
+            document_part = {
+                # Raw bytes: the SDK base64-encodes them once when serializing
+                'inline_data': {
+                    'mime_type': mime_type,
+                    'data': file_content
+                }
+            }
+
+        return dict(
             model='gemini-2.5-flash-lite',
             contents=[
                 {
                     'role': 'user',
                     'parts': [
                         {'text': prompt},
-                        {
-                            'inline_data': {
-                                'mime_type': mime_type,
-                                'data': base64.b64encode(file_content).decode()
-                            }
-                        }
+                        document_part
                     ]
                 }
             ],
@@ -81,9 +161,7 @@ Notas importantes:
             }
         )
 
-        return json.loads(response.text)
-
-    def generate_financial_advice(self, metrics_data: dict) -> str:
+    def generate_financial_advice(self, metrics_data: dict, use_cache: bool = True) -> str:
         """
         Generate personalized financial advice based on health metrics.
 
@@ -94,10 +172,145 @@ Notas importantes:
                 - expense_diversification: {value: float, status: str}
                 - trend: {value: float, status: str}
                 - overall_status: str
+            use_cache: Return advice already generated for the same metric
+                profile; False forces a new generation (which is then cached)
 
         Returns:
             str: Personalized advice in Spanish (max ~200 words)
         """
+        profile = self._advice_profile(metrics_data)
+        if use_cache:
+            cached = advice_cache.get(self._advice_cache_key(profile))
+            if cached is not None:
+                model_metrics.record_cache_hit('advice', 'advice_cache')
+                return cached
+
+        response = self.gateway.call(
+            self.client.models.generate_content,
+            operation='advice',
+            model='gemini-2.5-flash-lite',
+            contents=self._advice_contents(profile),
+            config=ADVICE_CONFIG
+        )
+
+        advice = response.text.strip()
+        advice_cache.set(self._advice_cache_key(profile), advice)
+        return advice
+
+    async def agenerate_financial_advice(self, metrics_data: dict, use_cache: bool = True) -> str:
+        """Async variant of generate_financial_advice"""
+        profile = self._advice_profile(metrics_data)
+        if use_cache:
+            cached = advice_cache.get(self._advice_cache_key(profile))
+            if cached is not None:
+                model_metrics.record_cache_hit('advice', 'advice_cache')
+                return cached
+
+        response = await self.gateway.acall(
+            get_async_client().models.generate_content,
+            operation='advice',
+            model='gemini-2.5-flash-lite',
+            contents=self._advice_contents(profile),
+            config=ADVICE_CONFIG
+        )
+
+        advice = response.text.strip()
+        advice_cache.set(self._advice_cache_key(profile), advice)
+        return advice
+
+    def stream_financial_advice(self, metrics_data: dict, use_cache: bool = True) -> Iterator[str]:
+        """
+        Streaming variant of generate_financial_advice.
+
+        Yields text chunks as the model generates them; joined and stripped
+        they equal the generate_financial_advice result. A cache hit is
+        yielded as a single chunk.
+        """
+        profile = self._advice_profile(metrics_data)
+        key = self._advice_cache_key(profile)
+        if use_cache:
+            cached = advice_cache.get(key)
+            if cached is not None:
+                model_metrics.record_cache_hit('advice', 'advice_cache')
+                yield cached
+                return
+
+        chunks = []
+        for chunk in self.gateway.stream(
+            self.client.models.generate_content_stream,
+            operation='advice',
+            model='gemini-2.5-flash-lite',
+            contents=self._advice_contents(profile),
+            config=ADVICE_CONFIG
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+
+        advice_cache.set(key, ''.join(chunks).strip())
+
+    async def astream_financial_advice(self, metrics_data: dict, use_cache: bool = True) -> AsyncIterator[str]:
+        """Async variant of stream_financial_advice"""
+        profile = self._advice_profile(metrics_data)
+        key = self._advice_cache_key(profile)
+        if use_cache:
+            cached = advice_cache.get(key)
+            if cached is not None:
+                model_metrics.record_cache_hit('advice', 'advice_cache')
+                yield cached
+                return
+
+        chunks = []
+        async for chunk in self.gateway.astream(
+            get_async_client().models.generate_content_stream,
+            operation='advice',
+            model='gemini-2.5-flash-lite',
+            contents=self._advice_contents(profile),
+            config=ADVICE_CONFIG
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+
+        advice_cache.set(key, ''.join(chunks).strip())
+
+    @staticmethod
+    def _advice_profile(metrics_data: dict) -> dict:
+        """
+        Metrics with values rounded to ADVICE_CACHE_GRANULARITY percentage points.
+
+        The prompt is built from this profile rather than the exact values, so
+        cached advice is exactly what the model would say for every user in
+        the bucket. Rounded values are kept inside their status band, so the
+        prompt never shows e.g. a yellow savings rate at the green threshold.
+        """
+        granularity = settings.ADVICE_CACHE_GRANULARITY
+        profile = {'overall_status': metrics_data.get('overall_status', 'green')}
+
+        for name in ADVICE_METRICS:
+            metric = metrics_data.get(name, {})
+            status = metric.get('status', 'green')
+            value = float(metric.get('value', 0))
+            if granularity > 0:
+                value = round(value / granularity) * granularity
+            value = round(value, 1)
+
+            lowest, highest = ADVICE_BANDS[name].get(status, (None, None))
+            if lowest is not None:
+                value = max(value, lowest)
+            if highest is not None:
+                value = min(value, highest)
+            profile[name] = {'value': value, 'status': status}
+        return profile
+
+    @staticmethod
+    def _advice_cache_key(profile: dict) -> tuple:
+        return (profile['overall_status'],) + tuple(
+            (profile[name]['status'], profile[name]['value']) for name in ADVICE_METRICS
+        )
+
+    def _advice_contents(self, metrics_data: dict) -> list:
+        """Build the prompt sent to the model for financial advice"""
         metrics_summary = []
 
         metrics_info = [
@@ -140,18 +353,9 @@ CONTEXTO DE MÉTRICAS:
 
 Responde SOLO con los consejos, sin introducción ni despedida."""
 
-        response = self.client.models.generate_content(
-            model='gemini-2.5-flash-lite',
-            contents=[
-                {
-                    'role': 'user',
-                    'parts': [{'text': prompt}]
-                }
-            ],
-            config={
-                'temperature': 0.7,
-                'max_output_tokens': 512,
+        return [
+            {
+                'role': 'user',
+                'parts': [{'text': prompt}]
             }
-        )
-
-        return response.text.strip()
+        ]
@@ -5,6 +5,7 @@ from typing import NamedTuple
 from dateutil.relativedelta import relativedelta
 from django.db.models import Sum
 
+from api.metrics import HEALTH_SCORE_DURATION
 from api.models import Transaction, User
 
 
@@ -313,6 +314,7 @@ class HealthScoreService:
 
         return needs_onboarding, onboarding_status
 
+    @HEALTH_SCORE_DURATION.time()
     def calculate_health_score(self, user: User, month: date) -> HealthScoreResult:
         """Calculate complete financial health score for a user and month"""
         needs_onboarding, onboarding_status = self.get_onboarding_status(user, month)
@@ -0,0 +1,67 @@
+import io
+import logging
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIF_SUPPORTED = True
+except ImportError:
+    HEIF_SUPPORTED = False
+
+logger = logging.getLogger(__name__)
+
+HEIF_TYPES = ('image/heic', 'image/heif')
+
+
+def prepare_receipt_image(file_content: bytes, mime_type: str) -> tuple[bytes, str]:
+    """
+    Normalize a receipt photo before sending it to the model.
+
+    Applies EXIF orientation, converts HEIC/HEIF when supported, downscales to
+    RECEIPT_IMAGE_MAX_SIDE (enough for OCR) and recompresses as JPEG without
+    metadata. Falls back to the original bytes if the image can't be decoded.
+
+    Args:
+        file_content: The raw bytes of the image
+        mime_type: The MIME type of the upload
+
+    Returns:
+        tuple: (image bytes, MIME type) to send to the model
+    """
+    if mime_type in HEIF_TYPES and not HEIF_SUPPORTED:
+        return file_content, mime_type
+
+    max_side = settings.RECEIPT_IMAGE_MAX_SIDE
+
+    try:
+        with Image.open(io.BytesIO(file_content)) as image:
+            # Let the JPEG decoder downscale while decoding (no-op for other formats)
+            image.draft('RGB', (max_side, max_side))
+            image = ImageOps.exif_transpose(image)
+
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+            output = io.BytesIO()
+            # No exif/icc passed to save(), so metadata is stripped
+            image.save(
+                output,
+                format='JPEG',
+                quality=settings.RECEIPT_IMAGE_QUALITY,
+                optimize=True,
+            )
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Receipt preprocessing failed, sending original: {e}")
+        return file_content, mime_type
+
+    return output.getvalue(), 'image/jpeg'
@@ -0,0 +1,431 @@
+"""
+Validation and local repair of JSON returned by the model.
+
+Model output is occasionally wrapped in code fences, followed by chatter,
+truncated at the token limit, or uses strings for numbers and categories
+outside the allowed set. Those defects are fixed here without another model
+call; only output that cannot be recovered is sent back in a text-only
+re-prompt (see reprompt_json).
+"""
+import json
+import logging
+import re
+from typing import Awaitable, Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+EXPENSE_CATEGORIES = (
+    'housing', 'transportation', 'food', 'utilities', 'healthcare', 'entertainment',
+    'shopping', 'education', 'personal', 'savings', 'investments', 'debt', 'other',
+)
+INCOME_CATEGORIES = ('salary', 'freelance', 'investments', 'rental', 'bonus', 'refund', 'other')
+TRANSACTION_CATEGORIES = tuple(dict.fromkeys(EXPENSE_CATEGORIES + INCOME_CATEGORIES))
+INTENTS = (
+    'create_expense', 'create_income', 'create_budget', 'contribute_goal', 'list_transactions',
+    'check_balance', 'greeting', 'help', 'thanks', 'unknown',
+)
+
+REPAIR_CONFIG = {
+    'response_mime_type': 'application/json',
+    'temperature': 0.0,
+    'max_output_tokens': 2048,
+}
+
+
+class ModelOutputError(ValueError):
+    """Raised when model output cannot be parsed or repaired into the expected shape"""
+
+
+class Field(NamedTuple):
+    """
+    Expected shape of one JSON value.
+
+    kind is one of 'str', 'number', 'int', 'bool', 'object', 'list' or 'any'.
+    Values outside `choices` become `fallback`. A missing required field
+    invalidates its object (list elements are dropped instead); a missing or
+    unusable optional field becomes `default`, or stays absent if there is
+    none. `default` may be a callable such as list.
+    """
+    kind: str
+    required: bool = False
+    default: object = None
+    choices: tuple | None = None
+    fallback: object = None
+    fields: dict | None = None
+    items: 'Field | None' = None
+
+
+class OutputSchema(NamedTuple):
+    """A compiled Field tree plus an example used when re-prompting"""
+    validate: Callable
+    example: str
+
+
+# --- JSON extraction ---------------------------------------------------------
+
+FENCE_PATTERN = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+
+def extract_json(text: str):
+    """
+    Parse the first JSON object in text, repairing common defects.
+
+    Handles code fences, leading or trailing prose and output truncated in
+    the middle of a value: the incomplete element is dropped and the open
+    brackets are closed.
+
+    Raises:
+        ModelOutputError: If no JSON object can be recovered
+    """
+    if not text:
+        raise ModelOutputError('Empty model output')
+
+    text = FENCE_PATTERN.sub('', text)
+    start = text.find('{')
+    if start < 0:
+        raise ModelOutputError('No JSON object in model output')
+    text = text[start:]
+
+    decoder = json.JSONDecoder()
+    try:
+        # raw_decode stops at the end of the object, ignoring trailing text
+        return decoder.raw_decode(text)[0]
+    except ValueError:
+        pass
+
+    repaired = _close_truncated(text)
+    if repaired is not None:
+        try:
+            return decoder.raw_decode(repaired)[0]
+        except ValueError:
+            pass
+    raise ModelOutputError('Model output is not valid JSON')
+
+
+def _structural_chars(text: str):
+    """(index, char) for every character outside string literals"""
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        else:
+            yield i, char
+
+
+def _close_truncated(text: str) -> str | None:
+    """Cut a truncated document after its last complete element and close it"""
+    cut = None
+    for i, char in _structural_chars(text):
+        if char in '{[}]':
+            cut = i + 1
+        elif char == ',':
+            cut = i
+    if cut is None:
+        return None
+
+    text = text[:cut]
+    closers = []
+    for _, char in _structural_chars(text):
+        if char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]' and closers:
+            closers.pop()
+    return text + ''.join(reversed(closers))
+
+
+# --- Coercion -------------------------------------------------------------------
+
+def coerce_number(value):
+    """
+    Number from a JSON value, accepting strings such as "$ 1.234,56" or "1,234.56".
+
+    Returns an int when the value is integral, a float otherwise, or None.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        return None
+
+    number = re.sub(r'[^\d,.\-]', '', value)
+    if ',' in number and '.' in number:
+        # Whichever separator comes last is the decimal one
+        if number.rfind(',') > number.rfind('.'):
+            number = number.replace('.', '').replace(',', '.')
+        else:
+            number = number.replace(',', '')
+    elif ',' in number:
+        if re.fullmatch(r'-?\d{1,3}(?:,\d{3})+', number):
+            number = number.replace(',', '')
+        else:
+            number = number.replace(',', '.')
+    elif re.fullmatch(r'-?\d{1,3}(?:\.\d{3})+', number):
+        # Argentine thousands separator ("15.420")
+        number = number.replace('.', '')
+
+    try:
+        result = float(number)
+    except ValueError:
+        return None
+    return int(result) if result.is_integer() else result
+
+
+def _coerce_int(value):
+    number = coerce_number(value)
+    return None if number is None else int(number)
+
+
+def _coerce_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    return None
+
+
+SCALAR_COERCERS = {
+    'str': _coerce_str,
+    'number': coerce_number,
+    'int': _coerce_int,
+    'bool': _coerce_bool,
+    'any': lambda value: value,
+}
+
+
+# --- Schema compilation ---------------------------------------------------------
+
+def compile_schema(field: Field) -> OutputSchema:
+    """Build the validator for a Field tree once, at import time"""
+    return OutputSchema(_compile(field), json.dumps(_example(field), ensure_ascii=False, indent=2))
+
+
+def _compile(field: Field) -> Callable:
+    if field.kind == 'object':
+        members = [(name, spec, _compile(spec)) for name, spec in (field.fields or {}).items()]
+
+        def validate_object(value):
+            if not isinstance(value, dict):
+                raise ModelOutputError(f'Expected object, got {type(value).__name__}')
+            result = dict(value)
+            for name, spec, validate in members:
+                member = value.get(name)
+                if member is not None:
+                    try:
+                        result[name] = validate(member)
+                        continue
+                    except ModelOutputError:
+                        if spec.required:
+                            raise
+                elif spec.required:
+                    raise ModelOutputError(f"Missing required field '{name}'")
+
+                if spec.default is not None:
+                    result[name] = spec.default() if callable(spec.default) else spec.default
+                elif name in result:
+                    result[name] = None
+            return result
+        return validate_object
+
+    if field.kind == 'list':
+        validate_item = _compile(field.items) if field.items else SCALAR_COERCERS['any']
+
+        def validate_list(value):
+            if not isinstance(value, list):
+                raise ModelOutputError(f'Expected list, got {type(value).__name__}')
+            result = []
+            for item in value:
+                try:
+                    result.append(validate_item(item))
+                except ModelOutputError:
+                    # Incomplete elements (e.g. cut by truncation) are dropped
+                    continue
+            return result
+        return validate_list
+
+    coerce = SCALAR_COERCERS[field.kind]
+
+    def validate_scalar(value):
+        result = coerce(value)
+        if result is None:
+            raise ModelOutputError(f'Expected {field.kind}, got {value!r}')
+        if field.choices is not None and result not in field.choices:
+            return field.fallback
+        return result
+    return validate_scalar
+
+
+def _example(field: Field):
+    if field.kind == 'object':
+        return {name: _example(spec) for name, spec in (field.fields or {}).items()}
+    if field.kind == 'list':
+        return [_example(field.items)] if field.items else []
+    if field.choices:
+        return ' | '.join(field.choices)
+    return field.kind
+
+
+# --- Schemas ----------------------------------------------------------------------
+
+INTERPRET_OUTPUT = compile_schema(Field('object', fields={
+    'intent': Field('str', required=True, choices=INTENTS, fallback='unknown'),
+    'extractedData': Field('object', fields={
+        'amount': Field('number'),
+        'limit': Field('number'),
+        'category': Field('str', choices=TRANSACTION_CATEGORIES, fallback='other'),
+    }),
+    'missingFields': Field('list', default=list, items=Field('str')),
+    'response': Field('str', default=''),
+    'isComplete': Field('bool', default=False),
+}))
+
+_RECEIPT_FIELDS = compile_schema(Field('object', fields={
+    'success': Field('bool', required=True),
+    'data': Field('object', fields={
+        'amount': Field('number'),
+        'description': Field('str'),
+        'date': Field('str'),
+        'type': Field('str', default='expense', choices=('expense', 'income'), fallback='expense'),
+        'category': Field('str', default='other', choices=TRANSACTION_CATEGORIES, fallback='other'),
+        'confidence': Field('number', default=0.5),
+    }),
+    'error': Field('str'),
+}))
+
+
+def _validate_receipt(value):
+    # Repairing truncated output can leave {"success": true, "data": {}}
+    result = _RECEIPT_FIELDS.validate(value)
+    if result['success'] and (result.get('data') or {}).get('amount') is None:
+        raise ModelOutputError("Successful receipt analysis without 'data.amount'")
+    return result
+
+
+RECEIPT_OUTPUT = OutputSchema(_validate_receipt, _RECEIPT_FIELDS.example)
+
+PAYSLIP_OUTPUT = compile_schema(Field('object', fields={
+    'employer': Field('str'),
+    'position': Field('str'),
+    'paymentDate': Field('object', fields={
+        'month': Field('str'),
+        'year': Field('int'),
+    }),
+    'grossSalary': Field('number'),
+    'netSalary': Field('number'),
+    'deductions': Field('list', default=list, items=Field('object', fields={
+        'name': Field('str', required=True),
+        'amount': Field('number', required=True),
+        'percentage': Field('number'),
+        'category': Field('str', default='other',
+                          choices=('tax', 'social_security', 'retirement', 'health', 'other'), fallback='other'),
+    })),
+    'bonuses': Field('list', default=list, items=Field('object', fields={
+        'name': Field('str', required=True),
+        'amount': Field('number', required=True),
+        'type': Field('str', default='other',
+                      choices=('regular', 'performance', 'holiday', 'other'), fallback='other'),
+    })),
+}))
+
+
+def parse_model_json(text: str, schema: OutputSchema, reprompt: Callable[[str, str], str] | None = None) -> dict:
+    """
+    Parse and validate model output, repairing it locally when possible.
+
+    Args:
+        text: Raw model output
+        schema: Compiled schema (e.g. INTERPRET_OUTPUT)
+        reprompt: Last resort for unrecoverable output; called with the
+            broken text and the schema example, returns a new attempt
+
+    Returns:
+        The validated, possibly repaired, object
+
+    Raises:
+        ModelOutputError: If neither local repair nor the re-prompt succeed
+    """
+    try:
+        return schema.validate(extract_json(text))
+    except ModelOutputError as e:
+        if reprompt is None:
+            raise
+        logger.warning(f"Unrecoverable model output ({e}), re-prompting")
+
+    return schema.validate(extract_json(reprompt(text, schema.example)))
+
+
+async def aparse_model_json(text: str, schema: OutputSchema,
+                            reprompt: Callable[[str, str], Awaitable[str]] | None = None) -> dict:
+    """Async variant of parse_model_json, taking an async re-prompt (see areprompt_json)"""
+    try:
+        return schema.validate(extract_json(text))
+    except ModelOutputError as e:
+        if reprompt is None:
+            raise
+        logger.warning(f"Unrecoverable model output ({e}), re-prompting")
+
+    return schema.validate(extract_json(await reprompt(text, schema.example)))
+
+
+def _repair_contents(text: str, example: str) -> list:
+    prompt = (
+        "La siguiente respuesta debia ser JSON valido con esta estructura:\n"
+        f"{example}\n\n"
+        "Corregila y devolve SOLO el JSON corregido, sin inventar datos:\n"
+        f"{text}"
+    )
+    return [{'role': 'user', 'parts': [{'text': prompt}]}]
+
+
+def reprompt_json(client, gateway, operation: str, model: str,
+                  deadline: float | None = None) -> Callable[[str, str], str]:
+    """
+    Text-only re-prompt asking the model to fix its own JSON.
+
+    Only the broken output is sent back, never the original file, so this is
+    much cheaper than repeating the request. `deadline` is the one of the
+    request being repaired (see GeminiGateway.new_deadline): the re-prompt
+    gets what is left of it, and is refused when too little is.
+    """
+    def reprompt(text: str, example: str) -> str:
+        response = gateway.call(
+            client.models.generate_content,
+            operation=f'{operation}_repair',
+            deadline=deadline,
+            model=model,
+            contents=_repair_contents(text, example),
+            config=REPAIR_CONFIG,
+        )
+        return response.text
+    return reprompt
+
+
+def areprompt_json(async_client, gateway, operation: str, model: str,
+                   deadline: float | None = None) -> Callable[[str, str], Awaitable[str]]:
+    """reprompt_json for the async client (get_async_client())"""
+    async def reprompt(text: str, example: str) -> str:
+        response = await gateway.acall(
+            async_client.models.generate_content,
+            operation=f'{operation}_repair',
+            deadline=deadline,
+            model=model,
+            contents=_repair_contents(text, example),
+            config=REPAIR_CONFIG,
+        )
+        return response.text
+    return reprompt
@@ -0,0 +1,50 @@
+import io
+import logging
+import re
+
+from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+# Below this many characters the PDF is treated as scanned (no usable text layer)
+MIN_TEXT_CHARS = 200
+# Above this the text prompt stops being cheaper than the binary upload
+MAX_TEXT_CHARS = 30000
+MAX_PAGES = 10
+
+
+def extract_pdf_text(file_content: bytes) -> str | None:
+    """
+    Extract the embedded text layer of a digitally generated PDF.
+
+    Args:
+        file_content: The raw bytes of the PDF
+
+    Returns:
+        str | None: Normalized text, or None when the PDF looks scanned,
+        is encrypted, or can't be parsed (caller should upload the file instead)
+    """
+    try:
+        reader = PdfReader(io.BytesIO(file_content))
+        if reader.is_encrypted or len(reader.pages) > MAX_PAGES:
+            return None
+        pages = [page.extract_text() or '' for page in reader.pages]
+    except Exception as e:
+        logger.info(f"PDF text extraction failed, falling back to file upload: {e}")
+        return None
+
+    lines = []
+    for line in '\n'.join(pages).splitlines():
+        line = re.sub(r'[ \t]+', ' ', line).strip()
+        if line:
+            lines.append(line)
+    text = '\n'.join(lines)
+
+    if len(text) < MIN_TEXT_CHARS or len(text) > MAX_TEXT_CHARS:
+        return None
+
+    # A payslip without amounts in its text layer is not worth trusting
+    if not re.search(r'\d[\d.,]*\d', text):
+        return None
+
+    return text
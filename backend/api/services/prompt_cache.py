@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from google.genai import errors as genai_errors
+
+logger = logging.getLogger(__name__)
+
+# Recreate the cached content this long before the provider expires it
+REFRESH_MARGIN = 60
+
+
+def is_cached_content_error(error: Exception) -> bool:
+    """Whether the provider refused a request because of its cached-content name"""
+    return (
+        isinstance(error, genai_errors.ClientError)
+        and error.code in (400, 403, 404)
+        and 'cache' in str(error).lower()
+    )
+
+
+class CachedPrefix:
+    """
+    A static prompt prefix stored with the provider's cached-content API.
+
+    Requests then send only the cache name plus the varying turns, and are
+    billed the reduced cached-token rate for the prefix. Disabled when ttl is
+    0; if creation fails (e.g. prefix below the model's minimum cacheable
+    size) callers get None and send the prefix inline, and creation is
+    retried after one ttl.
+    """
+
+    def __init__(self, model: str, contents: list, ttl: int, display_name: str):
+        self.model = model
+        self.contents = contents
+        self.ttl = ttl
+        self.display_name = display_name
+        self._name: str | None = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_name(self, client, gateway, deadline: float | None = None) -> str | None:
+        """
+        Name of a live cached content for this prefix, or None to send it inline.
+
+        `deadline` is the caller's (see GeminiGateway.new_deadline), so
+        creating the cache comes out of the request's time budget.
+        """
+        if self.ttl <= 0:
+            return None
+
+        now = time.monotonic()
+        if self._name and now < self._expires_at - REFRESH_MARGIN:
+            return self._name
+        if now < self._retry_at:
+            return None
+
+        with self._lock:
+            if self._name and now < self._expires_at - REFRESH_MARGIN:
+                return self._name
+            try:
+                cached = gateway.call(
+                    client.caches.create,
+                    operation='prompt_cache_create',
+                    deadline=deadline,
+                    model=self.model,
+                    config={
+                        'contents': self.contents,
+                        'ttl': f'{self.ttl}s',
+                        'display_name': self.display_name,
+                    }
+                )
+            except Exception as e:
+                logger.warning(f"Could not create cached content '{self.display_name}': {e}")
+                self._name = None
+                self._retry_at = now + self.ttl
+                return None
+
+            self._name = cached.name
+            self._expires_at = now + self.ttl
+            return self._name
+
+    async def aget_name(self, client, gateway, deadline: float | None = None) -> str | None:
+        """
+        get_name() for async callers.
+
+        A live name is returned directly; creating the cached content is rare
+        (once per ttl), so that goes through the sync client in a thread.
+        """
+        if self.ttl <= 0:
+            return None
+        if self._name and time.monotonic() < self._expires_at - REFRESH_MARGIN:
+            return self._name
+        return await sync_to_async(self.get_name, thread_sensitive=False)(client, gateway, deadline)
+
+    def discard_rejected(self, name: str | None, error: Exception) -> bool:
+        """
+        Forget `name` if the provider refused it (e.g. expired or deleted early).
+
+        Returns True when the caller should repeat the request with the prefix
+        inline; the next get_name() creates a new cached content.
+        """
+        if not name or not is_cached_content_error(error):
+            return False
+
+        logger.warning(f"Cached content '{self.display_name}' was rejected, sending the prefix inline: {error}")
+        if self._name == name:
+            self.invalidate()
+        return True
+
+    def invalidate(self) -> None:
+        """Forget the cached content and any failed attempt, so the next call recreates it"""
+        with self._lock:
+            self._name = None
+            self._expires_at = 0.0
+            self._retry_at = 0.0
@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from google.genai import errors as genai_errors
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; calls slower than the last bucket land in +Inf
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+USAGE_FIELDS = {
+    'input_tokens': 'prompt_token_count',
+    'output_tokens': 'candidates_token_count',
+    'cached_tokens': 'cached_content_token_count',
+}
+
+# Content fields that describe a part rather than carry it
+METADATA_KEYS = ('role', 'mime_type')
+
+
+def payload_bytes(value) -> int:
+    """Approximate size of a request payload: text as UTF-8, inline data as raw bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(payload_bytes(item) for key, item in value.items() if key not in METADATA_KEYS)
+    if isinstance(value, (list, tuple)):
+        return sum(payload_bytes(item) for item in value)
+    return 0
+
+
+def usage_counts(response) -> dict:
+    """Token counts from a response's usage metadata (missing counts are 0)"""
+    usage = getattr(response, 'usage_metadata', None)
+    counts = {}
+    for name, attribute in USAGE_FIELDS.items():
+        value = getattr(usage, attribute, None)
+        counts[name] = value if isinstance(value, int) else 0
+    return counts
+
+
+def response_text_bytes(response) -> int:
+    text = getattr(response, 'text', None)
+    return len(text.encode('utf-8')) if isinstance(text, str) else 0
+
+
+def error_label(error: Exception) -> str:
+    """Error class, with the HTTP status for provider errors (e.g. ServerError:503)"""
+    if isinstance(error, genai_errors.APIError):
+        return f"{type(error).__name__}:{error.code}"
+    return type(error).__name__
+
+
+class ModelCallMetrics:
+    """
+    In-process aggregate of model calls, per operation.
+
+    Counts calls, errors by class, tokens, payload bytes and a latency
+    histogram, plus cache hits that avoided a call. Every call is also logged
+    as a single JSON line on this module's logger.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations = defaultdict(self._empty_operation)
+
+    @staticmethod
+    def _empty_operation() -> dict:
+        return {
+            'calls': 0,
+            'errors': defaultdict(int),
+            'cache_hits': defaultdict(int),
+            'models': defaultdict(int),
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cached_tokens': 0,
+            'request_bytes': 0,
+            'response_bytes': 0,
+            'latency_sum': 0.0,
+            'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        }
+
+    def record_call(self, operation: str, model: str, duration: float, request_bytes: int,
+                    response_bytes: int = 0, usage: dict | None = None,
+                    error: Exception | None = None) -> None:
+        """
+        Record one logical model call (retries included).
+
+        Args:
+            operation: What the call is for (e.g. 'chat_interpret', 'advice')
+            model: Model name sent to the provider
+            duration: Wall time in seconds
+            request_bytes: Size of the request contents
+            response_bytes: Size of the generated text
+            usage: Token counts as returned by usage_counts()
+            error: Exception raised by the call, if any
+        """
+        usage = usage or dict.fromkeys(USAGE_FIELDS, 0)
+        label = error_label(error) if error else None
+
+        with self._lock:
+            stats = self._operations[operation]
+            stats['calls'] += 1
+            stats['models'][model] += 1
+            if label:
+                stats['errors'][label] += 1
+            for name, value in usage.items():
+                stats[name] += value
+            stats['request_bytes'] += request_bytes
+            stats['response_bytes'] += response_bytes
+            stats['latency_sum'] += duration
+            stats['latency_buckets'][self._bucket_index(duration)] += 1
+
+        logger.info(json.dumps({
+            'event': 'model_call',
+            'operation': operation,
+            'model': model,
+            'duration_ms': round(duration * 1000, 1),
+            'request_bytes': request_bytes,
+            'response_bytes': response_bytes,
+            **usage,
+            'error': label,
+        }))
+
+    def record_cache_hit(self, operation: str, source: str) -> None:
+        """Record a result served without calling the model"""
+        with self._lock:
+            self._operations[operation]['cache_hits'][source] += 1
+
+        logger.info(json.dumps({'event': 'model_cache_hit', 'operation': operation, 'source': source}))
+
+    def snapshot(self) -> dict:
+        """Copy of the aggregates, keyed by operation"""
+        with self._lock:
+            result = {}
+            for operation, stats in self._operations.items():
+                hits = sum(stats['cache_hits'].values())
+                requests = stats['calls'] + hits
+                result[operation] = {
+                    'calls': stats['calls'],
+                    'errors': dict(stats['errors']),
+                    'cache_hits': dict(stats['cache_hits']),
+                    'cache_hit_rate': hits / requests if requests else 0.0,
+                    'models': dict(stats['models']),
+                    'input_tokens': stats['input_tokens'],
+                    'output_tokens': stats['output_tokens'],
+                    'cached_tokens': stats['cached_tokens'],
+                    'request_bytes': stats['request_bytes'],
+                    'response_bytes': stats['response_bytes'],
+                    'latency': {
+                        'sum': stats['latency_sum'],
+                        'buckets': {
+                            str(bound): count
+                            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats['latency_buckets'])
+                        },
+                    },
+                }
+            return result
+
+    @staticmethod
+    def _bucket_index(duration: float) -> int:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                return i
+        return len(LATENCY_BUCKETS)
+
+
+model_metrics = ModelCallMetrics()
@@ -0,0 +1,100 @@
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+# Slack allowed on top of the file size for multipart boundaries and form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """Raised when an upload breaks its size or type policy"""
+    status_code = 400
+
+
+class UploadTooLarge(UploadRejected):
+    """Raised when an upload exceeds its size limit, whichever check caught it"""
+    status_code = 413
+
+
+class UploadPolicy(NamedTuple):
+    """Size and type limits for an upload endpoint"""
+    max_size: int
+    allowed_types: tuple[str, ...]
+    default_type: str | None
+    too_large_error: str
+    invalid_type_error: str
+
+
+def payslip_policy() -> UploadPolicy:
+    max_size = settings.PAYSLIP_UPLOAD_MAX_SIZE
+    return UploadPolicy(
+        max_size=max_size,
+        allowed_types=(
+            'application/pdf', 'image/jpeg', 'image/png', 'image/webp',
+            'image/heic', 'image/heif',
+        ),
+        default_type='application/pdf',
+        too_large_error=f'File too large (max {max_size // (1024 * 1024)}MB)',
+        invalid_type_error='Unsupported file type. Use PDF, JPG or PNG.',
+    )
+
+
+def receipt_policy() -> UploadPolicy:
+    max_size = settings.RECEIPT_UPLOAD_MAX_SIZE
+    return UploadPolicy(
+        max_size=max_size,
+        allowed_types=('image/jpeg', 'image/png', 'image/webp', 'image/heic', 'image/heif'),
+        default_type=None,
+        too_large_error=f'Archivo muy grande. Máximo {max_size // (1024 * 1024)}MB.',
+        invalid_type_error='Tipo de archivo no válido. Usá JPG, PNG o WebP.',
+    )
+
+
+def check_request_size(request, policy: UploadPolicy) -> None:
+    """
+    Reject oversized requests from the Content-Length header.
+
+    Must run before request.FILES is touched, so that an oversized body is
+    never parsed nor spooled.
+    """
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+
+    if content_length > policy.max_size + MULTIPART_OVERHEAD:
+        raise UploadTooLarge(policy.too_large_error)
+
+
+def validate_upload(file, policy: UploadPolicy) -> str:
+    """
+    Check type and size of a parsed upload without reading its content.
+
+    Returns:
+        str: The MIME type to send to the model
+    """
+    mime_type = file.content_type or policy.default_type
+    if mime_type not in policy.allowed_types:
+        raise UploadRejected(policy.invalid_type_error)
+
+    if file.size > policy.max_size:
+        raise UploadTooLarge(policy.too_large_error)
+
+    return mime_type
+
+
+def read_upload(file, policy: UploadPolicy) -> bytes:
+    """
+    Read an upload into a single buffer.
+
+    Django keeps small uploads in memory and spools larger ones to disk
+    (FILE_UPLOAD_MAX_MEMORY_SIZE), so the only full copy held by the worker
+    is the one returned here. The read is capped in case the declared size
+    does not match the content.
+    """
+    file.seek(0)
+    content = file.read(policy.max_size + 1)
+    if len(content) > policy.max_size:
+        raise UploadTooLarge(policy.too_large_error)
+    return content
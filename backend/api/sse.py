@@ -0,0 +1,35 @@
+from typing import Iterator
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import dumps
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event with a JSON payload"""
+    payload = dumps(data).decode()
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events: Iterator[str]) -> StreamingHttpResponse:
+    """Stream already formatted events, unbuffered by proxies"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets streaming views accept "Accept: text/event-stream".
+
+    Only non-streamed responses (validation errors, 404s) go through it; they
+    are sent as a single "error" event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event('error', data).encode(self.charset)
@@ -0,0 +1,145 @@
+import threading
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import User, HealthScoreSnapshot
+from api.services.advice_jobs import AdviceJobQueue, reset_advice_jobs
+
+
+class AdviceJobQueueTest(SimpleTestCase):
+    """Tests for background advice generation"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_concurrent_requests_are_coalesced(self):
+        queue = AdviceJobQueue(max_workers=2)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def generate(snapshot_id, use_cache):
+            calls.append(snapshot_id)
+            started.set()
+            release.wait(5)
+
+        with patch.object(queue, '_generate', side_effect=generate), \
+                patch('api.services.advice_jobs.connections'):
+            self.assertTrue(queue.submit(1))
+            started.wait(5)
+            self.assertFalse(queue.submit(1))
+            self.assertTrue(queue.is_pending(1))
+            release.set()
+            queue._executor.shutdown(wait=True)
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(queue.is_pending(1))
+
+    def test_failure_is_reported(self):
+        queue = AdviceJobQueue(max_workers=0)
+
+        with patch.object(queue, '_generate', side_effect=Exception('boom')):
+            queue.submit(1)
+
+        self.assertEqual(queue.failure(1), 'boom')
+        self.assertFalse(queue.is_pending(1))
+
+    def test_state_is_shared_between_workers(self):
+        # Two queues stand for two worker processes sharing the cache
+        worker, other = AdviceJobQueue(max_workers=0), AdviceJobQueue(max_workers=0)
+
+        def generate(snapshot_id, use_cache):
+            self.assertTrue(other.is_pending(snapshot_id))
+            self.assertFalse(other.submit(snapshot_id))
+            raise Exception('boom')
+
+        with patch.object(worker, '_generate', side_effect=generate), \
+                patch.object(other, '_generate') as other_generate:
+            self.assertTrue(worker.submit(1))
+
+        other_generate.assert_not_called()
+        self.assertEqual(other.failure(1), 'boom')
+        self.assertFalse(other.is_pending(1))
+
+
+@override_settings(ADVICE_ASYNC=True, ADVICE_JOB_WORKERS=0, ADVICE_MAX_AGE_DAYS=7)
+class AsyncAdviceEndpointTest(APITestCase):
+    """Tests for the async mode of /api/health-score/advice/"""
+
+    def setUp(self):
+        reset_advice_jobs()
+        self.addCleanup(reset_advice_jobs)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('health-score-advice')
+        self.snapshot = HealthScoreSnapshot.objects.create(
+            user=self.user,
+            month=date.today().replace(day=1),
+            savings_rate_score=50,
+            fixed_expenses_score=50,
+            expense_diversification_score=50,
+            trend_score=50,
+            overall_score=50,
+            overall_status='yellow',
+        )
+
+    @patch('api.services.advice_jobs.GeminiService')
+    def test_missing_advice_returns_202_then_status_has_result(self, mock_gemini):
+        mock_gemini.return_value.generate_financial_advice.return_value = 'Consejo nuevo'
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+
+        status_response = self.client.get(response.data['status_url'])
+        self.assertEqual(status_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(status_response.data['status'], 'done')
+        self.assertEqual(status_response.data['advice'], 'Consejo nuevo')
+
+    @patch('api.services.advice_jobs.GeminiService')
+    def test_stale_advice_is_returned_while_refreshing(self, mock_gemini):
+        mock_gemini.return_value.generate_financial_advice.return_value = 'Consejo nuevo'
+        self.snapshot.cached_advice = 'Consejo viejo'
+        self.snapshot.advice_generated_at = timezone.now() - timedelta(days=10)
+        self.snapshot.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['advice'], 'Consejo viejo')
+        self.assertTrue(response.data['refreshing'])
+        self.snapshot.refresh_from_db()
+        self.assertEqual(self.snapshot.cached_advice, 'Consejo nuevo')
+
+    @patch('api.services.advice_jobs.GeminiService')
+    def test_fresh_advice_is_not_regenerated(self, mock_gemini):
+        self.snapshot.cached_advice = 'Consejo'
+        self.snapshot.advice_generated_at = timezone.now()
+        self.snapshot.save()
+
+        response = self.client.get(self.url)
+
+        self.assertFalse(response.data['refreshing'])
+        mock_gemini.assert_not_called()
+
+    @patch('api.services.advice_jobs.GeminiService')
+    def test_status_reports_failure(self, mock_gemini):
+        mock_gemini.return_value.generate_financial_advice.side_effect = Exception('API Error')
+
+        response = self.client.post(self.url)
+        status_response = self.client.get(response.data['status_url'])
+
+        self.assertEqual(status_response.data['status'], 'failed')
+        self.assertIn('API Error', status_response.data['error'])
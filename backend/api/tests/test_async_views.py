@@ -0,0 +1,115 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.async_views import (
+    AsyncChatAnalyzeReceiptView, AsyncChatInterpretView, AsyncHealthScoreAdviceView, AsyncPayslipAnalyzeView,
+)
+from api.models import HealthScoreSnapshot, User
+from api.services.gateway import GeminiUnavailable
+from api.views import CHAT_ERROR_RESPONSE
+
+
+class AsyncViewsTest(TestCase):
+    """Tests for the async versions of the Gemini-bound views"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.factory = APIRequestFactory()
+
+    def _call(self, view_class, method, data=None, format='json', user=True):
+        request = getattr(self.factory, method)('/', data, format=format)
+        if user:
+            force_authenticate(request, user=self.user)
+        return async_to_sync(view_class.as_view())(request)
+
+    def test_views_are_async(self):
+        for view_class in (AsyncChatInterpretView, AsyncChatAnalyzeReceiptView,
+                           AsyncPayslipAnalyzeView, AsyncHealthScoreAdviceView):
+            with self.subTest(view_class.__name__):
+                self.assertTrue(view_class.view_is_async)
+
+    def test_requires_authentication(self):
+        response = self._call(AsyncChatInterpretView, 'post', {'message': 'hola'}, user=False)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch('api.async_views.ChatService')
+    def test_interpret(self, mock_chat):
+        mock_chat.return_value.ainterpret_message = AsyncMock(return_value={'intent': 'greeting'})
+
+        response = self._call(AsyncChatInterpretView, 'post', {'message': 'hola'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'intent': 'greeting'})
+        mock_chat.return_value.ainterpret_message.assert_awaited_once_with('hola', None, {})
+
+    @patch('api.async_views.ChatService')
+    def test_interpret_error_returns_chat_error(self, mock_chat):
+        mock_chat.return_value.ainterpret_message = AsyncMock(side_effect=Exception('boom'))
+
+        response = self._call(AsyncChatInterpretView, 'post', {'message': 'hola'})
+
+        self.assertEqual(response.data, CHAT_ERROR_RESPONSE)
+
+    def test_interpret_validates_message(self):
+        response = self._call(AsyncChatInterpretView, 'post', {'message': ''})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('api.async_views.ChatService')
+    def test_receipt_unavailable_returns_503(self, mock_chat):
+        mock_chat.return_value.aanalyze_receipt = AsyncMock(side_effect=GeminiUnavailable('open'))
+        upload = SimpleUploadedFile('ticket.png', b'\x89PNG\r\n\x1a\n' + b'0' * 32, content_type='image/png')
+
+        response = self._call(AsyncChatAnalyzeReceiptView, 'post', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(response.data['success'])
+
+    @override_settings(RECEIPT_UPLOAD_MAX_SIZE=1024)
+    @patch('api.async_views.ChatService')
+    def test_receipt_oversized_is_rejected(self, mock_chat):
+        upload = SimpleUploadedFile('ticket.jpg', b'x' * (200 * 1024), content_type='image/jpeg')
+
+        response = self._call(AsyncChatAnalyzeReceiptView, 'post', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        mock_chat.assert_not_called()
+
+    @patch('api.async_views.GeminiService')
+    def test_payslip(self, mock_gemini):
+        mock_gemini.return_value.aanalyze_payslip = AsyncMock(return_value={'employer': 'ACME'})
+        upload = SimpleUploadedFile('recibo.pdf', b'%PDF-1.4 data', content_type='application/pdf')
+
+        response = self._call(AsyncPayslipAnalyzeView, 'post', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {'employer': 'ACME'})
+        self.assertEqual(response.data['file_name'], 'recibo.pdf')
+        content, mime_type = mock_gemini.return_value.aanalyze_payslip.await_args.args
+        self.assertEqual((content, mime_type), (b'%PDF-1.4 data', 'application/pdf'))
+
+    def test_advice_without_snapshot_returns_404(self):
+        response = self._call(AsyncHealthScoreAdviceView, 'get')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('api.async_views.GeminiService')
+    def test_advice_is_generated_and_saved(self, mock_gemini):
+        HealthScoreSnapshot.objects.create(
+            user=self.user, month=date.today().replace(day=1),
+            savings_rate_score=60, fixed_expenses_score=60, expense_diversification_score=60, trend_score=60,
+            overall_score=60, overall_status='yellow',
+        )
+        mock_gemini.return_value = MagicMock(agenerate_financial_advice=AsyncMock(return_value='Ahorrá más'))
+
+        response = self._call(AsyncHealthScoreAdviceView, 'post')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['advice'], 'Ahorrá más')
+        self.assertFalse(response.data['cached'])
+        self.assertEqual(HealthScoreSnapshot.objects.get(user=self.user).cached_advice, 'Ahorrá más')
+        self.assertFalse(mock_gemini.return_value.agenerate_financial_advice.await_args.kwargs['use_cache'])
@@ -0,0 +1,135 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedRefreshToken, blacklist_cache, invalidate_user, user_cache
+from api.models import User
+from api.services.cache import LRUCache
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """Tests for the cached JWT authentication class"""
+
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = reverse('me')
+
+    def _user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in queries if 'FROM "users"' in q['sql'] or 'FROM "api_user"' in q['sql']]
+
+    def test_second_request_skips_user_lookup(self):
+        first = self._user_queries()
+        second = self._user_queries()
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_cache(self):
+        self.client.get(self.url)
+
+        self.user.set_password('newpass456')
+        self.user.save()
+
+        self.assertIsNone(user_cache.get(str(self.user.id)))
+
+    def test_deactivation_by_other_worker_invalidates_cache(self):
+        self.client.get(self.url)
+
+        # The other worker's signal handler clears its own in-process cache
+        with patch('api.authentication.user_cache', LRUCache(max_size=10, ttl=30)):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertIsNotNone(user_cache.get(str(self.user.id)))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidate_user_covers_queryset_updates(self):
+        self.client.get(self.url)
+
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        with patch('api.authentication.user_cache', LRUCache(max_size=10, ttl=30)):
+            invalidate_user(self.user.id)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        self.client.get(self.url)
+        cached, _ = user_cache.get(str(self.user.id))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['username'], 'testuser')
+        self.assertIsNot(response.wsgi_request.user, cached)
+
+
+class CachedRefreshTest(APITestCase):
+    """Tests for the in-memory blacklist check on token refresh"""
+
+    def setUp(self):
+        blacklist_cache.clear()
+        self.addCleanup(blacklist_cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.refresh = str(CachedRefreshToken.for_user(self.user))
+        self.url = reverse('token-refresh')
+
+    def _blacklist_queries(self, refresh):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'refresh': refresh}, format='json')
+        lookups = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'token_blacklist_blacklistedtoken' in q['sql']]
+        return response, lookups
+
+    def test_rotation_caches_old_token(self):
+        response, _ = self._blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['refresh'], self.refresh)
+
+        response, lookups = self._blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(lookups, [])
+
+    def test_blacklisted_by_other_worker_is_rejected_then_cached(self):
+        CachedRefreshToken(self.refresh).blacklist()
+        blacklist_cache.clear()
+
+        response, lookups = self._blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(lookups), 1)
+
+        response, lookups = self._blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(lookups, [])
+
+    def test_logout_blacklists_token(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('logout'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=CachedRefreshToken(self.refresh, verify=False)['jti']).exists())
+
+        self.client.force_authenticate(None)
+        response, lookups = self._blacklist_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(lookups, [])
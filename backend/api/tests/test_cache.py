@@ -0,0 +1,246 @@
+import json
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase, override_settings
+from google.genai import errors as genai_errors
+
+from api.services.cache import LRUCache
+from api.services.chat import ChatService, interpret_cache, interpret_prompt_cache
+from api.services.gemini import GeminiService, advice_cache
+
+
+class LRUCacheTest(SimpleTestCase):
+    """Tests for the in-process LRU cache"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(max_size=2, ttl=10)
+        with patch('api.services.cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with patch('api.services.cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('a'))
+
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class InterpretCacheTest(SimpleTestCase):
+    """Tests for ChatService.interpret_message response caching"""
+
+    def setUp(self):
+        interpret_cache.clear()
+        self.addCleanup(interpret_cache.clear)
+
+        with patch('api.services.chat.get_client'):
+            self.service = ChatService()
+        self.service.client = MagicMock()
+        self.service.client.models.generate_content.return_value.text = json.dumps({
+            'intent': 'create_expense',
+            'extractedData': None,
+            'missingFields': ['amount', 'description'],
+            'response': 'Dale! Contame, cuanto gastaste y en que?',
+            'isComplete': False,
+        })
+
+    def test_equivalent_messages_hit_cache(self):
+        first = self.service.interpret_message('Quiero registrar un gasto')
+        second = self.service.interpret_message('  quiero REGISTRAR un gastó!')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
+
+    def test_flow_state_is_part_of_key(self):
+        self.service.interpret_message('Quiero registrar un gasto')
+        self.service.interpret_message('Quiero registrar un gasto', context='create_expense')
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 2)
+
+    def test_date_is_part_of_key(self):
+        self.service.interpret_message('Quiero registrar un gasto')
+        with patch('api.services.chat.date') as mock_date:
+            mock_date.today.return_value = date(2000, 1, 1)
+            self.service.interpret_message('Quiero registrar un gasto')
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 2)
+
+
+class InterpretPromptCacheTest(SimpleTestCase):
+    """Tests for the static chat prompt prefix and provider context caching"""
+
+    def setUp(self):
+        interpret_cache.clear()
+        self.addCleanup(interpret_cache.clear)
+        self.addCleanup(interpret_prompt_cache.invalidate)
+
+        with patch('api.services.chat.get_client'):
+            self.service = ChatService()
+        self.service.client = MagicMock()
+        self.service.client.models.generate_content.return_value.text = json.dumps({'intent': 'help'})
+
+    def _sent(self):
+        return self.service.client.models.generate_content.call_args.kwargs
+
+    def test_static_prefix_does_not_depend_on_date(self):
+        self.service.interpret_message('Necesito ayuda')
+        first = self._sent()['contents']
+        with patch('api.services.chat.date') as mock_date:
+            mock_date.today.return_value = date(2000, 1, 1)
+            self.service.interpret_message('Necesito ayuda')
+        second = self._sent()['contents']
+
+        self.assertEqual(first[:2], second[:2])
+        self.assertNotEqual(first[2], second[2])
+        self.assertIn('FECHA DE HOY: 2000-01-01', second[2]['parts'][0]['text'])
+
+    def test_uses_cached_content_when_enabled(self):
+        self.service.client.caches.create.return_value.name = 'cachedContents/abc'
+
+        with patch.object(interpret_prompt_cache, 'ttl', 3600):
+            self.service.interpret_message('Necesito ayuda')
+            self.service.interpret_message('Necesito otra cosa')
+
+        sent = self._sent()
+        self.assertEqual(len(sent['contents']), 1)
+        self.assertEqual(sent['config']['cached_content'], 'cachedContents/abc')
+        self.assertEqual(self.service.client.caches.create.call_count, 1)
+
+    def test_falls_back_to_inline_prefix_when_cache_creation_fails(self):
+        self.service.client.caches.create.side_effect = Exception('too few tokens')
+
+        with patch.object(interpret_prompt_cache, 'ttl', 3600):
+            self.service.interpret_message('Necesito ayuda')
+
+        sent = self._sent()
+        self.assertEqual(len(sent['contents']), 3)
+        self.assertNotIn('cached_content', sent['config'])
+
+    def test_rejected_cached_content_is_recreated_and_sent_inline(self):
+        self.service.client.caches.create.return_value.name = 'cachedContents/abc'
+        answer = self.service.client.models.generate_content.return_value
+        self.service.client.models.generate_content.side_effect = [
+            genai_errors.ClientError(403, {'error': {'code': 403, 'message': 'CachedContent not found (or permission denied)'}}),
+            answer,
+            answer,
+        ]
+
+        with patch.object(interpret_prompt_cache, 'ttl', 3600):
+            self.assertEqual(self.service.interpret_message('Necesito ayuda')['intent'], 'help')
+            sent = self._sent()
+            self.assertEqual(len(sent['contents']), 3)
+            self.assertNotIn('cached_content', sent['config'])
+
+            self.service.interpret_message('Necesito otra cosa')
+
+        self.assertEqual(self._sent()['config']['cached_content'], 'cachedContents/abc')
+        self.assertEqual(self.service.client.caches.create.call_count, 2)
+
+    def test_rejected_cached_content_falls_back_when_streaming(self):
+        self.service.client.caches.create.return_value.name = 'cachedContents/abc'
+        stream = self.service.client.models.generate_content_stream
+        stream.side_effect = [
+            genai_errors.ClientError(404, {'error': {'code': 404, 'message': 'cachedContents/abc not found'}}),
+            iter([MagicMock(text='{"intent": "help"}')]),
+        ]
+
+        with patch.object(interpret_prompt_cache, 'ttl', 3600):
+            events = list(self.service.stream_interpret_message('Necesito ayuda'))
+
+        self.assertEqual(events[-1][1]['intent'], 'help')
+        self.assertNotIn('cached_content', stream.call_args.kwargs['config'])
+
+    def test_other_client_errors_are_not_retried(self):
+        self.service.client.caches.create.return_value.name = 'cachedContents/abc'
+        self.service.client.models.generate_content.side_effect = genai_errors.ClientError(
+            400, {'error': {'code': 400, 'message': 'bad request'}},
+        )
+
+        with patch.object(interpret_prompt_cache, 'ttl', 3600):
+            with self.assertRaises(genai_errors.ClientError):
+                self.service.interpret_message('Necesito ayuda')
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
+
+
+def metrics(savings=21.3, fixed=38.0, diversification=65.2, trend=6.1):
+    return {
+        'savings_rate': {'value': savings, 'status': 'green'},
+        'fixed_expenses': {'value': fixed, 'status': 'green'},
+        'expense_diversification': {'value': diversification, 'status': 'green'},
+        'trend': {'value': trend, 'status': 'green'},
+        'overall_status': 'green',
+    }
+
+
+@override_settings(ADVICE_CACHE_GRANULARITY=5)
+class AdviceCacheTest(SimpleTestCase):
+    """Tests for advice shared between similar metric profiles"""
+
+    def setUp(self):
+        advice_cache.clear()
+        self.addCleanup(advice_cache.clear)
+
+        with patch('api.services.gemini.get_client'):
+            self.service = GeminiService()
+        self.service.client = MagicMock()
+        self.service.client.models.generate_content.return_value.text = ' Ahorrá más. '
+
+    def test_similar_profiles_share_advice(self):
+        first = self.service.generate_financial_advice(metrics())
+        second = self.service.generate_financial_advice(metrics(savings=19.8, trend=4.0))
+
+        self.assertEqual(first, 'Ahorrá más.')
+        self.assertEqual(second, first)
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
+        self.assertEqual(advice_cache.stats()['hits'], 1)
+
+    def test_prompt_uses_bucketed_values(self):
+        self.service.generate_financial_advice(metrics(savings=21.3))
+
+        prompt = self.service.client.models.generate_content.call_args.kwargs['contents'][0]['parts'][0]['text']
+        self.assertIn('Tasa de Ahorro: 20.0%', prompt)
+
+    def test_bucketed_values_stay_in_their_band(self):
+        data = metrics(savings=17.6)
+        data['savings_rate']['status'] = 'yellow'
+        self.service.generate_financial_advice(data)
+
+        prompt = self.service.client.models.generate_content.call_args.kwargs['contents'][0]['parts'][0]['text']
+        self.assertIn('Tasa de Ahorro: 19.9% (semáforo: amarillo)', prompt)
+
+    @override_settings(ADVICE_CACHE_GRANULARITY=0)
+    def test_no_granularity_sends_one_decimal_values(self):
+        self.service.generate_financial_advice(metrics(savings=21.34))
+
+        prompt = self.service.client.models.generate_content.call_args.kwargs['contents'][0]['parts'][0]['text']
+        self.assertIn('Tasa de Ahorro: 21.3%', prompt)
+
+    def test_different_status_misses(self):
+        self.service.generate_financial_advice(metrics())
+        changed = metrics()
+        changed['trend']['status'] = 'yellow'
+        self.service.generate_financial_advice(changed)
+
+        self.assertEqual(self.service.client.models.generate_content.call_count, 2)
+
+    def test_use_cache_false_regenerates(self):
+        self.service.generate_financial_advice(metrics())
+        self.service.client.models.generate_content.return_value.text = 'Nuevo consejo'
+
+        self.assertEqual(self.service.generate_financial_advice(metrics(), use_cache=False), 'Nuevo consejo')
+        self.assertEqual(self.service.generate_financial_advice(metrics()), 'Nuevo consejo')
+
+    def test_stream_hit_yields_cached_advice(self):
+        self.service.generate_financial_advice(metrics())
+
+        self.assertEqual(list(self.service.stream_financial_advice(metrics())), ['Ahorrá más.'])
+        self.service.client.models.generate_content_stream.assert_not_called()
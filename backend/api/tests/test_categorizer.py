@@ -0,0 +1,121 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import User, Transaction, CategoryCount
+from api.services.categorizer import CategoryClassifier, global_counts_cache, tokenize
+
+
+class CategoryClassifierTest(TestCase):
+    """Tests for the local naive Bayes category classifier"""
+
+    def setUp(self):
+        global_counts_cache.clear()
+        self.addCleanup(global_counts_cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.classifier = CategoryClassifier()
+
+    def test_tokenize_folds_accents_and_drops_stopwords(self):
+        self.assertEqual(tokenize('Café de la Esquina'), {'cafe', 'esquina'})
+
+    def test_suggests_learned_category(self):
+        self.classifier.learn(self.user, 'expense', 'Supermercado Coto', 'food')
+        self.classifier.learn(self.user, 'expense', 'Nafta YPF', 'transportation')
+
+        suggestions = self.classifier.suggest(self.user, 'coto', 'expense')
+
+        self.assertEqual(suggestions[0]['category'], 'food')
+        self.assertGreater(suggestions[0]['probability'], 0.5)
+
+    def test_unknown_words_return_nothing(self):
+        self.classifier.learn(self.user, 'expense', 'Supermercado Coto', 'food')
+        self.assertEqual(self.classifier.suggest(self.user, 'zapatillas', 'expense'), [])
+
+    def test_global_model_helps_new_users(self):
+        self.classifier.learn(self.other, 'expense', 'Farmacia del pueblo', 'healthcare')
+
+        suggestions = self.classifier.suggest(self.user, 'farmacia', 'expense')
+        self.assertEqual(suggestions[0]['category'], 'healthcare')
+
+    def test_user_history_outweighs_global(self):
+        for _ in range(2):
+            self.classifier.learn(self.other, 'expense', 'Mercadolibre', 'shopping')
+        self.classifier.learn(self.user, 'expense', 'Mercadolibre', 'education')
+
+        suggestions = self.classifier.suggest(self.user, 'mercadolibre', 'expense')
+        self.assertEqual(suggestions[0]['category'], 'education')
+
+    def test_forget_removes_example(self):
+        self.classifier.learn(self.user, 'expense', 'Gimnasio', 'personal')
+        self.classifier.forget(self.user, 'expense', 'Gimnasio', 'personal')
+
+        self.assertEqual(self.classifier.suggest(self.user, 'gimnasio', 'expense'), [])
+        self.assertFalse(CategoryCount.objects.filter(user=self.user, count__gt=0).exists())
+
+    def test_counts_are_rows_shared_with_the_global_table(self):
+        self.classifier.learn(self.user, 'expense', 'Super Coto', 'food')
+        self.classifier.learn(self.other, 'expense', 'Coto', 'food')
+
+        counts = dict(CategoryCount.objects.filter(user__isnull=True, category='food').values_list('token', 'count'))
+        self.assertEqual(counts, {'': 2, 'coto': 2, 'super': 1})
+        self.assertEqual(self.classifier._global_counts('expense'), {
+            'food': {'docs': 2, 'total': 3, 'tokens': {'coto': 2, 'super': 1}},
+        })
+
+    def test_rebuild_from_transactions(self):
+        Transaction.objects.create(user=self.user, date=date.today(), description='Alquiler depto',
+                                   amount=100, type='expense', category='housing')
+
+        self.assertEqual(self.classifier.rebuild(), 1)
+        self.assertEqual(self.classifier.suggest(self.user, 'alquiler', 'expense')[0]['category'], 'housing')
+        self.assertEqual(CategoryCount.objects.get(user__isnull=True, category='housing', token='').count, 1)
+
+
+class SuggestCategoryEndpointTest(APITestCase):
+    """Tests for /api/transactions/suggest-category/ and training on writes"""
+
+    def setUp(self):
+        global_counts_cache.clear()
+        self.addCleanup(global_counts_cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transaction-suggest-category')
+
+    def _create(self, description, category):
+        return self.client.post(reverse('transaction-list'), {
+            'date': '2026-01-15', 'description': description, 'amount': '100.00',
+            'type': 'expense', 'category': category,
+        })
+
+    def test_created_transactions_train_the_classifier(self):
+        self._create('Verduleria Don Jose', 'food')
+
+        response = self.client.get(self.url, {'description': 'verduleria'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['category'], 'food')
+
+    def test_recategorized_transaction_is_relearned(self):
+        created = self._create('Spotify', 'other')
+        self.client.patch(reverse('transaction-detail', args=[created.data['id']]), {'category': 'entertainment'})
+
+        response = self.client.get(self.url, {'description': 'spotify'})
+        self.assertEqual(response.data['suggestions'], [{'category': 'entertainment', 'probability': 1.0}])
+
+    def test_classifier_errors_do_not_fail_the_write(self):
+        with patch.object(CategoryCount.objects, 'bulk_create', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('api.services.categorizer', level='WARNING'):
+                response = self._create('Kiosco', 'food')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Transaction.objects.filter(description='Kiosco').exists())
+
+    def test_requires_description(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,77 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from api.services.chat_parser import interpret_locally, parse_amount
+
+
+class InterpretLocallyTest(SimpleTestCase):
+    """Tests for the local chat fast path"""
+
+    def test_simple_expense(self):
+        result = interpret_locally('Gasté 500 en el super')
+
+        self.assertEqual(result['intent'], 'create_expense')
+        self.assertEqual(result['extractedData'], {
+            'amount': 500,
+            'description': 'Supermercado',
+            'category': 'food',
+            'date': date.today().strftime('%Y-%m-%d'),
+        })
+        self.assertEqual(result['missingFields'], [])
+        self.assertTrue(result['isComplete'])
+        self.assertIn('$500', result['response'])
+
+    def test_simple_income(self):
+        result = interpret_locally('Cobré 50.000 de mi sueldo')
+
+        self.assertEqual(result['intent'], 'create_income')
+        self.assertEqual(result['extractedData']['amount'], 50000)
+        self.assertEqual(result['extractedData']['category'], 'salary')
+        self.assertIn('$50,000', result['response'])
+
+    def test_greeting_and_thanks(self):
+        self.assertEqual(interpret_locally('Hola!')['intent'], 'greeting')
+        self.assertEqual(interpret_locally('Muchas gracias')['intent'], 'thanks')
+
+    def test_ambiguous_messages_fall_back(self):
+        self.assertIsNone(interpret_locally('Quiero registrar un gasto'))
+        self.assertIsNone(interpret_locally('Cuanto gasté en el super?'))
+        self.assertIsNone(interpret_locally('No gasté 500 en el super'))
+        self.assertIsNone(interpret_locally('Gasté 500 en el super y 200 de nafta'))
+        self.assertIsNone(interpret_locally('Gasté 500 en apuestas'))
+
+    def test_other_dates_fall_back(self):
+        self.assertIsNone(interpret_locally('Gasté 500 en el super ayer'))
+        self.assertIsNone(interpret_locally('Pagué 12000 de alquiler el mes pasado'))
+        self.assertIsNone(interpret_locally('Pagué 3000 de luz el lunes'))
+        self.assertIsNone(interpret_locally('Gasté 500 en el super el 15/03'))
+
+    def test_other_currencies_fall_back(self):
+        self.assertIsNone(interpret_locally('Gasté 500 dólares en ropa'))
+        self.assertIsNone(interpret_locally('Pagué u$s 20 de netflix'))
+        self.assertIsNone(interpret_locally('Gasté 30 euros en el super'))
+
+    def test_numbers_without_money_cue_fall_back(self):
+        self.assertIsNone(interpret_locally('compré 2 zapatillas'))
+        self.assertIsNone(interpret_locally('Gasté en el super 500'))
+
+    def test_money_cues(self):
+        for message in ('Gasté $500 en el super', 'Gasté 500 pesos en el super', 'Pagué 5 mil de luz',
+                        'Compré zapatillas por $80.000', 'Pagué 12000 de alquiler'):
+            with self.subTest(message):
+                self.assertIsNotNone(interpret_locally(message))
+
+    def test_mid_flow_messages_fall_back(self):
+        self.assertIsNone(interpret_locally('Gasté 500 en el super', context='create_expense'))
+        self.assertIsNone(interpret_locally('500', collected_data={'description': 'Super'}))
+
+
+class ParseAmountTest(SimpleTestCase):
+    """Tests for Argentine amount formats"""
+
+    def test_formats(self):
+        self.assertEqual(parse_amount('1.500,50', None), 1500.5)
+        self.assertEqual(parse_amount('50.000', None), 50000)
+        self.assertEqual(parse_amount('12,5', None), 12.5)
+        self.assertEqual(parse_amount('5', 'mil'), 5000)
@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from api.services import client as client_module
+from api.services.chat import ChatService
+from api.services.gemini import GeminiService
+
+
+@override_settings(GOOGLE_GEMINI_API_KEY='test-key')
+class GetClientTest(SimpleTestCase):
+    """Tests for the process-wide Gemini client"""
+
+    def setUp(self):
+        client_module.reset_client()
+        self.addCleanup(client_module.reset_client)
+
+    def test_services_share_one_client(self):
+        self.assertIs(GeminiService().client, ChatService().client)
+
+    def test_client_is_rebuilt_after_fork(self):
+        first = client_module.get_client()
+
+        with patch('api.services.client.os.getpid', return_value=-1):
+            second = client_module.get_client()
+
+        self.assertIsNot(first, second)
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.db_routers import ReplicaRouter, read_replica
+from api.models import Budget, Transaction, User
+
+
+@override_settings(DATABASE_READ_REPLICA='replica')
+class ReplicaRoutingTest(APITestCase):
+    """Tests for routing analytics reads to the read replica"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Stand-in replica sharing the test database and transaction (a
+        # configured test mirror would use a separate connection)
+        if 'replica' in connections:
+            self.addCleanup(connections.__setitem__, 'replica', connections['replica'])
+        else:
+            self.addCleanup(delattr, connections._connections, 'replica')
+        connections['replica'] = connections['default']
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        Transaction.objects.create(
+            user=self.user, date=date.today(), description='Super', amount=Decimal('100'),
+            type='expense', category='food',
+        )
+        Budget.objects.create(user=self.user, name='Comida', category='food', limit=Decimal('500'))
+
+    def _read_aliases(self, url):
+        aliases = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            aliases.append(alias)
+            return alias
+
+        with patch.object(ReplicaRouter, 'db_for_read', spy):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return set(aliases)
+
+    def test_analytics_endpoints_read_from_replica(self):
+        for name in ('transaction-stats', 'transaction-monthly', 'transaction-categories',
+                     'health-score-history', 'budget-list'):
+            with self.subTest(name):
+                self.assertEqual(self._read_aliases(reverse(name)), {'replica'})
+
+    def test_other_endpoints_read_from_primary(self):
+        self.assertEqual(self._read_aliases(reverse('transaction-list')), {None})
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        response = self.client.post(reverse('transaction-list'), {
+            'date': date.today().isoformat(), 'description': 'Cine', 'amount': '50',
+            'type': 'expense', 'category': 'entertainment',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self._read_aliases(reverse('transaction-stats')), {None})
+
+    def test_pin_is_per_user(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.client.post(reverse('budget-list'), {'name': 'Auto', 'category': 'transportation', 'limit': '100'})
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self._read_aliases(reverse('transaction-stats')), {'replica'})
+
+    def test_writes_inside_replica_block_go_to_primary(self):
+        with read_replica(self.user) as alias:
+            self.assertEqual(alias, 'replica')
+            budget = Budget.objects.create(user=self.user, name='Casa', category='housing', limit=Decimal('1'))
+        self.assertEqual(budget._state.db, 'default')
+
+    @override_settings(DATABASE_READ_REPLICA=None)
+    def test_without_replica_reads_stay_on_primary(self):
+        self.assertEqual(self._read_aliases(reverse('transaction-stats')), {None})
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from api.fake_gemini import FakeGeminiConfig, canned_text, make_server
+from api.services.chat import ChatService, interpret_cache
+from api.services.client import reset_client
+from api.services.gateway import reset_gateway
+from api.services.gemini import GeminiService, advice_cache
+
+
+class CannedTextTest(SimpleTestCase):
+    """Tests for prompt routing in the fake Gemini server"""
+
+    def _body(self, text):
+        return {'contents': [{'role': 'user', 'parts': [{'text': text}]}]}
+
+    def test_payslip_prompt_gets_payslip_json(self):
+        data = json.loads(canned_text(self._body('Analiza este recibo de sueldo/nómina')))
+        self.assertIn('grossSalary', data)
+        self.assertIsInstance(data['deductions'], list)
+
+    def test_receipt_prompt_gets_receipt_json(self):
+        data = json.loads(canned_text(self._body('imagen de un ticket o recibo de compra')))
+        self.assertTrue(data['success'])
+        self.assertEqual(data['data']['type'], 'expense')
+
+    def test_interpret_uses_amount_from_message(self):
+        data = json.loads(canned_text(self._body('Mensaje del usuario: gaste 4500 en la farmacia')))
+        self.assertEqual(data['intent'], 'create_expense')
+        self.assertEqual(data['extractedData']['amount'], 4500)
+
+    def test_fixed_latency(self):
+        self.assertEqual(FakeGeminiConfig(latency_ms=250, latency_dist='fixed').sample_latency(), 0.25)
+
+
+class FakeGeminiServerTest(SimpleTestCase):
+    """End-to-end: the real SDK client pointed at the fake server"""
+
+    def setUp(self):
+        self.server = make_server('127.0.0.1', 0, FakeGeminiConfig(latency_ms=1, latency_dist='fixed'))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            GEMINI_BASE_URL=f'http://127.0.0.1:{self.server.server_address[1]}/',
+            GOOGLE_GEMINI_API_KEY='test-key',
+            GEMINI_PROMPT_CACHE_TTL=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        reset_client()
+        reset_gateway()
+        interpret_cache.clear()
+        advice_cache.clear()
+        self.addCleanup(reset_client)
+        self.addCleanup(reset_gateway)
+        self.addCleanup(interpret_cache.clear)
+        self.addCleanup(advice_cache.clear)
+
+    def test_interpret_message(self):
+        result = ChatService().interpret_message('anotame la luz, me salio 5000 y pico')
+        self.assertEqual(result['extractedData']['amount'], 5000)
+
+    def test_async_interpret_message(self):
+        # A fresh event loop each time: the async client must not be reused across loops
+        for _ in range(2):
+            interpret_cache.clear()
+            result = asyncio.run(ChatService().ainterpret_message('anotame la luz, me salio 5000 y pico'))
+            self.assertEqual(result['extractedData']['amount'], 5000)
+
+    def test_streamed_advice(self):
+        chunks = list(GeminiService().stream_financial_advice({
+            'score': 60, 'status': 'fair', 'metrics': {},
+        }))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(''.join(chunks).startswith('1.'))
+
+    def test_injected_errors_surface(self):
+        self.server.RequestHandlerClass.config = FakeGeminiConfig(
+            latency_ms=0, latency_dist='fixed', error_rate=1.0, error_codes=(400,)
+        )
+        with self.assertRaises(Exception):
+            ChatService().interpret_message('anotame la luz, me salio 5000 y pico')
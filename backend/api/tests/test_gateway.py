@@ -0,0 +1,197 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from django.test import SimpleTestCase, override_settings
+from google.genai import errors as genai_errors
+
+from api.services.gateway import GeminiGateway, GeminiUnavailable
+
+
+def server_error(code=503):
+    return genai_errors.ServerError(code, {'error': {'code': code, 'message': 'unavailable'}})
+
+
+def client_error(code=400):
+    return genai_errors.ClientError(code, {'error': {'code': code, 'message': 'bad request'}})
+
+
+@override_settings(
+    GEMINI_TIMEOUT=5,
+    GEMINI_DEADLINE=10,
+    GEMINI_MAX_RETRIES=2,
+    GEMINI_RETRY_BACKOFF=0.001,
+    GEMINI_MAX_CONCURRENCY=2,
+    GEMINI_ASYNC_MAX_CONCURRENCY=1,
+    GEMINI_QUEUE_TIMEOUT=0.01,
+    GEMINI_BREAKER_THRESHOLD=3,
+    GEMINI_BREAKER_COOLDOWN=60,
+)
+class GeminiGatewayTest(SimpleTestCase):
+    """Tests for the resilient Gemini gateway"""
+
+    def setUp(self):
+        self.gateway = GeminiGateway()
+
+    def test_passes_timeout_in_config(self):
+        method = MagicMock(return_value='ok')
+
+        self.assertEqual(self.gateway.call(method, model='m', config={'temperature': 0.1}), 'ok')
+        config = method.call_args.kwargs['config']
+        self.assertEqual(config['temperature'], 0.1)
+        self.assertEqual(config['http_options'], {'timeout': 5000})
+
+    def test_shared_deadline_caps_the_timeout(self):
+        method = MagicMock(return_value='ok')
+
+        self.gateway.call(method, deadline=time.monotonic() + 3, config={})
+
+        self.assertLessEqual(method.call_args.kwargs['config']['http_options']['timeout'], 3000)
+
+    def test_call_is_refused_when_the_deadline_is_spent(self):
+        method = MagicMock(return_value='ok')
+
+        with self.assertRaises(GeminiUnavailable):
+            self.gateway.call(method, deadline=time.monotonic() + 0.5, config={})
+        method.assert_not_called()
+
+    def test_retries_transient_errors(self):
+        method = MagicMock(side_effect=[server_error(), server_error(429), 'ok'])
+
+        self.assertEqual(self.gateway.call(method, config={}), 'ok')
+        self.assertEqual(method.call_count, 3)
+
+    def test_gives_up_after_retry_budget(self):
+        method = MagicMock(side_effect=server_error())
+
+        with self.assertRaises(genai_errors.ServerError):
+            self.gateway.call(method, config={})
+        self.assertEqual(method.call_count, 3)
+
+    def test_does_not_retry_client_errors(self):
+        method = MagicMock(side_effect=client_error())
+
+        with self.assertRaises(genai_errors.ClientError):
+            self.gateway.call(method, config={})
+        self.assertEqual(method.call_count, 1)
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        method = MagicMock(side_effect=server_error())
+
+        with self.assertRaises(genai_errors.ServerError):
+            self.gateway.call(method, config={})
+        with self.assertRaises(GeminiUnavailable):
+            self.gateway.call(method, config={})
+        self.assertEqual(method.call_count, 3)
+        self.assertEqual(self.gateway.breaker.state, 'open')
+
+    def test_concurrency_limit_rejects_when_full(self):
+        self.gateway.semaphore.acquire()
+        self.gateway.semaphore.acquire()
+
+        with self.assertRaises(GeminiUnavailable):
+            self.gateway.call(MagicMock(), config={})
+
+    def test_stream_does_not_retry_after_output(self):
+        def broken_stream(**kwargs):
+            yield 'first'
+            raise server_error()
+
+        method = MagicMock(side_effect=broken_stream)
+        chunks = []
+        with self.assertRaises(genai_errors.ServerError):
+            for chunk in self.gateway.stream(method, config={}):
+                chunks.append(chunk)
+
+        self.assertEqual(chunks, ['first'])
+        self.assertEqual(method.call_count, 1)
+
+    def test_acall_retries_transient_errors(self):
+        method = AsyncMock(side_effect=[server_error(), 'ok'])
+
+        self.assertEqual(asyncio.run(self.gateway.acall(method, config={})), 'ok')
+        self.assertEqual(method.call_count, 2)
+        self.assertEqual(method.call_args.kwargs['config']['http_options'], {'timeout': 5000})
+
+    def test_astream_retries_before_first_chunk(self):
+        async def chunks():
+            yield 'a'
+            yield 'b'
+
+        async def collect():
+            return [chunk async for chunk in self.gateway.astream(method, config={})]
+
+        method = AsyncMock(side_effect=[server_error(), chunks()])
+
+        self.assertEqual(asyncio.run(collect()), ['a', 'b'])
+        self.assertEqual(method.call_count, 2)
+        self.assertEqual(self.gateway.breaker.state, 'closed')
+
+    def test_acall_concurrency_limit_rejects_when_full(self):
+        async def two_calls():
+            release = asyncio.Event()
+
+            async def slow(**kwargs):
+                await release.wait()
+                return 'ok'
+
+            first = asyncio.create_task(self.gateway.acall(slow, config={}))
+            await asyncio.sleep(0)
+            try:
+                with self.assertRaises(GeminiUnavailable):
+                    await self.gateway.acall(AsyncMock(), config={})
+            finally:
+                release.set()
+            return await first
+
+        self.assertEqual(asyncio.run(two_calls()), 'ok')
+
+    def _half_open(self):
+        self.gateway.breaker.failures = 3
+        self.gateway.breaker.opened_at = -1e9
+
+    def test_queue_timeout_does_not_strand_half_open_trial(self):
+        self._half_open()
+        self.gateway.semaphore.acquire()
+        self.gateway.semaphore.acquire()
+
+        with self.assertRaises(GeminiUnavailable):
+            self.gateway.call(MagicMock(), config={})
+        self.gateway.semaphore.release()
+        self.gateway.semaphore.release()
+
+        self.assertEqual(self.gateway.call(MagicMock(return_value='ok'), config={}), 'ok')
+        self.assertEqual(self.gateway.breaker.state, 'closed')
+
+    def test_abandoned_stream_releases_half_open_trial(self):
+        def endless_stream(**kwargs):
+            while True:
+                yield 'chunk'
+
+        self._half_open()
+        stream = self.gateway.stream(MagicMock(side_effect=endless_stream), config={})
+        self.assertEqual(next(stream), 'chunk')
+        stream.close()
+
+        self.assertEqual(self.gateway.breaker.state, 'half_open')
+        self.assertEqual(self.gateway.call(MagicMock(return_value='ok'), config={}), 'ok')
+        self.assertEqual(self.gateway.breaker.state, 'closed')
+
+    def test_cancelled_acall_releases_half_open_trial(self):
+        async def cancel_trial():
+            calling = asyncio.Event()
+
+            async def hang(**kwargs):
+                calling.set()
+                await asyncio.Event().wait()
+
+            trial = asyncio.create_task(self.gateway.acall(hang, config={}))
+            await calling.wait()
+            trial.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await trial
+            return await self.gateway.acall(AsyncMock(return_value='ok'), config={})
+
+        self._half_open()
+        self.assertEqual(asyncio.run(cancel_trial()), 'ok')
+        self.assertEqual(self.gateway.breaker.state, 'closed')
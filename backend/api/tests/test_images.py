@@ -0,0 +1,52 @@
+import io
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from api.services.images import prepare_receipt_image
+
+
+def _image_bytes(size, fmt='JPEG', mode='RGB', exif=None):
+    image = Image.new(mode, size, 'white')
+    output = io.BytesIO()
+    if exif is not None:
+        image.save(output, format=fmt, exif=exif)
+    else:
+        image.save(output, format=fmt)
+    return output.getvalue()
+
+
+@override_settings(RECEIPT_IMAGE_MAX_SIDE=800, RECEIPT_IMAGE_QUALITY=80)
+class PrepareReceiptImageTest(SimpleTestCase):
+    """Tests for receipt image preprocessing"""
+
+    def test_large_image_is_downscaled(self):
+        content, mime_type = prepare_receipt_image(_image_bytes((4000, 3000)), 'image/jpeg')
+
+        self.assertEqual(mime_type, 'image/jpeg')
+        with Image.open(io.BytesIO(content)) as image:
+            self.assertEqual(max(image.size), 800)
+
+    def test_exif_orientation_is_applied_and_stripped(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated 90 CW
+        content, _ = prepare_receipt_image(_image_bytes((400, 200), exif=exif), 'image/jpeg')
+
+        with Image.open(io.BytesIO(content)) as image:
+            self.assertEqual(image.size, (200, 400))
+            self.assertNotIn(0x0112, image.getexif())
+
+    def test_png_with_alpha_is_converted_to_jpeg(self):
+        content, mime_type = prepare_receipt_image(
+            _image_bytes((300, 300), fmt='PNG', mode='RGBA'), 'image/png'
+        )
+
+        self.assertEqual(mime_type, 'image/jpeg')
+        with Image.open(io.BytesIO(content)) as image:
+            self.assertEqual(image.mode, 'RGB')
+
+    def test_undecodable_image_returns_original(self):
+        content, mime_type = prepare_receipt_image(b'not an image', 'image/png')
+
+        self.assertEqual(content, b'not an image')
+        self.assertEqual(mime_type, 'image/png')
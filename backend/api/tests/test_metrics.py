@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from api import metrics
+from api.models import User
+from api.services.cache import LRUCache
+from api.services.gateway import GeminiGateway
+from api.services.health_score import HealthScoreService
+
+
+def _sample(name, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class MetricsEndpointTest(TestCase):
+    """Tests for the /metrics endpoint"""
+
+    def test_reports_requests_per_route(self):
+        before = _sample('cashmind_http_requests_total', route='health-check', method='GET', status='200')
+        self.client.get('/api/health/')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'cashmind_http_request_duration_seconds_bucket', response.content)
+        self.assertIn(b'cashmind_http_request_db_queries_bucket', response.content)
+        self.assertEqual(
+            _sample('cashmind_http_requests_total', route='health-check', method='GET', status='200'), before + 1
+        )
+
+    def test_unmatched_urls_share_a_label(self):
+        before = _sample('cashmind_http_requests_total', route='unmatched', method='GET', status='404')
+        self.client.get('/no-such-page/')
+        self.assertEqual(_sample('cashmind_http_requests_total', route='unmatched', method='GET', status='404'),
+                         before + 1)
+
+    def test_external_callers_get_404(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8'])
+    def test_allowed_network(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5', HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(response.status_code, 404)
+
+
+class MetricsTest(TestCase):
+    """Tests for what feeds the Prometheus metrics"""
+
+    def test_named_cache_counts_lookups(self):
+        cache = LRUCache(max_size=2, name='test_cache')
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+
+        self.assertEqual(_sample('cashmind_cache_requests_total', cache='test_cache', result='hit'), 1)
+        self.assertEqual(_sample('cashmind_cache_requests_total', cache='test_cache', result='miss'), 1)
+
+    @override_settings(GEMINI_MAX_RETRIES=0)
+    def test_gemini_latency_and_errors(self):
+        before = _sample('cashmind_gemini_call_duration_seconds_count', operation='metrics_test')
+        gateway = GeminiGateway()
+        gateway.call(MagicMock(return_value=MagicMock(text='ok')), operation='metrics_test', model='m')
+        with self.assertRaises(ValueError):
+            gateway.call(MagicMock(side_effect=ValueError('bad')), operation='metrics_test', model='m')
+
+        self.assertEqual(_sample('cashmind_gemini_call_duration_seconds_count', operation='metrics_test'), before + 2)
+        self.assertEqual(_sample('cashmind_gemini_call_errors_total', operation='metrics_test', error='ValueError'), 1)
+
+    def test_health_score_duration(self):
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        before = _sample('cashmind_health_score_duration_seconds_count')
+
+        HealthScoreService().calculate_health_score(user, date.today().replace(day=1))
+
+        self.assertEqual(_sample('cashmind_health_score_duration_seconds_count'), before + 1)
+
+
+class MultiprocessMetricsTest(SimpleTestCase):
+    """Counters of separate worker processes add up in one scrape"""
+
+    WORKER = (
+        "from prometheus_client import Counter; "
+        "Counter('cashmind_http_requests_total', 'x', ['route', 'method', 'status'])"
+        ".labels('health-check', 'GET', '200').inc(3)"
+    )
+
+    def test_render_merges_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', self.WORKER], env=env, check=True)
+
+            with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                body, _ = metrics.render()
+
+        self.assertIn(
+            b'cashmind_http_requests_total{method="GET",route="health-check",status="200"} 6.0', body
+        )
@@ -0,0 +1,166 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from api.services.chat import ChatService, interpret_cache
+from api.services.gateway import GeminiUnavailable
+from api.services.model_output import (
+    INTERPRET_OUTPUT, PAYSLIP_OUTPUT, RECEIPT_OUTPUT,
+    ModelOutputError, coerce_number, extract_json, parse_model_json
+)
+
+
+class ExtractJsonTest(SimpleTestCase):
+    """Tests for local JSON repair"""
+
+    def test_ignores_fences_and_trailing_text(self):
+        text = '```json\n{"intent": "help"}\n```\nEspero que sirva!'
+        self.assertEqual(extract_json(text), {'intent': 'help'})
+
+    def test_ignores_leading_prose(self):
+        self.assertEqual(extract_json('Aca va: {"a": 1} y listo'), {'a': 1})
+
+    def test_truncated_array_drops_incomplete_element(self):
+        text = '{"grossSalary": 1000, "deductions": [{"name": "Jubilación", "amount": 110}, {"name": "Obra So'
+        self.assertEqual(extract_json(text), {
+            'grossSalary': 1000,
+            'deductions': [{'name': 'Jubilación', 'amount': 110}, {}],
+        })
+
+    def test_truncated_string_value_is_dropped(self):
+        text = '{"intent": "help", "response": "Hola, puedo ayud'
+        self.assertEqual(extract_json(text), {'intent': 'help'})
+
+    def test_brackets_inside_strings_are_ignored(self):
+        text = '{"response": "usa [corchetes] y {llaves}", "items": [1, 2'
+        self.assertEqual(extract_json(text), {'response': 'usa [corchetes] y {llaves}', 'items': [1]})
+
+    def test_garbage_raises(self):
+        with self.assertRaises(ModelOutputError):
+            extract_json('No pude leer nada')
+
+
+class CoerceNumberTest(SimpleTestCase):
+    """Tests for numbers sent as strings"""
+
+    def test_formats(self):
+        self.assertEqual(coerce_number('$ 15.420,50'), 15420.5)
+        self.assertEqual(coerce_number('1,234.56'), 1234.56)
+        self.assertEqual(coerce_number('15.420'), 15420)
+        self.assertEqual(coerce_number('12.5'), 12.5)
+        self.assertEqual(coerce_number('500'), 500)
+        self.assertIsNone(coerce_number('mucho'))
+        self.assertIsNone(coerce_number(True))
+
+
+class SchemaTest(SimpleTestCase):
+    """Tests for schema validation and repair"""
+
+    def test_interpret_repairs_types_and_categories(self):
+        result = parse_model_json(json.dumps({
+            'intent': 'create_expense',
+            'extractedData': {'amount': '1.500', 'description': 'Apuestas', 'category': 'gambling'},
+            'missingFields': None,
+            'response': 'Listo',
+            'isComplete': 'true',
+        }), INTERPRET_OUTPUT)
+
+        self.assertEqual(result['extractedData'], {'amount': 1500, 'description': 'Apuestas', 'category': 'other'})
+        self.assertEqual(result['missingFields'], [])
+        self.assertIs(result['isComplete'], True)
+
+    def test_interpret_unknown_intent(self):
+        result = parse_model_json('{"intent": "delete_everything", "response": "No"}', INTERPRET_OUTPUT)
+        self.assertEqual(result['intent'], 'unknown')
+        self.assertFalse(result['isComplete'])
+
+    def test_does_not_add_absent_optional_fields(self):
+        result = parse_model_json('{"intent": "contribute_goal", "extractedData": {"goalName": "Viaje"}}', INTERPRET_OUTPUT)
+        self.assertEqual(result['extractedData'], {'goalName': 'Viaje'})
+
+    def test_receipt_defaults(self):
+        result = parse_model_json('{"success": true, "data": {"amount": "2.300", "category": "ferreteria"}}', RECEIPT_OUTPUT)
+        self.assertEqual(result['data'], {'amount': 2300, 'category': 'other', 'type': 'expense', 'confidence': 0.5})
+
+    def test_successful_receipt_requires_amount(self):
+        with self.assertRaises(ModelOutputError):
+            parse_model_json('{"success": true, "data": {"description": "Ferreteria", "amou', RECEIPT_OUTPUT)
+
+        reprompt = MagicMock(return_value='{"success": true, "data": {"amount": 2300}}')
+        result = parse_model_json('{"success": true, "data": {}}', RECEIPT_OUTPUT, reprompt)
+        self.assertEqual(result['data']['amount'], 2300)
+        reprompt.assert_called_once()
+
+    def test_failed_receipt_needs_no_amount(self):
+        result = parse_model_json('{"success": false, "error": "No es un comprobante"}', RECEIPT_OUTPUT)
+        self.assertFalse(result['success'])
+
+    def test_truncated_payslip_keeps_complete_deductions(self):
+        text = (
+            '{"employer": "ACME", "grossSalary": "850.000", "netSalary": 705500, '
+            '"deductions": [{"name": "Jubilación", "amount": 93500, "category": "pension"}, '
+            '{"name": "Obra Social", "amou'
+        )
+        result = parse_model_json(text, PAYSLIP_OUTPUT)
+
+        self.assertEqual(result['grossSalary'], 850000)
+        self.assertEqual(result['deductions'], [{'name': 'Jubilación', 'amount': 93500, 'category': 'other'}])
+        self.assertEqual(result['bonuses'], [])
+
+    def test_reprompt_only_when_unrecoverable(self):
+        reprompt = MagicMock(return_value='{"intent": "help"}')
+
+        parse_model_json('{"intent": "help"} gracias', INTERPRET_OUTPUT, reprompt)
+        reprompt.assert_not_called()
+
+        result = parse_model_json('{"response": "sin intent"}', INTERPRET_OUTPUT, reprompt)
+        self.assertEqual(result['intent'], 'help')
+        self.assertEqual(reprompt.call_count, 1)
+
+
+class InterpretRepairTest(SimpleTestCase):
+    """ChatService repairs model output instead of failing"""
+
+    def setUp(self):
+        interpret_cache.clear()
+        self.addCleanup(interpret_cache.clear)
+
+        with patch('api.services.chat.get_client'):
+            self.service = ChatService()
+        self.service.client = MagicMock()
+
+    def test_malformed_output_is_repaired_without_second_call(self):
+        self.service.client.models.generate_content.return_value.text = (
+            '{"intent": "create_expense", "extractedData": {"amount": "2500"}, "response": "Ok"}\nNota: ...'
+        )
+
+        result = self.service.interpret_message('Quiero cargar algo que pague')
+
+        self.assertEqual(result['extractedData']['amount'], 2500)
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
+
+    def test_unrecoverable_output_is_reprompted_as_text(self):
+        broken = MagicMock(text='No entiendo el formato')
+        fixed = MagicMock(text='{"intent": "unknown", "response": "Perdon"}')
+        self.service.client.models.generate_content.side_effect = [broken, fixed]
+
+        result = self.service.interpret_message('Quiero cargar algo que pague')
+
+        self.assertEqual(result['intent'], 'unknown')
+        repair_call = self.service.client.models.generate_content.call_args_list[1]
+        self.assertIn('No entiendo el formato', repair_call.kwargs['contents'][0]['parts'][0]['text'])
+
+    def test_reprompt_shares_the_request_deadline(self):
+        def slow_broken_answer(**kwargs):
+            time.sleep(0.6)
+            return MagicMock(text='No entiendo el formato')
+
+        self.service.client.models.generate_content.side_effect = slow_broken_answer
+
+        # Only 0.9s would be left for the re-prompt, below the minimum to start a call
+        with patch.object(self.service.gateway, 'new_deadline', return_value=time.monotonic() + 1.5):
+            with self.assertRaises(GeminiUnavailable):
+                self.service.interpret_message('Quiero cargar algo que pague')
+        self.assertEqual(self.service.client.models.generate_content.call_count, 1)
@@ -0,0 +1,98 @@
+import io
+import json
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from api.services.gemini import GeminiService
+from api.services.pdf_text import extract_pdf_text
+
+
+PAYSLIP_LINES = [
+    'ACME S.A. - Recibo de haberes',
+    'Empleado: Juan Perez - Cargo: Analista',
+    'Fecha de pago: 01/11/2025 - Periodo abonado: Octubre 2025',
+    'Sueldo basico 850.000,00',
+    'Jubilacion 11% 93.500,00',
+    'Ley 19032 3% 25.500,00',
+    'Obra social 3% 25.500,00',
+    'Total neto a cobrar 705.500,00',
+]
+
+
+def _pdf_bytes(lines=None):
+    """Build a one-page PDF, with a text layer when lines are given"""
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=595, height=842)
+
+    if lines:
+        font = DictionaryObject({
+            NameObject('/Type'): NameObject('/Font'),
+            NameObject('/Subtype'): NameObject('/Type1'),
+            NameObject('/BaseFont'): NameObject('/Helvetica'),
+        })
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): writer._add_object(font)})
+        })
+        commands = ['BT', '/F1 10 Tf', '14 TL', '50 800 Td']
+        for line in lines:
+            commands.append(f'({line}) Tj T*')
+        commands.append('ET')
+        stream = DecodedStreamObject()
+        stream.set_data('\n'.join(commands).encode('latin-1'))
+        page[NameObject('/Contents')] = writer._add_object(stream)
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class ExtractPdfTextTest(SimpleTestCase):
+    """Tests for the PDF text-layer extraction"""
+
+    def test_digital_pdf_returns_text(self):
+        text = extract_pdf_text(_pdf_bytes(PAYSLIP_LINES))
+
+        self.assertIsNotNone(text)
+        self.assertIn('Total neto a cobrar 705.500,00', text)
+
+    def test_pdf_without_text_layer_returns_none(self):
+        self.assertIsNone(extract_pdf_text(_pdf_bytes()))
+
+    def test_invalid_pdf_returns_none(self):
+        self.assertIsNone(extract_pdf_text(b'%PDF-1.4 garbage'))
+
+
+class AnalyzePayslipTextPathTest(SimpleTestCase):
+    """Tests for GeminiService.analyze_payslip input selection"""
+
+    def _service(self):
+        with patch('api.services.gemini.get_client'):
+            service = GeminiService()
+        service.client = MagicMock()
+        service.client.models.generate_content.return_value.text = json.dumps({'employer': 'ACME'})
+        return service
+
+    def _sent_parts(self, service):
+        contents = service.client.models.generate_content.call_args.kwargs['contents']
+        return contents[0]['parts']
+
+    def test_digital_pdf_is_sent_as_text(self):
+        service = self._service()
+        result = service.analyze_payslip(_pdf_bytes(PAYSLIP_LINES), 'application/pdf')
+
+        parts = self._sent_parts(service)
+        self.assertNotIn('inline_data', parts[1])
+        self.assertIn('705.500,00', parts[1]['text'])
+        self.assertIn('705.500,00', result['rawText'])
+
+    def test_scanned_pdf_is_uploaded(self):
+        service = self._service()
+        content = _pdf_bytes()
+        result = service.analyze_payslip(content, 'application/pdf')
+
+        parts = self._sent_parts(service)
+        self.assertEqual(parts[1]['inline_data']['data'], content)
+        self.assertNotIn('rawText', result)
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import User, HealthScoreSnapshot
+from api.services.advice import AdviceService
+
+
+class PrecomputeAdviceCommandTest(TestCase):
+    """Tests for the precompute_advice management command"""
+
+    def setUp(self):
+        self.month = date.today().replace(day=1)
+
+    def _snapshot(self, username, advice=None, generated_at=None, month=None):
+        user = User.objects.create_user(username=username, password='testpass123')
+        return HealthScoreSnapshot.objects.create(
+            user=user,
+            month=month or self.month,
+            savings_rate_score=50,
+            fixed_expenses_score=50,
+            expense_diversification_score=50,
+            trend_score=50,
+            overall_score=50,
+            overall_status='yellow',
+            cached_advice=advice,
+            advice_generated_at=generated_at,
+        )
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('precompute_advice', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    @patch('api.management.commands.precompute_advice.GeminiService')
+    def test_fills_missing_and_stale_advice(self, mock_gemini):
+        mock_gemini.return_value.generate_financial_advice.return_value = 'Nuevo consejo'
+        missing = self._snapshot('missing')
+        stale = self._snapshot('stale', 'Viejo', timezone.now() - timedelta(days=10))
+        fresh = self._snapshot('fresh', 'Reciente', timezone.now())
+        other_month = self._snapshot('other', month=self.month - timedelta(days=40))
+
+        output = self._run('--concurrency', '2')
+
+        self.assertIn('Generated 2', output)
+        for snapshot in (missing, stale, fresh, other_month):
+            snapshot.refresh_from_db()
+        self.assertEqual(missing.cached_advice, 'Nuevo consejo')
+        self.assertEqual(stale.cached_advice, 'Nuevo consejo')
+        self.assertEqual(fresh.cached_advice, 'Reciente')
+        self.assertIsNone(other_month.cached_advice)
+
+    @patch('api.management.commands.precompute_advice.GeminiService')
+    def test_failures_leave_snapshot_untouched(self, mock_gemini):
+        mock_gemini.return_value.generate_financial_advice.side_effect = [Exception('boom'), 'Consejo']
+        first = self._snapshot('first')
+        second = self._snapshot('second')
+
+        output = self._run('--concurrency', '1')
+
+        self.assertIn('Generated 1 advice(s), 1 failed', output)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual({first.cached_advice, second.cached_advice}, {None, 'Consejo'})
+
+    @patch('api.management.commands.precompute_advice.GeminiService')
+    def test_dry_run_does_not_call_gemini(self, mock_gemini):
+        self._snapshot('missing')
+
+        output = self._run('--dry-run')
+
+        self.assertIn('1 snapshot(s) need advice', output)
+        mock_gemini.assert_not_called()
+
+    def test_saving_advice_keeps_scores_updated_meanwhile(self):
+        stale = self._snapshot('user')
+        # HealthScoreView recomputes the scores while Gemini is answering
+        HealthScoreSnapshot.objects.filter(pk=stale.pk).update(overall_score=90, overall_status='green')
+
+        AdviceService().save_advice(stale, 'Consejo')
+
+        snapshot = HealthScoreSnapshot.objects.get(pk=stale.pk)
+        self.assertEqual(snapshot.cached_advice, 'Consejo')
+        self.assertEqual((snapshot.overall_score, snapshot.overall_status), (90, 'green'))
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from api.models import User
+
+
+class PruneTokensCommandTest(TestCase):
+    """Tests for the prune_tokens management command"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{i}', token='x', expires_at=now - timedelta(days=1),
+            )
+            if i % 2 == 0:
+                BlacklistedToken.objects.create(token=token)
+        live = OutstandingToken.objects.create(
+            user=self.user, jti='live', token='x', expires_at=now + timedelta(days=1),
+        )
+        BlacklistedToken.objects.create(token=live)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('prune_tokens', *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_expired_tokens_in_batches(self):
+        output = self._run('--batch-size', '2')
+
+        self.assertIn('Deleted 5 expired token(s) and 3 blacklist entries', output)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_limit(self):
+        self._run('--batch-size', '2', '--limit', '3')
+
+        self.assertEqual(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).count(), 2)
+
+    def test_dry_run_deletes_nothing(self):
+        output = self._run('--dry-run')
+
+        self.assertIn('5 expired token(s)', output)
+        self.assertEqual(OutstandingToken.objects.count(), 6)
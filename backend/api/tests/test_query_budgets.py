@@ -0,0 +1,388 @@
+"""
+Query-count budgets for every endpoint in api/urls.py.
+
+Each endpoint is requested for two users: one with a small data set and
+one with ten times as much. The number of queries must stay within the
+endpoint's budget and be the same for both users; a count that grows with
+the data is an N+1. Failures show the executed SQL (literals replaced by
+"?"), as a diff between both users when the counts differ.
+
+New endpoints must be added to BUDGETS; test_every_endpoint_has_a_budget
+fails otherwise.
+"""
+import difflib
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable
+from unittest.mock import patch
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import urls as api_urls
+from api.authentication import CachedRefreshToken, blacklist_cache, user_cache
+from api.models import (
+    Bonus, Budget, Deduction, Goal, HealthScoreSnapshot, InvitationCode, Payslip, Transaction, User,
+)
+from api.services.categorizer import CategoryClassifier, global_counts_cache
+from api.services.chat import interpret_cache
+from api.services.gemini import advice_cache
+
+SMALL, LARGE = 1, 10
+PASSWORD = 'testpass123'
+EXPENSE_CATEGORIES = ['food', 'transport', 'services', 'health', 'entertainment', 'housing']
+FIXED_CATEGORIES = {'services', 'housing'}
+PERIODS = ['monthly', 'weekly', 'yearly']
+
+
+@dataclass
+class Seed:
+    """A seeded user and one of each of their objects, for detail URLs"""
+    user: User
+    transaction: Transaction
+    budget: Budget
+    goal: Goal
+    payslip: Payslip
+
+
+def seed(username: str, scale: int) -> Seed:
+    """
+    A user with seven months of history. Every month has `scale` incomes and
+    3 * `scale` expenses, so both scales clear the health score onboarding.
+    """
+    user = User.objects.create_user(username=username, password=PASSWORD)
+    this_month = date.today().replace(day=1)
+
+    transactions = []
+    for months_ago in range(7):
+        month = this_month - relativedelta(months=months_ago)
+        for i in range(scale):
+            transactions.append(Transaction(
+                user=user, date=month, description=f'Sueldo {i}', amount=Decimal('900000'),
+                type='income', category='salary',
+            ))
+            for j in range(3):
+                category = EXPENSE_CATEGORIES[(i * 3 + j) % len(EXPENSE_CATEGORIES)]
+                transactions.append(Transaction(
+                    user=user, date=month, description=f'Pago {category} {i}', amount=Decimal('25000.50') + j,
+                    type='expense', category=category, is_recurring=category in FIXED_CATEGORIES,
+                ))
+    Transaction.objects.bulk_create(transactions)
+
+    # Budgets are unique per category and period
+    Budget.objects.bulk_create([
+        Budget(user=user, name=f'Presupuesto {k}', category=EXPENSE_CATEGORIES[k % len(EXPENSE_CATEGORIES)],
+               period=PERIODS[k // len(EXPENSE_CATEGORIES)], limit=Decimal('100000'))
+        for k in range(min(3 * scale, len(EXPENSE_CATEGORIES) * len(PERIODS)))
+    ])
+    Goal.objects.bulk_create([
+        Goal(user=user, name=f'Meta {k}', target_amount=Decimal('500000'), current_amount=Decimal(k * 1000))
+        for k in range(2 * scale)
+    ])
+
+    payslips = Payslip.objects.bulk_create([
+        Payslip(user=user, month='enero', year=2020 + k, gross_salary=Decimal('1000000'), net_salary=Decimal('800000'))
+        for k in range(2 * scale)
+    ])
+    Deduction.objects.bulk_create([
+        Deduction(payslip=payslip, name=name, amount=Decimal('50000'), category=category)
+        for payslip in payslips
+        for name, category in (('Jubilación', 'retirement'), ('Obra social', 'health'), ('Ganancias', 'tax'))
+    ])
+    Bonus.objects.bulk_create([
+        Bonus(payslip=payslip, name=name, amount=Decimal('20000'), type=type)
+        for payslip in payslips
+        for name, type in (('Presentismo', 'regular'), ('Aguinaldo', 'holiday'))
+    ])
+
+    HealthScoreSnapshot.objects.bulk_create([
+        HealthScoreSnapshot(
+            user=user, month=this_month - relativedelta(months=months_ago),
+            savings_rate_score=70, fixed_expenses_score=70, expense_diversification_score=70, trend_score=70,
+            overall_score=70, overall_status='green',
+            cached_advice='Seguí así' if months_ago == 0 else None,
+            advice_generated_at=timezone.now() if months_ago == 0 else None,
+        )
+        for months_ago in range(6)
+    ])
+
+    return Seed(
+        user=user,
+        transaction=Transaction.objects.filter(user=user).first(),
+        budget=Budget.objects.filter(user=user).first(),
+        goal=Goal.objects.filter(user=user).first(),
+        payslip=Payslip.objects.filter(user=user).first(),
+    )
+
+
+@dataclass
+class Case:
+    """One request to an endpoint and the most queries it may run"""
+    budget: int
+    # Seed -> (path, data); data is the query string for GET
+    request: Callable[[Seed], tuple[str, dict | None]]
+    format: str = 'json'
+    authenticated: bool = True
+    staff: bool = False
+
+
+def _path(name: str, **kwargs) -> Callable[[Seed], tuple[str, None]]:
+    return lambda s: (reverse(name, kwargs=kwargs or None), None)
+
+
+def _detail(name: str, attribute: str, data: dict | None = None):
+    return lambda s: (reverse(name, kwargs={'pk': getattr(s, attribute).pk}), data)
+
+
+def _register(s: Seed):
+    InvitationCode.objects.create(code=f'INV-{s.user.pk}')
+    return reverse('register'), {
+        'invitation_code': f'INV-{s.user.pk}', 'username': f'{s.user.username}-2', 'password': PASSWORD,
+    }
+
+
+def _refresh(name: str):
+    return lambda s: (reverse(name), {'refresh': str(CachedRefreshToken.for_user(s.user))})
+
+
+def _upload(name: str, file_name: str, content: bytes, content_type: str):
+    return lambda s: (reverse(name), {'file': SimpleUploadedFile(file_name, content, content_type=content_type)})
+
+
+TRANSACTION = {
+    'date': '2026-01-15', 'description': 'Supermercado', 'amount': '1500.00', 'type': 'expense', 'category': 'food',
+}
+BUDGET = {'name': 'Viajes', 'category': 'travel', 'limit': '10000.00', 'period': 'monthly'}
+GOAL = {'name': 'Vacaciones', 'target_amount': '100000.00'}
+PAYSLIP = {'month': 'enero', 'year': 2026, 'gross_salary': '1000000.00', 'net_salary': '800000.00'}
+
+BUDGETS = {
+    ('api-root', 'get'): Case(0, _path('api-root')),
+    ('health-check', 'get'): Case(0, _path('health-check'), authenticated=False),
+
+    ('token-obtain', 'post'): Case(
+        2, lambda s: (reverse('token-obtain'), {'username': s.user.username, 'password': PASSWORD}),
+        authenticated=False,
+    ),
+    ('register', 'post'): Case(7, _register, authenticated=False),
+    ('token-refresh', 'post'): Case(13, _refresh('token-refresh'), authenticated=False),
+    ('logout', 'post'): Case(7, _refresh('logout')),
+    ('me', 'get'): Case(0, _path('me')),
+
+    ('chat-interpret', 'post'): Case(0, lambda s: (reverse('chat-interpret'), {'message': 'gasté 500 en el super'})),
+    ('chat-interpret-stream', 'post'): Case(
+        0, lambda s: (reverse('chat-interpret-stream'), {'message': 'gasté 500 en el super'}),
+    ),
+    ('chat-analyze-receipt', 'post'): Case(
+        0, _upload('chat-analyze-receipt', 'ticket.png', b'\x89PNG\r\n\x1a\n' + b'0' * 32, 'image/png'),
+        format='multipart',
+    ),
+
+    ('health-score', 'get'): Case(13, _path('health-score')),
+    ('health-score-advice', 'get'): Case(1, _path('health-score-advice')),
+    ('health-score-advice', 'post'): Case(11, _path('health-score-advice')),
+    ('health-score-advice-status', 'get'): Case(1, _path('health-score-advice-status')),
+    ('health-score-advice-stream', 'get'): Case(1, _path('health-score-advice-stream')),
+    ('health-score-advice-stream', 'post'): Case(11, _path('health-score-advice-stream')),
+    ('health-score-history', 'get'): Case(1, _path('health-score-history')),
+    ('model-metrics', 'get'): Case(0, _path('model-metrics'), staff=True),
+
+    ('payslip-list', 'get'): Case(4, _path('payslip-list')),
+    ('payslip-list', 'post'): Case(4, lambda s: (reverse('payslip-list'), {
+        **PAYSLIP, 'deductions': [{'name': 'Jubilación', 'amount': '110000.00', 'category': 'retirement'}],
+    })),
+    ('payslip-analyze', 'post'): Case(
+        0, _upload('payslip-analyze', 'recibo.pdf', b'%PDF-1.4 data', 'application/pdf'), format='multipart',
+    ),
+    ('payslip-detail', 'get'): Case(3, _detail('payslip-detail', 'payslip')),
+    ('payslip-detail', 'put'): Case(6, _detail('payslip-detail', 'payslip', PAYSLIP)),
+    ('payslip-detail', 'patch'): Case(6, _detail('payslip-detail', 'payslip', {'employer': 'ACME'})),
+    ('payslip-detail', 'delete'): Case(7, _detail('payslip-detail', 'payslip')),
+
+    ('transaction-list', 'get'): Case(2, _path('transaction-list')),
+    ('transaction-list', 'post'): Case(5, lambda s: (reverse('transaction-list'), TRANSACTION)),
+    ('transaction-categories', 'get'): Case(2, _path('transaction-categories')),
+    ('transaction-monthly', 'get'): Case(14, _path('transaction-monthly')),
+    ('transaction-stats', 'get'): Case(6, _path('transaction-stats')),
+    ('transaction-suggest-category', 'get'): Case(
+        2, lambda s: (reverse('transaction-suggest-category'), {'description': 'pago food', 'type': 'expense'}),
+    ),
+    ('transaction-detail', 'get'): Case(1, _detail('transaction-detail', 'transaction')),
+    ('transaction-detail', 'put'): Case(9, _detail('transaction-detail', 'transaction', TRANSACTION)),
+    ('transaction-detail', 'patch'): Case(
+        9, _detail('transaction-detail', 'transaction', {'description': 'Supermercado Día'}),
+    ),
+    ('transaction-detail', 'delete'): Case(5, _detail('transaction-detail', 'transaction')),
+
+    ('budget-list', 'get'): Case(2, _path('budget-list')),
+    ('budget-list', 'post'): Case(2, lambda s: (reverse('budget-list'), BUDGET)),
+    ('budget-detail', 'get'): Case(1, _detail('budget-detail', 'budget')),
+    ('budget-detail', 'put'): Case(3, _detail('budget-detail', 'budget', BUDGET)),
+    ('budget-detail', 'patch'): Case(3, _detail('budget-detail', 'budget', {'limit': '20000.00'})),
+    ('budget-detail', 'delete'): Case(2, _detail('budget-detail', 'budget')),
+
+    ('goal-list', 'get'): Case(2, _path('goal-list')),
+    ('goal-list', 'post'): Case(1, lambda s: (reverse('goal-list'), GOAL)),
+    ('goal-detail', 'get'): Case(1, _detail('goal-detail', 'goal')),
+    ('goal-detail', 'put'): Case(2, _detail('goal-detail', 'goal', GOAL)),
+    ('goal-detail', 'patch'): Case(2, _detail('goal-detail', 'goal', {'name': 'Auto'})),
+    ('goal-detail', 'delete'): Case(2, _detail('goal-detail', 'goal')),
+    ('goal-contribute', 'post'): Case(2, _detail('goal-contribute', 'goal', {'amount': '500.00'})),
+}
+
+
+def _routes(patterns) -> set[tuple[str, str]]:
+    """(URL name, HTTP method) of every endpoint"""
+    routes = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            routes |= _routes(pattern.url_patterns)
+            continue
+        callback = pattern.callback
+        if getattr(callback, 'actions', None):
+            methods = list(callback.actions)
+        else:
+            view_class = getattr(callback, 'view_class', None) or callback.cls
+            methods = [m for m in view_class.http_method_names if hasattr(view_class, m)]
+        # HEAD and OPTIONS are answered by the GET handler and DRF's metadata
+        routes |= {(pattern.name, method) for method in methods if method not in ('head', 'options')}
+    return routes
+
+
+def _normalize(sql: str) -> str:
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    return re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+
+
+class QueryBudgetTest(TestCase):
+    """Every endpoint stays within its query budget, whatever the amount of data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed('small', SMALL)
+        cls.large = seed('large', LARGE)
+        CategoryClassifier().rebuild()
+
+    def setUp(self):
+        # Model calls are mocked; only the database work around them is measured
+        for target in ('api.views.ChatService', 'api.async_views.ChatService'):
+            chat = self._patch(target).return_value
+            chat.interpret_message.return_value = {'intent': 'greeting'}
+            chat.stream_interpret_message.return_value = iter([('result', {'intent': 'greeting'})])
+            chat.analyze_receipt.return_value = {'success': True}
+        for target in ('api.views.GeminiService', 'api.async_views.GeminiService'):
+            gemini = self._patch(target).return_value
+            gemini.analyze_payslip.return_value = {'employer': 'ACME'}
+            gemini.generate_financial_advice.return_value = 'Ahorrá más'
+            gemini.stream_financial_advice.return_value = iter(['Ahorrá más'])
+
+    def _patch(self, target):
+        patcher = patch(target)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_every_endpoint_has_a_budget(self):
+        missing = _routes(api_urls.urlpatterns) - set(BUDGETS)
+        self.assertFalse(missing, f'Add a query budget to BUDGETS for: {sorted(missing)}')
+
+    def test_every_endpoint_within_budget(self):
+        for (name, method), case in BUDGETS.items():
+            with self.subTest(f'{method.upper()} {name}'):
+                small = self._queries(name, method, case, self.small)
+                large = self._queries(name, method, case, self.large)
+                if len(large) != len(small) or len(large) > case.budget:
+                    self.fail(self._report(name, method, case, small, large))
+
+    def _queries(self, name, method, case, seeded) -> list[str]:
+        """SQL run by one request of `case` as `seeded`'s user; the request's writes are rolled back"""
+        for lru in (user_cache, blacklist_cache, global_counts_cache, interpret_cache, advice_cache):
+            lru.clear()
+        cache.clear()
+
+        client = APIClient()
+        if case.authenticated:
+            seeded.user.is_staff = case.staff
+            client.force_authenticate(user=seeded.user)
+
+        with transaction.atomic():
+            path, data = case.request(seeded)
+            with CaptureQueriesContext(connection) as queries:
+                if method == 'get':
+                    response = client.get(path, data)
+                else:
+                    response = getattr(client, method)(path, data, format=case.format)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+
+        self.assertLess(response.status_code, 400, f'{method.upper()} {name} failed: {getattr(response, "data", None)}')
+        return [query['sql'] for query in queries.captured_queries]
+
+    @staticmethod
+    def _report(name, method, case, small, large) -> str:
+        lines = [
+            f'{method.upper()} {name}: {len(small)} queries with {SMALL}x data, {len(large)} with {LARGE}x '
+            f'(budget {case.budget})'
+        ]
+        small, large = [_normalize(sql) for sql in small], [_normalize(sql) for sql in large]
+        if len(small) != len(large):
+            lines += difflib.unified_diff(small, large, f'{SMALL}x data', f'{LARGE}x data', lineterm='', n=1)
+        else:
+            lines += [f'{i:3}. {sql}' for i, sql in enumerate(large, 1)]
+        return '\n'.join(lines)
+
+
+class BudgetSpentTest(TestCase):
+    """Budget.objects.with_spent() matches what BudgetSerializer used to query per budget"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password=PASSWORD)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _expense(self, days_ago, amount, category='food', type='expense', user=None):
+        Transaction.objects.create(
+            user=user or self.user, date=timezone.now().date() - timedelta(days=days_ago), description='Gasto',
+            amount=Decimal(amount), type=type, category=category,
+        )
+
+    def test_spent_counts_the_current_period(self):
+        today = timezone.now().date()
+        last_month_days_ago = (today - today.replace(day=1)).days + 1
+        for period in PERIODS:
+            Budget.objects.create(user=self.user, name=period, category='food', period=period, limit=Decimal('1000'))
+        self._expense(0, '10.50')
+        self._expense(last_month_days_ago, '99')
+        self._expense(0, '5', category='transport')
+        self._expense(0, '7', type='income')
+        self._expense(0, '3', user=User.objects.create_user(username='other', password=PASSWORD))
+
+        for budget in Budget.objects.filter(user=self.user).with_spent():
+            with self.subTest(budget.period):
+                in_period = today - timedelta(days=last_month_days_ago) >= Budget.period_start(budget.period, today)
+                self.assertEqual(budget.spent, Decimal('10.50') + (Decimal('99') if in_period else 0))
+
+    def test_budget_without_expenses_spent_zero(self):
+        response = self.client.post(reverse('budget-list'), BUDGET, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['spent'], 0)
+        self.assertEqual(self.client.get(reverse('budget-list')).data['results'][0]['spent'], 0)
+
+    def test_update_reports_spent_of_the_new_category(self):
+        budget = Budget.objects.create(user=self.user, name='Comida', category='food', limit=Decimal('1000'))
+        self._expense(0, '40', category='transport')
+
+        response = self.client.patch(reverse('budget-detail', kwargs={'pk': budget.pk}), {'category': 'transport'},
+                                     format='json')
+
+        self.assertEqual(response.data['spent'], 40)
@@ -0,0 +1,113 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.models import Transaction, User
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """Tests for the orjson renderer"""
+
+    def test_decimal_is_a_number(self):
+        data = ORJSONRenderer().render({'amount': Decimal('1234.50'), 'zero': Decimal('0')})
+        self.assertEqual(json.loads(data), {'amount': 1234.5, 'zero': 0})
+
+    def test_dates_match_json_renderer(self):
+        data = {
+            'date': date(2026, 1, 15),
+            'utc': datetime(2026, 1, 15, 10, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2026, 1, 15, 10, 30, tzinfo=dt_timezone(timedelta(hours=-3))),
+            'naive': datetime(2026, 1, 15, 10, 30),
+            'id': uuid.UUID(int=1),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_other_types_fall_back_to_drf_encoder(self):
+        data = {'label': gettext_lazy('Gasto'), 'delta': timedelta(seconds=90), 1: (1, 2)}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), {'label': 'Gasto', 'delta': '90.0', '1': [1, 2]})
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_utf8_and_line_separators(self):
+        data = ORJSONRenderer().render({'text': 'Alimentación\u2028'})
+        self.assertEqual(data, '{"text":"Alimentación\\u2028"}'.encode())
+
+    def test_indent(self):
+        data = ORJSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        self.assertEqual(data, b'{\n  "a": 1\n}')
+
+
+class ORJSONParserTest(SimpleTestCase):
+    """Tests for the orjson parser"""
+
+    def test_parses_json(self):
+        data = ORJSONParser().parse(io.BytesIO('{"description": "Café", "amount": 12.5}'.encode()))
+        self.assertEqual(data, {'description': 'Café', 'amount': 12.5})
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"amount": '))
+
+    def test_nan_is_rejected(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"amount": NaN}'))
+
+    def test_other_encodings(self):
+        data = ORJSONParser().parse(io.BytesIO('{"a": "ñ"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'})
+        self.assertEqual(data, {'a': 'ñ'})
+
+
+class JSONDefaultsTest(TestCase):
+    """The API uses the orjson renderer and parser by default"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_transaction_round_trip(self):
+        response = self.client.post('/api/transactions/', {
+            'date': '2026-01-15', 'description': 'Supermercado', 'amount': 1234.5,
+            'type': 'expense', 'category': 'Alimentación',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+
+        body = json.loads(self.client.get('/api/transactions/').content)
+        self.assertEqual(body['results'][0]['amount'], 1234.5)
+        self.assertEqual(body['results'][0]['date'], '2026-01-15')
+
+    def test_stats_are_numbers(self):
+        Transaction.objects.create(user=self.user, date=date(2026, 1, 1), description='Sueldo',
+                                   amount=Decimal('1000.00'), type='income', category='Salario')
+        Transaction.objects.create(user=self.user, date=date(2026, 1, 2), description='Super',
+                                   amount=Decimal('333.33'), type='expense', category='Alimentación')
+
+        body = json.loads(self.client.get('/api/transactions/stats/').content)
+
+        self.assertEqual(body['totalIncome'], 1000)
+        self.assertEqual(body['netBalance'], 666.67)
+        self.assertEqual(body['savingsRate'], 66.67)
+
+
+class BenchmarkRenderersCommandTest(SimpleTestCase):
+    """Tests for the benchmark_renderers management command"""
+
+    def test_runs(self):
+        out = StringIO()
+        call_command('benchmark_renderers', rows=5, iterations=1, stdout=out)
+        self.assertIn('faster', out.getvalue())
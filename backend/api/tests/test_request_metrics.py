@@ -0,0 +1,95 @@
+import json
+from unittest.mock import MagicMock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import request_metrics
+from api.models import Transaction, User
+from api.services.gateway import GeminiGateway
+
+
+def _server_timing(response) -> dict:
+    """{name: (ms, desc)} from a Server-Timing header"""
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        entries[name] = (float(values['dur']), values.get('desc', '').strip('"'))
+    return entries
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    """Tests for the per-request metrics middleware"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/transactions/')
+
+        timing = _server_timing(response)
+        self.assertEqual(set(timing), {'db', 'gemini', 'serialize', 'view', 'total'})
+        self.assertGreater(int(timing['db'][1].split()[0]), 0)
+        self.assertEqual(timing['gemini'][1], '0 calls')
+        self.assertGreaterEqual(timing['total'][0], timing['view'][0])
+
+    def test_logs_one_line_per_request(self):
+        with self.assertLogs('api.middleware', level='INFO') as logs:
+            self.client.get('/api/transactions/')
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line['event'], 'request')
+        self.assertEqual(line['route'], 'transaction-list')
+        self.assertEqual(line['status'], 200)
+        self.assertEqual(line['user_id'], self.user.pk)
+        self.assertGreater(line['db_queries'], 0)
+
+    @override_settings(SLOW_REQUEST_MS=0.001)
+    def test_slow_request_dumps_sql(self):
+        for i in range(3):
+            Transaction.objects.create(user=self.user, date='2026-01-15', description=f'Gasto {i}',
+                                       amount='10.00', type='expense', category='Otros')
+
+        with self.assertLogs('api.middleware', level='WARNING') as logs:
+            self.client.get('/api/transactions/')
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line['event'], 'slow_request')
+        self.assertTrue(any('FROM "transactions"' in statement['sql'] for statement in line['sql']))
+        self.assertEqual(sum(statement['count'] for statement in line['sql']), line['db_queries'])
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_disabled(self):
+        response = self.client.get('/api/transactions/')
+        self.assertNotIn('Server-Timing', response)
+
+
+class RequestMetricsTest(TestCase):
+    """Tests for the request metrics collectors"""
+
+    def test_gemini_calls_count_against_the_request(self):
+        gateway = GeminiGateway()
+        with request_metrics.collect() as metrics:
+            gateway.call(MagicMock(return_value=MagicMock(text='ok')), operation='test', model='m')
+
+        self.assertEqual(metrics.gemini_calls, 1)
+        self.assertGreaterEqual(metrics.gemini_time, 0)
+
+    def test_outside_a_request_nothing_is_collected(self):
+        self.assertIsNone(request_metrics.current())
+        request_metrics.record_gemini_call(1.0)
+        with request_metrics.timing('serialize_time'):
+            pass
+
+    def test_repeated_statements_are_grouped(self):
+        metrics = request_metrics.RequestMetrics()
+        for _ in range(3):
+            metrics.record_query('SELECT 1', 0.001)
+        metrics.record_query('SELECT 2', 0.01)
+
+        self.assertEqual(metrics.db_queries, 4)
+        self.assertEqual([s['sql'] for s in metrics.slowest_statements()], ['SELECT 2', 'SELECT 1'])
+        self.assertEqual(metrics.slowest_statements()[1]['count'], 3)
@@ -0,0 +1,213 @@
+import json
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import path, reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.async_views import AsyncChatInterpretStreamView, AsyncHealthScoreAdviceStreamView, AsyncHealthScoreAdviceView
+from api.db_routers import is_pinned
+from api.middleware import ReadYourWritesMiddleware, RequestMetricsMiddleware
+from api.models import User, HealthScoreSnapshot
+
+# What api.urls mounts for these endpoints with ASYNC_VIEWS on
+urlpatterns = [
+    path('api/chat/interpret/stream/', AsyncChatInterpretStreamView.as_view()),
+    path('api/health-score/advice/', AsyncHealthScoreAdviceView.as_view()),
+    path('api/health-score/advice/stream/', AsyncHealthScoreAdviceStreamView.as_view()),
+]
+
+
+def parse_events(response):
+    """Parse a streamed SSE body into [(event, data)]"""
+    body = b''.join(response.streaming_content).decode()
+    return _parse_body(body)
+
+
+async def aparse_events(response):
+    """parse_events() for an async streaming response"""
+    body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+    return _parse_body(body)
+
+
+def _parse_body(body: str):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class ChatInterpretStreamEndpointTest(APITestCase):
+    """Tests for /api/chat/interpret/stream/ endpoint"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('chat-interpret-stream')
+
+    @patch('api.views.ChatService')
+    def test_streams_deltas_then_result(self, mock_chat):
+        mock_instance = MagicMock()
+        mock_instance.stream_interpret_message.return_value = iter([
+            ('delta', '{"intent": '),
+            ('delta', '"greeting"}'),
+            ('result', {'intent': 'greeting'}),
+        ])
+        mock_chat.return_value = mock_instance
+
+        response = self.client.post(self.url, {'message': 'hola che'}, format='json',
+                                    HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(parse_events(response), [
+            ('delta', {'text': '{"intent": '}),
+            ('delta', {'text': '"greeting"}'}),
+            ('result', {'intent': 'greeting'}),
+        ])
+
+    @patch('api.views.ChatService')
+    def test_model_error_streams_fallback_result(self, mock_chat):
+        mock_chat.return_value.stream_interpret_message.side_effect = Exception('API Error')
+
+        response = self.client.post(self.url, {'message': 'algo raro'}, format='json')
+
+        event, data = parse_events(response)[-1]
+        self.assertEqual(event, 'result')
+        self.assertEqual(data['intent'], 'unknown')
+
+    def test_empty_message_returns_400(self):
+        response = self.client.post(self.url, {'message': ''}, format='json',
+                                    HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class HealthScoreAdviceStreamEndpointTest(APITestCase):
+    """Tests for /api/health-score/advice/stream/ endpoint"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('health-score-advice-stream')
+        self.score_url = reverse('health-score')
+
+    def test_without_snapshot_returns_404(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('api.views.GeminiService')
+    def test_streams_and_caches_advice(self, mock_gemini):
+        mock_instance = MagicMock()
+        mock_instance.stream_financial_advice.return_value = iter(['Ahorrá ', 'más. '])
+        mock_gemini.return_value = mock_instance
+
+        self.client.get(self.score_url)
+        response = self.client.get(self.url)
+        events = parse_events(response)
+
+        self.assertEqual([e for e, _ in events], ['delta', 'delta', 'result'])
+        self.assertEqual(events[-1][1]['advice'], 'Ahorrá más.')
+        self.assertFalse(events[-1][1]['cached'])
+        snapshot = HealthScoreSnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.cached_advice, 'Ahorrá más.')
+
+    @patch('api.views.GeminiService')
+    def test_cached_advice_is_single_event(self, mock_gemini):
+        self.client.get(self.score_url)
+        HealthScoreSnapshot.objects.filter(user=self.user).update(cached_advice='Cached advice')
+
+        events = parse_events(self.client.get(self.url))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][1]['advice'], 'Cached advice')
+        self.assertTrue(events[0][1]['cached'])
+        mock_gemini.assert_not_called()
+
+
+async def _stream(*items):
+    for item in items:
+        yield item
+
+
+@override_settings(ROOT_URLCONF='api.tests.test_streaming')
+class AsgiStreamingTest(TestCase):
+    """The streaming endpoints and middleware served through the async handler (ASGI)"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        HealthScoreSnapshot.objects.create(
+            user=self.user, month=date.today().replace(day=1),
+            savings_rate_score=60, fixed_expenses_score=60, expense_diversification_score=60, trend_score=60,
+            overall_score=60, overall_status='yellow',
+        )
+
+    @patch('api.async_views.ChatService')
+    async def test_interpret_stream_is_async(self, mock_chat):
+        mock_chat.return_value.astream_interpret_message = lambda *args: _stream(
+            ('delta', '{"intent": '), ('delta', '"greeting"}'), ('result', {'intent': 'greeting'}),
+        )
+
+        response = await self.async_client.post('/api/chat/interpret/stream/', {'message': 'hola che'},
+                                                content_type='application/json', headers=self.headers)
+
+        # An async iterator is relayed chunk by chunk, not buffered with sync_to_async(list)
+        self.assertTrue(response.is_async)
+        self.assertIn('Server-Timing', response)
+        self.assertEqual(await aparse_events(response), [
+            ('delta', {'text': '{"intent": '}),
+            ('delta', {'text': '"greeting"}'}),
+            ('result', {'intent': 'greeting'}),
+        ])
+
+    @patch('api.async_views.GeminiService')
+    async def test_advice_stream_is_async_and_saved(self, mock_gemini):
+        mock_gemini.return_value.astream_financial_advice = lambda *args, **kwargs: _stream('Ahorrá ', 'más. ')
+
+        response = await self.async_client.get('/api/health-score/advice/stream/', headers=self.headers)
+
+        self.assertTrue(response.is_async)
+        events = await aparse_events(response)
+        self.assertEqual([e for e, _ in events], ['delta', 'delta', 'result'])
+        self.assertEqual(events[-1][1]['advice'], 'Ahorrá más.')
+        snapshot = await HealthScoreSnapshot.objects.aget(user=self.user)
+        self.assertEqual(snapshot.cached_advice, 'Ahorrá más.')
+
+    async def test_cached_advice_stream_is_async(self):
+        await HealthScoreSnapshot.objects.filter(user=self.user).aupdate(cached_advice='Cached advice')
+
+        response = await self.async_client.get('/api/health-score/advice/stream/', headers=self.headers)
+
+        self.assertTrue(response.is_async)
+        self.assertEqual((await aparse_events(response))[0][1]['advice'], 'Cached advice')
+
+    @patch('api.async_views.GeminiService')
+    async def test_middleware_times_queries_and_pins_writers(self, mock_gemini):
+        mock_gemini.return_value.agenerate_financial_advice = AsyncMock(return_value='Ahorrá más')
+
+        response = await self.async_client.post('/api/health-score/advice/', headers=self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        db = response['Server-Timing'].split(', ')[0]
+        self.assertNotIn('desc="0 queries"', db)
+        self.assertTrue(is_pinned(self.user))
+
+    def test_middleware_runs_natively_async(self):
+        for middleware in (ReadYourWritesMiddleware, RequestMetricsMiddleware):
+            with self.subTest(middleware.__name__):
+                self.assertTrue(iscoroutinefunction(middleware(AsyncMock())))
+                self.assertFalse(iscoroutinefunction(middleware(MagicMock())))
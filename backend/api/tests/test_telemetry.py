@@ -0,0 +1,101 @@
+import json
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from google.genai import errors as genai_errors
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import User
+from api.services.gateway import GeminiGateway
+from api.services.telemetry import model_metrics, payload_bytes
+
+
+def response(text='ok', input_tokens=120, output_tokens=30):
+    result = MagicMock()
+    result.text = text
+    result.usage_metadata.prompt_token_count = input_tokens
+    result.usage_metadata.candidates_token_count = output_tokens
+    result.usage_metadata.cached_content_token_count = None
+    return result
+
+
+@override_settings(GEMINI_MAX_RETRIES=0, GEMINI_RETRY_BACKOFF=0.001)
+class ModelCallMetricsTest(SimpleTestCase):
+    """Tests for model call instrumentation in the gateway"""
+
+    def setUp(self):
+        model_metrics.reset()
+        self.addCleanup(model_metrics.reset)
+        self.gateway = GeminiGateway()
+
+    def test_records_tokens_bytes_and_latency(self):
+        contents = [{'role': 'user', 'parts': [{'text': 'hola'}, {'inline_data': {'data': b'12345'}}]}]
+
+        with self.assertLogs('api.services.telemetry', level='INFO') as logs:
+            self.gateway.call(MagicMock(return_value=response('hola!')), operation='receipt',
+                              model='gemini-2.5-flash-lite', contents=contents, config={})
+
+        stats = model_metrics.snapshot()['receipt']
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['models'], {'gemini-2.5-flash-lite': 1})
+        self.assertEqual(stats['input_tokens'], 120)
+        self.assertEqual(stats['output_tokens'], 30)
+        self.assertEqual(stats['cached_tokens'], 0)
+        self.assertEqual(stats['request_bytes'], 9)
+        self.assertEqual(stats['response_bytes'], 5)
+        self.assertEqual(sum(stats['latency']['buckets'].values()), 1)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['operation'], 'receipt')
+        self.assertIsNone(record['error'])
+
+    def test_records_error_class(self):
+        error = genai_errors.ServerError(503, {'error': {'code': 503, 'message': 'unavailable'}})
+
+        with self.assertRaises(genai_errors.ServerError):
+            self.gateway.call(MagicMock(side_effect=error), operation='advice', model='m', config={})
+
+        self.assertEqual(model_metrics.snapshot()['advice']['errors'], {'ServerError:503': 1})
+
+    def test_stream_uses_last_chunk_usage(self):
+        chunks = [response('a', 100, 1), response('bc', 100, 2)]
+        method = MagicMock(return_value=iter(chunks))
+
+        list(self.gateway.stream(method, operation='advice', model='m', contents='x', config={}))
+
+        stats = model_metrics.snapshot()['advice']
+        self.assertEqual(stats['output_tokens'], 2)
+        self.assertEqual(stats['response_bytes'], 3)
+
+    def test_cache_hits_count_toward_hit_rate(self):
+        model_metrics.record_cache_hit('chat_interpret', 'local_parser')
+        self.gateway.call(MagicMock(return_value=response()), operation='chat_interpret', model='m', config={})
+
+        stats = model_metrics.snapshot()['chat_interpret']
+        self.assertEqual(stats['cache_hits'], {'local_parser': 1})
+        self.assertEqual(stats['cache_hit_rate'], 0.5)
+
+    def test_payload_bytes_counts_utf8(self):
+        self.assertEqual(payload_bytes({'text': 'ñ'}), 2)
+
+
+class ModelMetricsViewTest(APITestCase):
+    """Tests for the model call metrics endpoint"""
+
+    def test_requires_staff(self):
+        user = User.objects.create_user(username='user', password='testpass123')
+        self.client.force_authenticate(user=user)
+
+        response = self.client.get(reverse('model-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_returns_snapshot(self):
+        admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.get(reverse('model-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('operations', response.data)
+        self.assertIn('hit_rate', response.data['caches']['advice'])
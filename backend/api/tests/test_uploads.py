@@ -0,0 +1,78 @@
+from unittest.mock import patch, MagicMock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import User
+
+
+@override_settings(PAYSLIP_UPLOAD_MAX_SIZE=1024, RECEIPT_UPLOAD_MAX_SIZE=1024)
+class UploadLimitsTest(APITestCase):
+    """Tests for upload limits on the AI analysis endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.payslip_url = reverse('payslip-analyze')
+        self.receipt_url = reverse('chat-analyze-receipt')
+
+    @patch('api.views.GeminiService')
+    def test_payslip_passes_raw_bytes(self, mock_gemini):
+        mock_instance = MagicMock()
+        mock_instance.analyze_payslip.return_value = {'employer': 'ACME'}
+        mock_gemini.return_value = mock_instance
+
+        upload = SimpleUploadedFile('recibo.pdf', b'%PDF-1.4 data', content_type='application/pdf')
+        response = self.client.post(self.payslip_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_instance.analyze_payslip.assert_called_once_with(b'%PDF-1.4 data', 'application/pdf')
+
+    @patch('api.views.GeminiService')
+    def test_payslip_too_large_is_rejected(self, mock_gemini):
+        upload = SimpleUploadedFile('recibo.pdf', b'x' * 2048, content_type='application/pdf')
+        response = self.client.post(self.payslip_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        mock_gemini.assert_not_called()
+
+    @patch('api.views.GeminiService')
+    def test_payslip_invalid_type_is_rejected(self, mock_gemini):
+        upload = SimpleUploadedFile('recibo.exe', b'MZ', content_type='application/x-msdownload')
+        response = self.client.post(self.payslip_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_gemini.assert_not_called()
+
+    @patch('api.views.ChatService')
+    def test_oversized_body_rejected_before_parsing(self, mock_chat):
+        upload = SimpleUploadedFile('ticket.jpg', b'x' * (200 * 1024), content_type='image/jpeg')
+        response = self.client.post(self.receipt_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(response.data['success'])
+        mock_chat.assert_not_called()
+
+    @patch('api.views.ChatService')
+    def test_receipt_too_large_after_parsing_is_rejected(self, mock_chat):
+        # Within the multipart slack, so only the parsed file size catches it
+        upload = SimpleUploadedFile('ticket.jpg', b'x' * 2048, content_type='image/jpeg')
+        response = self.client.post(self.receipt_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(response.data['success'])
+        mock_chat.assert_not_called()
+
+    @patch('api.views.ChatService')
+    def test_receipt_invalid_type_is_rejected(self, mock_chat):
+        upload = SimpleUploadedFile('ticket.gif', b'GIF89a', content_type='image/gif')
+        response = self.client.post(self.receipt_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_chat.assert_not_called()
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -5,8 +6,13 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     MeView, LogoutView, RegisterView, health_check,
     PayslipViewSet, TransactionViewSet, BudgetViewSet, GoalViewSet,
-    ChatInterpretView, ChatAnalyzeReceiptView, HealthScoreView, HealthScoreAdviceView,
-    HealthScoreHistoryView
+    ChatInterpretView, ChatInterpretStreamView, ChatAnalyzeReceiptView,
+    HealthScoreView, HealthScoreAdviceView, HealthScoreAdviceStatusView, HealthScoreAdviceStreamView,
+    HealthScoreHistoryView, ModelMetricsView
+)
+from .async_views import (
+    AsyncChatInterpretView, AsyncChatInterpretStreamView, AsyncChatAnalyzeReceiptView, AsyncPayslipAnalyzeView,
+    AsyncHealthScoreAdviceView, AsyncHealthScoreAdviceStreamView
 )
 
 router = DefaultRouter()
@@ -15,6 +21,20 @@ router.register(r'transactions', TransactionViewSet, basename='transaction')
 router.register(r'budgets', BudgetViewSet, basename='budget')
 router.register(r'goals', GoalViewSet, basename='goal')
 
+# Gemini-bound endpoints; async under ASGI so calls in flight don't hold a worker
+if settings.ASYNC_VIEWS:
+    interpret_view, receipt_view, advice_view = (
+        AsyncChatInterpretView, AsyncChatAnalyzeReceiptView, AsyncHealthScoreAdviceView
+    )
+    interpret_stream_view, advice_stream_view = AsyncChatInterpretStreamView, AsyncHealthScoreAdviceStreamView
+    payslip_analyze_patterns = [
+        path('payslips/analyze/', AsyncPayslipAnalyzeView.as_view(), name='payslip-analyze'),
+    ]
+else:
+    interpret_view, receipt_view, advice_view = ChatInterpretView, ChatAnalyzeReceiptView, HealthScoreAdviceView
+    interpret_stream_view, advice_stream_view = ChatInterpretStreamView, HealthScoreAdviceStreamView
+    payslip_analyze_patterns = []
+
 urlpatterns = [
     # Health check
     path('health/', health_check, name='health-check'),
@@ -27,14 +47,21 @@ urlpatterns = [
     path('auth/me/', MeView.as_view(), name='me'),
 
     # Chat
-    path('chat/interpret/', ChatInterpretView.as_view(), name='chat-interpret'),
-    path('chat/analyze-receipt/', ChatAnalyzeReceiptView.as_view(), name='chat-analyze-receipt'),
+    path('chat/interpret/', interpret_view.as_view(), name='chat-interpret'),
+    path('chat/interpret/stream/', interpret_stream_view.as_view(), name='chat-interpret-stream'),
+    path('chat/analyze-receipt/', receipt_view.as_view(), name='chat-analyze-receipt'),
 
     # Health Score
     path('health-score/', HealthScoreView.as_view(), name='health-score'),
-    path('health-score/advice/', HealthScoreAdviceView.as_view(), name='health-score-advice'),
+    path('health-score/advice/', advice_view.as_view(), name='health-score-advice'),
+    path('health-score/advice/status/', HealthScoreAdviceStatusView.as_view(), name='health-score-advice-status'),
+    path('health-score/advice/stream/', advice_stream_view.as_view(), name='health-score-advice-stream'),
     path('health-score/history/', HealthScoreHistoryView.as_view(), name='health-score-history'),
 
+    # Monitoring
+    path('metrics/model-calls/', ModelMetricsView.as_view(), name='model-metrics'),
+
     # API routes
+    *payslip_analyze_patterns,
     path('', include(router.urls)),
 ]
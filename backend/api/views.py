@@ -6,11 +6,16 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.db.models import Sum, Avg
 from django.db import transaction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from urllib.parse import urlencode
 from datetime import timedelta, date
 import json
 
@@ -22,9 +27,23 @@ from .serializers import (
     TransactionSerializer, BudgetSerializer, GoalSerializer,
     GoalContributeSerializer, HealthScoreSerializer
 )
-from .services.gemini import GeminiService
-from .services.chat import ChatService
+from . import metrics
+from .authentication import CachedRefreshToken
+from .db_routers import replica_reads
+from .services.gemini import GeminiService, advice_cache
+from .services.gateway import GeminiUnavailable
+from .services.chat import ChatService, interpret_cache
 from .services.health_score import HealthScoreService
+from .services.advice import AdviceService
+from .services.advice_jobs import get_advice_jobs
+from .services.categorizer import CategoryClassifier
+from .services.telemetry import model_metrics
+from .renderers import ORJSONRenderer
+from .sse import EventStreamRenderer, sse_event, sse_response
+from .services.uploads import (
+    UploadRejected, payslip_policy, receipt_policy,
+    check_request_size, validate_upload, read_upload
+)
 
 User = get_user_model()
 
@@ -42,7 +61,7 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = CachedRefreshToken(refresh_token)
                 token.blacklist()
             return Response({'detail': 'Logout successful'}, status=status.HTTP_200_OK)
         except Exception:
@@ -115,7 +134,7 @@ class RegisterView(APIView):
             code.used_at = timezone.now()
             code.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = CachedRefreshToken.for_user(user)
 
         return Response({
             'detail': 'Usuario creado exitosamente',
@@ -131,12 +150,53 @@ def health_check(request):
     return Response({'status': 'ok'})
 
 
-class PayslipViewSet(viewsets.ModelViewSet):
+class PayslipAnalysisMixin:
+    """Upload checks and responses shared by the sync and async payslip analysis"""
+
+    def _read_payslip(self, request):
+        """Validate the uploaded payslip, returning (file, mime_type, file_content, error_response)"""
+        policy = payslip_policy()
+        try:
+            check_request_size(request, policy)
+        except UploadRejected as e:
+            return None, None, None, Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        file = request.FILES.get('file')
+        if not file:
+            return None, None, None, Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            mime_type = validate_upload(file, policy)
+            file_content = read_upload(file, policy)
+        except UploadRejected as e:
+            return None, None, None, Response({'error': str(e)}, status=e.status_code)
+
+        return file, mime_type, file_content, None
+
+    def _payslip_response(self, file, result):
+        return Response({
+            'success': True,
+            'data': result,
+            'file_name': file.name
+        })
+
+    def _payslip_error_response(self, error):
+        if isinstance(error, GeminiUnavailable):
+            code = status.HTTP_503_SERVICE_UNAVAILABLE
+        else:
+            code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return Response({
+            'success': False,
+            'error': str(error)
+        }, status=code)
+
+
+class PayslipViewSet(PayslipAnalysisMixin, viewsets.ModelViewSet):
     """ViewSet for Payslip CRUD operations"""
     serializer_class = PayslipSerializer
 
     def get_queryset(self):
-        return Payslip.objects.filter(user=self.request.user)
+        return Payslip.objects.filter(user=self.request.user).prefetch_related('deductions', 'bonuses')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -157,7 +217,7 @@ class PayslipViewSet(viewsets.ModelViewSet):
             month_num = month_map.get(payslip.month.lower(), 1)
             transaction_date = f"{payslip.year}-{month_num:02d}-15"
 
-            Transaction.objects.create(
+            salary = Transaction.objects.create(
                 user=self.request.user,
                 date=transaction_date,
                 description=f"Sueldo {payslip.month} {payslip.year}",
@@ -167,31 +227,22 @@ class PayslipViewSet(viewsets.ModelViewSet):
                 notes=f"Generado desde recibo - {payslip.employer or 'Sin empleador'}",
                 payslip=payslip
             )
+            CategoryClassifier().learn(salary.user, salary.type, salary.description, salary.category)
 
     @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def analyze(self, request):
         """Analyze payslip file with Gemini AI"""
-        file = request.FILES.get('file')
-        if not file:
-            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        file, mime_type, file_content, error = self._read_payslip(request)
+        if error:
+            return error
 
         try:
-            file_content = file.read()
-            mime_type = file.content_type or 'application/pdf'
-
             gemini_service = GeminiService()
             result = gemini_service.analyze_payslip(file_content, mime_type)
-
-            return Response({
-                'success': True,
-                'data': result,
-                'file_name': file.name
-            })
         except Exception as e:
-            return Response({
-                'success': False,
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return self._payslip_error_response(e)
+
+        return self._payslip_response(file, result)
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
@@ -219,9 +270,41 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        instance = serializer.save(user=self.request.user)
+        CategoryClassifier().learn(instance.user, instance.type, instance.description, instance.category)
+
+    def perform_update(self, serializer):
+        previous = (serializer.instance.type, serializer.instance.description, serializer.instance.category)
+        instance = serializer.save()
+        current = (instance.type, instance.description, instance.category)
+        if current != previous:
+            classifier = CategoryClassifier()
+            classifier.forget(self.request.user, *previous)
+            classifier.learn(self.request.user, *current)
+
+    def perform_destroy(self, instance):
+        CategoryClassifier().forget(self.request.user, instance.type, instance.description, instance.category)
+        instance.delete()
+
+    @action(detail=False, methods=['get'], url_path='suggest-category')
+    def suggest_category(self, request):
+        """Suggest categories for a description with the local classifier"""
+        description = request.query_params.get('description', '').strip()
+        type_param = request.query_params.get('type', 'expense')
+
+        if not description:
+            return Response({'error': 'description is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if type_param not in dict(Transaction.TYPE_CHOICES):
+            return Response({'error': 'type must be income or expense'}, status=status.HTTP_400_BAD_REQUEST)
+
+        suggestions = CategoryClassifier().suggest(request.user, description, type_param)
+        return Response({
+            'category': suggestions[0]['category'] if suggestions else None,
+            'suggestions': suggestions,
+        })
 
     @action(detail=False, methods=['get'])
+    @replica_reads
     def stats(self, request):
         """Get dashboard statistics"""
         start_date = request.query_params.get('start_date')
@@ -241,8 +324,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
         total_expenses = transactions.filter(type='expense').aggregate(
             total=Sum('amount'))['total'] or 0
 
-        net_balance = float(total_income) - float(total_expenses)
-        savings_rate = (net_balance / float(total_income) * 100) if total_income > 0 else 0
+        net_balance = total_income - total_expenses
+        savings_rate = (net_balance / total_income * 100) if total_income > 0 else 0
 
         # Monthly averages based on months WITH actual transactions
         from django.db.models.functions import TruncMonth
@@ -255,8 +338,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
             month=TruncMonth('date')
         ).values('month').distinct().count()
 
-        monthly_avg_income = float(total_income) / income_months if income_months > 0 else 0
-        monthly_avg_expenses = float(total_expenses) / expense_months if expense_months > 0 else 0
+        monthly_avg_income = total_income / income_months if income_months > 0 else 0
+        monthly_avg_expenses = total_expenses / expense_months if expense_months > 0 else 0
 
         # Top expense category
         top_category = transactions.filter(type='expense').values('category').annotate(
@@ -265,11 +348,11 @@ class TransactionViewSet(viewsets.ModelViewSet):
         # Budget utilization
         budgets = Budget.objects.filter(user=request.user)
         total_budget = budgets.aggregate(total=Sum('limit'))['total'] or 0
-        budget_utilization = (float(total_expenses) / float(total_budget) * 100) if total_budget > 0 else 0
+        budget_utilization = (total_expenses / total_budget * 100) if total_budget > 0 else 0
 
         return Response({
-            'totalIncome': float(total_income),
-            'totalExpenses': float(total_expenses),
+            'totalIncome': total_income,
+            'totalExpenses': total_expenses,
             'netBalance': net_balance,
             'savingsRate': round(savings_rate, 2),
             'monthlyAvgIncome': round(monthly_avg_income, 2),
@@ -279,6 +362,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @replica_reads
     def monthly(self, request):
         """Get monthly data for charts - respects date filters"""
         from datetime import datetime
@@ -320,9 +404,9 @@ class TransactionViewSet(viewsets.ModelViewSet):
             month_label = f"{MONTHS_ES[current.month - 1]} {str(current.year)[2:]}"
             result.append({
                 'month': month_label,
-                'income': float(income),
-                'expenses': float(expenses),
-                'savings': float(income) - float(expenses)
+                'income': income,
+                'expenses': expenses,
+                'savings': income - expenses
             })
 
             if current.month == 12:
@@ -333,6 +417,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return Response(result)
 
     @action(detail=False, methods=['get'])
+    @replica_reads
     def categories(self, request):
         """Get category breakdown"""
         type_filter = request.query_params.get('type', 'expense')
@@ -358,10 +443,10 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         result = []
         for cat in categories:
-            percentage = (float(cat['amount']) / float(total) * 100) if total > 0 else 0
+            percentage = (cat['amount'] / total * 100) if total > 0 else 0
             result.append({
                 'category': cat['category'],
-                'amount': float(cat['amount']),
+                'amount': cat['amount'],
                 'percentage': round(percentage, 2)
             })
 
@@ -373,11 +458,24 @@ class BudgetViewSet(viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        queryset = Budget.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # Writes serialize the saved instance, whose category may have changed
+            queryset = queryset.with_spent()
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    # Spent is an aggregate over the user's transactions; serve it from the replica
+    @replica_reads
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @replica_reads
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 class GoalViewSet(viewsets.ModelViewSet):
     """ViewSet for Goal CRUD operations"""
@@ -404,41 +502,78 @@ class GoalViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+CHAT_ERROR_RESPONSE = {
+    'intent': 'unknown',
+    'extractedData': None,
+    'missingFields': [],
+    'response': 'Perdón, hubo un error. ¿Podés intentar de nuevo?',
+    'isComplete': False
+}
+
+
 class ChatInterpretView(APIView):
     """Interpret user message for chatbot NLU"""
 
     def post(self, request):
+        message, context, collected_data, error = self._parse_message(request)
+        if error:
+            return error
+
+        try:
+            chat_service = ChatService()
+            result = chat_service.interpret_message(message, context, collected_data)
+            return Response(result)
+        except Exception as e:
+            return Response(CHAT_ERROR_RESPONSE, status=status.HTTP_200_OK)
+
+    def _parse_message(self, request):
+        """Validate the chat payload, returning (message, context, collected_data, error_response)"""
         message = request.data.get('message', '').strip()
         context = request.data.get('context')
         collected_data = request.data.get('collected_data', {})
 
         if not message:
-            return Response(
+            return None, None, None, Response(
                 {'error': 'Message is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         if len(message) > 500:
-            return Response(
+            return None, None, None, Response(
                 {'error': 'Message too long (max 500 characters)'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            chat_service = ChatService()
-            result = chat_service.interpret_message(message, context, collected_data)
-            return Response(result)
-        except Exception as e:
-            return Response(
-                {
-                    'intent': 'unknown',
-                    'extractedData': None,
-                    'missingFields': [],
-                    'response': 'Perdón, hubo un error. ¿Podés intentar de nuevo?',
-                    'isComplete': False
-                },
-                status=status.HTTP_200_OK
-            )
+        return message, context, collected_data, None
+
+
+class ChatInterpretStreamView(ChatInterpretView):
+    """
+    Interpret user message for chatbot NLU, streamed as server-sent events.
+
+    Emits "delta" events with raw model output while it is generated and a
+    final "result" event with the same payload as ChatInterpretView.
+    """
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        message, context, collected_data, error = self._parse_message(request)
+        if error:
+            return error
+
+        def events():
+            try:
+                chat_service = ChatService()
+                for kind, payload in chat_service.stream_interpret_message(message, context, collected_data):
+                    if kind == 'delta':
+                        yield sse_event('delta', {'text': payload})
+                    else:
+                        yield sse_event('result', payload)
+            except Exception as e:
+                logger.error(f"ChatInterpretStreamView error: {e}")
+                yield sse_event('result', CHAT_ERROR_RESPONSE)
+
+        return sse_response(events())
 
 
 class ChatAnalyzeReceiptView(APIView):
@@ -446,36 +581,56 @@ class ChatAnalyzeReceiptView(APIView):
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
+        file_content, mime_type, error = self._read_receipt(request)
+        if error:
+            return error
+
+        try:
+            chat_service = ChatService()
+            result = chat_service.analyze_receipt(file_content, mime_type)
+            return Response(result)
+        except Exception as e:
+            return self._receipt_error_response(e)
+
+    def _read_receipt(self, request):
+        """Validate the uploaded image, returning (file_content, mime_type, error_response)"""
+        policy = receipt_policy()
+        try:
+            check_request_size(request, policy)
+        except UploadRejected as e:
+            return None, None, Response(
+                {'success': False, 'error': str(e)},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
         file = request.FILES.get('file')
         if not file:
-            return Response(
+            return None, None, Response(
                 {'success': False, 'error': 'No file provided'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        allowed_types = ['image/jpeg', 'image/png', 'image/webp', 'image/heic', 'image/heif']
-        if file.content_type not in allowed_types:
-            return Response(
-                {'success': False, 'error': 'Tipo de archivo no válido. Usá JPG, PNG o WebP.'},
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            mime_type = validate_upload(file, policy)
+            file_content = read_upload(file, policy)
+        except UploadRejected as e:
+            return None, None, Response(
+                {'success': False, 'error': str(e)},
+                status=e.status_code
             )
 
-        if file.size > 5 * 1024 * 1024:
-            return Response(
-                {'success': False, 'error': 'Archivo muy grande. Máximo 5MB.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return file_content, mime_type, None
 
-        try:
-            file_content = file.read()
-            chat_service = ChatService()
-            result = chat_service.analyze_receipt(file_content, file.content_type)
-            return Response(result)
-        except Exception as e:
+    def _receipt_error_response(self, error):
+        if isinstance(error, GeminiUnavailable):
             return Response(
-                {'success': False, 'error': 'No pude analizar la imagen. Intentá con otra foto.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'success': False, 'error': 'El análisis no está disponible en este momento. Intentá en unos minutos.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
+        return Response(
+            {'success': False, 'error': 'No pude analizar la imagen. Intentá con otra foto.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
 
 class HealthScoreView(APIView):
@@ -507,22 +662,22 @@ class HealthScoreView(APIView):
                 'overall_status': result.overall_status,
                 'needs_onboarding': result.needs_onboarding,
                 'savings_rate': {
-                    'value': float(result.savings_rate.value),
+                    'value': result.savings_rate.value,
                     'score': result.savings_rate.score,
                     'status': result.savings_rate.status,
                 },
                 'fixed_expenses': {
-                    'value': float(result.fixed_expenses.value),
+                    'value': result.fixed_expenses.value,
                     'score': result.fixed_expenses.score,
                     'status': result.fixed_expenses.status,
                 },
                 'expense_diversification': {
-                    'value': float(result.expense_diversification.value),
+                    'value': result.expense_diversification.value,
                     'score': result.expense_diversification.score,
                     'status': result.expense_diversification.status,
                 },
                 'trend': {
-                    'value': float(result.trend.value),
+                    'value': result.trend.value,
                     'score': result.trend.score,
                     'status': result.trend.status,
                 },
@@ -553,94 +708,243 @@ class HealthScoreAdviceView(APIView):
 
     def get(self, request):
         """Get cached advice or generate new one if not exists"""
-        current_month = date.today().replace(day=1)
+        snapshot = self._get_current_snapshot(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
 
-        try:
-            snapshot = HealthScoreSnapshot.objects.get(
-                user=request.user,
-                month=current_month
-            )
-        except HealthScoreSnapshot.DoesNotExist:
-            return Response(
-                {'error': 'No hay evaluación de salud financiera para este mes. Visita /health-score/ primero.'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        if self._use_async(request):
+            return self._async_advice(request, snapshot, refresh=False)
 
         if snapshot.cached_advice:
-            return Response({
-                'advice': snapshot.cached_advice,
-                'generated_at': snapshot.advice_generated_at,
-                'cached': True
-            })
+            return self._cached_advice_response(snapshot)
 
         # Generate new advice
         return self._generate_and_cache_advice(request.user, snapshot)
 
     def post(self, request):
         """Regenerate advice regardless of cache"""
-        current_month = date.today().replace(day=1)
+        snapshot = self._get_current_snapshot(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        if self._use_async(request):
+            return self._async_advice(request, snapshot, refresh=True)
 
+        return self._generate_and_cache_advice(request.user, snapshot, use_cache=False)
+
+    def _get_current_snapshot(self, user):
+        current_month = date.today().replace(day=1)
         try:
-            snapshot = HealthScoreSnapshot.objects.get(
-                user=request.user,
-                month=current_month
-            )
+            return HealthScoreSnapshot.objects.get(user=user, month=current_month)
         except HealthScoreSnapshot.DoesNotExist:
-            return Response(
-                {'error': 'No hay evaluación de salud financiera para este mes. Visita /health-score/ primero.'},
-                status=status.HTTP_404_NOT_FOUND
-            )
+            return None
+
+    def _use_async(self, request):
+        return settings.ADVICE_ASYNC or request.query_params.get('async') in ('1', 'true')
+
+    def _async_advice(self, request, snapshot, refresh):
+        """
+        Answer without waiting for Gemini.
+
+        Missing, stale (older than ADVICE_MAX_AGE_DAYS) or explicitly refreshed
+        advice is generated in the background. Existing advice is returned
+        right away with "refreshing"; otherwise the response is 202 with a
+        status URL to poll.
+        """
+        max_age = timedelta(days=settings.ADVICE_MAX_AGE_DAYS)
+        needs_generation = (
+            refresh
+            or not snapshot.cached_advice
+            or snapshot.advice_generated_at is None
+            or snapshot.advice_generated_at < timezone.now() - max_age
+        )
+        requested_at = timezone.now()
+        if needs_generation:
+            get_advice_jobs().submit(snapshot.id, use_cache=not refresh)
 
-        return self._generate_and_cache_advice(request.user, snapshot)
+        if snapshot.cached_advice:
+            return Response({
+                'advice': snapshot.cached_advice,
+                'generated_at': snapshot.advice_generated_at,
+                'cached': True,
+                'refreshing': needs_generation,
+                'status_url': self._status_url(request, requested_at) if needs_generation else None,
+            })
 
-    def _generate_and_cache_advice(self, user, snapshot):
-        """Generate advice using Gemini and cache it in the snapshot"""
-        service = HealthScoreService()
-        result = service.calculate_health_score(user, snapshot.month)
+        return self._pending_response(request, requested_at)
 
-        metrics_data = {
-            'savings_rate': {
-                'value': float(result.savings_rate.value),
-                'status': result.savings_rate.status,
-            },
-            'fixed_expenses': {
-                'value': float(result.fixed_expenses.value),
-                'status': result.fixed_expenses.status,
-            },
-            'expense_diversification': {
-                'value': float(result.expense_diversification.value),
-                'status': result.expense_diversification.status,
-            },
-            'trend': {
-                'value': float(result.trend.value),
-                'status': result.trend.status,
-            },
-            'overall_status': result.overall_status,
-        }
+    def _status_url(self, request, requested_at):
+        query = urlencode({'since': requested_at.isoformat()})
+        return request.build_absolute_uri(f"{reverse('health-score-advice-status')}?{query}")
+
+    def _pending_response(self, request, requested_at):
+        response = Response(
+            {'status': 'pending', 'status_url': self._status_url(request, requested_at)},
+            status=status.HTTP_202_ACCEPTED
+        )
+        response['Retry-After'] = '2'
+        return response
+
+    def _no_snapshot_response(self):
+        return Response(
+            {'error': 'No hay evaluación de salud financiera para este mes. Visita /health-score/ primero.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    def _build_metrics_data(self, user, snapshot):
+        """Compute the metrics the advice prompt is based on"""
+        return AdviceService().build_metrics_data(user, snapshot.month)
+
+    def _save_advice(self, snapshot, advice):
+        AdviceService().save_advice(snapshot, advice)
+
+    def _generate_and_cache_advice(self, user, snapshot, use_cache=True):
+        """Generate advice using Gemini and cache it in the snapshot"""
+        metrics_data = self._build_metrics_data(user, snapshot)
 
         try:
             gemini_service = GeminiService()
-            advice = gemini_service.generate_financial_advice(metrics_data)
+            advice = gemini_service.generate_financial_advice(metrics_data, use_cache=use_cache)
         except Exception as e:
-            return Response(
-                {'error': f'Error al generar consejo: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            return self._advice_error_response(e)
 
-        snapshot.cached_advice = advice
-        snapshot.advice_generated_at = timezone.now()
-        snapshot.save()
+        self._save_advice(snapshot, advice)
+        return self._advice_response(snapshot, advice)
 
+    def _cached_advice_response(self, snapshot):
+        return Response({
+            'advice': snapshot.cached_advice,
+            'generated_at': snapshot.advice_generated_at,
+            'cached': True
+        })
+
+    def _advice_response(self, snapshot, advice):
         return Response({
             'advice': advice,
             'generated_at': snapshot.advice_generated_at,
             'cached': False
         })
 
+    def _advice_error_response(self, error):
+        if isinstance(error, GeminiUnavailable):
+            code = status.HTTP_503_SERVICE_UNAVAILABLE
+        else:
+            code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return Response({'error': f'Error al generar consejo: {str(error)}'}, status=code)
+
+
+class HealthScoreAdviceStatusView(HealthScoreAdviceView):
+    """Poll advice queued by the async mode of HealthScoreAdviceView"""
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request):
+        snapshot = self._get_current_snapshot(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        since = parse_datetime(request.query_params.get('since', ''))
+        generated_at = snapshot.advice_generated_at
+        if snapshot.cached_advice and (since is None or (generated_at and generated_at >= since)):
+            return Response({
+                'status': 'done',
+                'advice': snapshot.cached_advice,
+                'generated_at': generated_at,
+                'cached': False
+            })
+
+        jobs = get_advice_jobs()
+        error = jobs.failure(snapshot.id)
+        if error and not jobs.is_pending(snapshot.id):
+            return Response({'status': 'failed', 'error': f'Error al generar consejo: {error}'})
+
+        return self._pending_response(request, since or timezone.now())
+
+
+class HealthScoreAdviceStreamView(HealthScoreAdviceView):
+    """
+    Financial advice streamed as server-sent events.
+
+    Emits "delta" events with advice text while Gemini generates it and a
+    final "result" event with the same payload as HealthScoreAdviceView, or
+    an "error" event if generation fails.
+    """
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        """Stream cached advice or generate new one if not exists"""
+        snapshot = self._get_current_snapshot(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        if snapshot.cached_advice:
+            return sse_response(iter([self._result_event(snapshot, snapshot.cached_advice, cached=True)]))
+
+        return self._stream_and_cache_advice(request.user, snapshot)
+
+    def post(self, request):
+        """Regenerate advice regardless of cache, streaming it"""
+        snapshot = self._get_current_snapshot(request.user)
+        if snapshot is None:
+            return self._no_snapshot_response()
+
+        return self._stream_and_cache_advice(request.user, snapshot, use_cache=False)
+
+    def _stream_and_cache_advice(self, user, snapshot, use_cache=True):
+        metrics_data = self._build_metrics_data(user, snapshot)
+
+        def events():
+            chunks = []
+            try:
+                gemini_service = GeminiService()
+                for text in gemini_service.stream_financial_advice(metrics_data, use_cache=use_cache):
+                    chunks.append(text)
+                    yield sse_event('delta', {'text': text})
+            except Exception as e:
+                yield sse_event('error', {'error': f'Error al generar consejo: {str(e)}'})
+                return
+
+            advice = ''.join(chunks).strip()
+            self._save_advice(snapshot, advice)
+            yield self._result_event(snapshot, advice, cached=False)
+
+        return sse_response(events())
+
+    @staticmethod
+    def _result_event(snapshot, advice: str, cached: bool) -> str:
+        return sse_event('result', {
+            'advice': advice,
+            'generated_at': snapshot.advice_generated_at,
+            'cached': cached
+        })
+
+
+class ModelMetricsView(APIView):
+    """Aggregated Gemini call metrics for this worker (staff only)"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'operations': model_metrics.snapshot(),
+            'caches': {
+                'interpret': interpret_cache.stats(),
+                'advice': advice_cache.stats(),
+            },
+        })
+
+
+@require_GET
+def prometheus_metrics(request):
+    """Prometheus metrics of every worker, for internal callers only"""
+    if not metrics.is_internal(request):
+        raise Http404
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
+
 
 class HealthScoreHistoryView(APIView):
     """Get health score history for the last 6 months"""
 
+    @replica_reads
     def get(self, request):
         from dateutil.relativedelta import relativedelta
 
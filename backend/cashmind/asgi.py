@@ -0,0 +1,9 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cashmind.settings')
+# Serve the Gemini-bound endpoints with async views. Persistent connections
+# would pile up across ASGI's per-request threads; use DB_POOL to reuse them
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+application = get_asgi_application()
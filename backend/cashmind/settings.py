@@ -3,6 +3,7 @@ from pathlib import Path
 from datetime import timedelta
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -34,6 +35,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,6 +43,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = 'cashmind.urls'
@@ -62,13 +65,39 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'cashmind.wsgi.application'
+# Serve the Gemini-bound endpoints with async views (set by cashmind.asgi)
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
 
 # Database
 DATABASE_URL = os.getenv('DATABASE_URL', '')
+# Seconds a worker keeps its connection open between requests (0 closes it
+# after each request). Reused connections are pinged before use
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+# psycopg3 connection pool per worker process (PostgreSQL only, needs
+# psycopg[pool]); replaces persistent connections. A sync worker uses one
+# connection per request plus one per advice job thread
+DB_POOL = os.getenv('DB_POOL', 'False').lower() == 'true'
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 4))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+DB_POOL_OPTIONS = {'min_size': DB_POOL_MIN_SIZE, 'max_size': DB_POOL_MAX_SIZE, 'timeout': DB_POOL_TIMEOUT}
+if DB_POOL:
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('DB_POOL=true needs psycopg 3 with its pool: pip install "psycopg[binary,pool]>=3.1"')
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
     }
+    if DB_POOL:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = DB_POOL_OPTIONS
 else:
     DATABASES = {
         'default': {
@@ -77,6 +106,40 @@ else:
         }
     }
 
+# Cache shared by the workers of a host (primary pins, advice job state,
+# authenticated-user stamps); without it each process keeps its own in memory
+CACHE_DIR = os.getenv('CACHE_DIR', '')
+if CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+
+# Optional read replica for analytics endpoints, e.g. a streaming replica or
+# sqlite:///replica.sqlite3 locally. Users who wrote in the last
+# DATABASE_REPLICA_PIN_SECONDS keep reading from the primary
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL', '')
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', 10))
+DATABASE_READ_REPLICA = None
+if DATABASE_REPLICA_URL:
+    if not CACHE_DIR:
+        # A pin set by one worker must be seen by the others, or a user's
+        # next request may read the replica without their own write
+        raise ImproperlyConfigured('DATABASE_REPLICA_URL needs CACHE_DIR, a cache shared by the workers')
+    DATABASE_READ_REPLICA = 'replica'
+    DATABASES[DATABASE_READ_REPLICA] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    if DB_POOL and DATABASES[DATABASE_READ_REPLICA]['ENGINE'].endswith('postgresql'):
+        DATABASES[DATABASE_READ_REPLICA].setdefault('OPTIONS', {})['pool'] = dict(DB_POOL_OPTIONS)
+    # The test runner points the replica at the primary's test database
+    DATABASES[DATABASE_READ_REPLICA]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
 # Custom User Model
 AUTH_USER_MODEL = 'api.User'
 
@@ -101,6 +164,25 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Per-request timings: a Server-Timing header and a JSON log line per request
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'True').lower() == 'true'
+# Requests slower than this (ms) are logged as warnings with their SQL (0 = off)
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 1000))
+# /metrics (Prometheus) answers only these networks, or requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ALLOWED_NETWORKS = os.getenv('METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# File uploads
+# Uploads larger than this are spooled to a temporary file instead of memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('FILE_UPLOAD_MAX_MEMORY_SIZE', 1024 * 1024))
+PAYSLIP_UPLOAD_MAX_SIZE = int(os.getenv('PAYSLIP_UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+RECEIPT_UPLOAD_MAX_SIZE = int(os.getenv('RECEIPT_UPLOAD_MAX_SIZE', 5 * 1024 * 1024))
+
+# Receipt photos are downscaled and recompressed before analysis
+RECEIPT_IMAGE_MAX_SIDE = int(os.getenv('RECEIPT_IMAGE_MAX_SIDE', 1600))
+RECEIPT_IMAGE_QUALITY = int(os.getenv('RECEIPT_IMAGE_QUALITY', 80))
+
 # CORS
 CORS_ALLOWED_ORIGINS = os.getenv(
     'CORS_ALLOWED_ORIGINS',
@@ -117,15 +199,32 @@ CSRF_TRUSTED_ORIGINS = os.getenv(
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Decimal fields are sent as JSON numbers, like the aggregates in the views
+    'COERCE_DECIMAL_TO_STRING': False,
 }
 
+# Seconds a worker may reuse an authenticated user without reading it again
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 30))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 4096))
+# Refresh token ids known to be blacklisted, per worker
+TOKEN_BLACKLIST_CACHE_SIZE = int(os.getenv('TOKEN_BLACKLIST_CACHE_SIZE', 50000))
+
 # SimpleJWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -133,7 +232,41 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'api.authentication.CachedTokenRefreshSerializer',
 }
 
 # Google Gemini API
 GOOGLE_GEMINI_API_KEY = os.getenv('GOOGLE_GEMINI_API_KEY', '')
+# Override the API endpoint, e.g. http://127.0.0.1:8090/ for `manage.py fake_gemini`
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '')
+# Connection pool of the process-wide Gemini client
+GEMINI_MAX_CONNECTIONS = int(os.getenv('GEMINI_MAX_CONNECTIONS', 20))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv('GEMINI_KEEPALIVE_EXPIRY', 60))
+# Gemini call resilience (per worker). Timeouts stay below gunicorn's 120s
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 30))
+GEMINI_DEADLINE = float(os.getenv('GEMINI_DEADLINE', 60))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 2))
+GEMINI_RETRY_BACKOFF = float(os.getenv('GEMINI_RETRY_BACKOFF', 1))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 8))
+GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', 5))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv('GEMINI_BREAKER_THRESHOLD', 5))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv('GEMINI_BREAKER_COOLDOWN', 30))
+# Calls in flight per event loop on the async views (ASGI); also sizes the
+# async client's connection pool
+GEMINI_ASYNC_MAX_CONCURRENCY = int(os.getenv('GEMINI_ASYNC_MAX_CONCURRENCY', 200))
+# Seconds to keep the static chat prompt in Gemini's context cache (0 = off)
+GEMINI_PROMPT_CACHE_TTL = int(os.getenv('GEMINI_PROMPT_CACHE_TTL', 0))
+# Max chat interpretations kept per worker (LRU)
+CHAT_INTERPRET_CACHE_SIZE = int(os.getenv('CHAT_INTERPRET_CACHE_SIZE', 2048))
+# Advice shared between similar metric profiles: values are rounded to
+# ADVICE_CACHE_GRANULARITY percentage points (0 = one decimal, as in the
+# prompt), never past the edge of their traffic-light band
+ADVICE_CACHE_SIZE = int(os.getenv('ADVICE_CACHE_SIZE', 1024))
+ADVICE_CACHE_TTL = int(os.getenv('ADVICE_CACHE_TTL', 7 * 24 * 3600))
+ADVICE_CACHE_GRANULARITY = float(os.getenv('ADVICE_CACHE_GRANULARITY', 0))
+# Answer advice requests at once (202 + status URL, or stale advice) and
+# generate on a background thread; clients can also opt in with ?async=1
+ADVICE_ASYNC = os.getenv('ADVICE_ASYNC', 'False').lower() == 'true'
+ADVICE_JOB_WORKERS = int(os.getenv('ADVICE_JOB_WORKERS', 2))
+# Cached advice older than this is refreshed (async mode, precompute_advice)
+ADVICE_MAX_AGE_DAYS = int(os.getenv('ADVICE_MAX_AGE_DAYS', 7))
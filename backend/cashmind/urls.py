@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from api.views import prometheus_metrics
+
 urlpatterns = [
+    path('metrics', prometheus_metrics, name='metrics'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
 ]
@@ -1,6 +1,16 @@
 #!/bin/bash
 set -e
 
+# Workers share their Prometheus metrics through this directory; values of
+# the previous run are stale
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Workers share the default cache (read-replica pins, advice jobs, user stamps) through this directory
+export CACHE_DIR="${CACHE_DIR:-/tmp/cashmind-cache}"
+mkdir -p "$CACHE_DIR"
+
 echo "Running migrations..."
 python manage.py migrate --noinput
 
@@ -10,5 +20,11 @@ if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ]; t
     python manage.py createsuperuser --noinput || echo "Superuser already exists"
 fi
 
+# APP_SERVER=asgi serves the async views, so in-flight Gemini calls don't hold a worker
+if [ "$APP_SERVER" = "asgi" ]; then
+    echo "Starting uvicorn..."
+    exec uvicorn cashmind.asgi:application --host 0.0.0.0 --port 8000 --workers 2 --log-level info
+fi
+
 echo "Starting gunicorn..."
 exec gunicorn cashmind.wsgi:application --bind 0.0.0.0:8000 --workers 2 --timeout 120 --log-level info
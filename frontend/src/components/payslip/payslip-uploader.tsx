@@ -49,6 +49,7 @@ const MONTHS = [
 interface AnalyzedData {
   employer?: string;
   position?: string;
+  rawText?: string;
   paymentDate?: {
     month: string;
     year: number;
@@ -138,6 +139,7 @@ export function PayslipUploader({ open, onOpenChange }: PayslipUploaderProps) {
         net_salary: normalizedNet || analyzedData.netSalary || 0,
         employer: employer || analyzedData.employer,
         position: analyzedData.position,
+        raw_text: analyzedData.rawText,
         deductions: analyzedData.deductions?.map(d => ({
           name: d.name,
           amount: d.amount,
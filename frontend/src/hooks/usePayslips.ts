@@ -35,6 +35,7 @@ interface Payslip {
 interface AnalyzedPayslip {
   employer?: string;
   position?: string;
+  rawText?: string;
   paymentDate?: {
     month: string;
     year: number;
@@ -95,6 +96,7 @@ export function usePayslips() {
     net_salary: number;
     employer?: string;
     position?: string;
+    raw_text?: string;
     deductions?: Array<{ name: string; amount: number; percentage?: number; category: string }>;
     bonuses?: Array<{ name: string; amount: number; type: string }>;
     create_transaction?: boolean;